@@ -4,23 +4,20 @@
 
 # app.py — Main Streamlit Application Entry Point
 
+# Heavy dependencies (pandas, matplotlib, numpy, gspread) are loaded on first
+# use; `python -m core.profiling homepage` checks the cold-start import budget.
+
 import os
 import json
 import base64
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
-from core.algorithm import generate_rota
-from core.data_utils import load_rotas, save_rotas, delete_rota, get_saved_week_keys
+from core.storage import load_rotas
+from core.cache import cached_rotas
+from core.local_store import MirrorNotReady
+from core.week_index import saved_week_index
 from app_texts import HOW_TO_USE, FAIR_ASSIGNMENT, WHATS_NEW, CHANGELOG_HISTORY
-from core.utils import generate_table_image
-from weekly_rota_generation import (
-    select_week,
-    select_daily_inspectors,
-    validate_selection,
-    generate_and_display_rota,
-    check_existing_rota
-)
+from core.utils import generate_table_html
 
 # ─────────────────────────────────────────────
 # 🌐 App Setup
@@ -46,12 +43,15 @@ def get_inspectors():
             return sorted(json.load(f))
     return []
 
-@st.cache_data
 def cached_load_rotas():
-    return load_rotas()
+    return cached_rotas(load_rotas)
 
 inspectors = get_inspectors()
-rotas = cached_load_rotas()
+try:
+    rotas = cached_load_rotas()
+except MirrorNotReady as e:
+    st.warning(f"⏳ {e}. Please refresh in a moment.")
+    st.stop()
 POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
 
 # ─────────────────────────────────────────────
@@ -98,43 +98,46 @@ def admin_login():
 # ─────────────────────────────────────────────
 
 def display_latest_rota(rotas):
-    from datetime import datetime, timedelta
-    import pandas as pd
-    import streamlit as st
-
     rotas = cached_load_rotas()
 
-    DAYS_FULL = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
-    POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
     today = datetime.today().date()
 
-    future_rotas = {
-        date_str: rota for date_str, rota in rotas.items()
-        if datetime.strptime(date_str, "%Y-%m-%d").date() + timedelta(days=4) >= today
-    }
-
-    latest_week = max(future_rotas.keys()) if future_rotas else None
+    # A week stays current until its Friday has passed
+    index = saved_week_index(rotas)
+    has_current = index.first_since(today - timedelta(days=4)) < len(index)
+    latest_week = index.keys[-1] if has_current else None
 
     if latest_week:
         latest_week_start = datetime.strptime(latest_week, "%Y-%m-%d")
         week_label = f"{latest_week_start.strftime('%d %b')} – {(latest_week_start + timedelta(days=4)).strftime('%d %b %Y')}"
 
-        summary_df = pd.DataFrame.from_dict(future_rotas[latest_week], orient="index")
-        saturday_exists = "Saturday" in summary_df.index and summary_df.loc["Saturday"].replace("", pd.NA).dropna().any()
+        week_data = rotas[latest_week]
+        saturday_exists = any(week_data.get("Saturday", {}).values())
 
         display_days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
         if saturday_exists:
             display_days.append("Saturday")
 
-        summary_df = summary_df.reindex(display_days)[POSITIONS].fillna("")
+        # 📋 HTML tablo ekranda; PNG yalnızca indirme tıklanınca çizilir
+        st.markdown(
+            generate_table_html(
+                [(day, week_data.get(day, {})) for day in display_days],
+                POSITIONS,
+                title=f"{week_label} Weekly Rota"
+            ),
+            unsafe_allow_html=True
+        )
+
+        def render_png():
+            import pandas as pd
+            from core.image_cache import render_table_png
 
+            summary_df = pd.DataFrame.from_dict(week_data, orient="index").reindex(display_days).reindex(columns=POSITIONS).fillna("")
+            return render_table_png(summary_df, title=f"{week_label} Weekly Rota")
 
-              # 📸 PNG Image + Download Button
-        image_buf = generate_table_image(summary_df, title=f"{week_label} Weekly Rota")
-        st.image(image_buf, use_container_width=True)
         st.download_button(
             label="📥 Download Rota",
-            data=image_buf,
+            data=render_png,
             file_name=f"rota_{latest_week}.png",
             mime="image/png"
         )
@@ -152,6 +155,15 @@ admin_login()
 if not st.session_state.get("is_planner", False):
     st.stop()
 
+# Planning tools pull in pandas and the solver, so load them only once unlocked
+from weekly_rota_generation import (
+    select_week,
+    select_daily_inspectors,
+    validate_selection,
+    generate_and_display_rota,
+    check_existing_rota
+)
+
 # 🔁 Weekly Rota Planning
 selected_monday, days = select_week()
 week_key = selected_monday.strftime("%Y-%m-%d")
@@ -4,76 +4,131 @@
 # Contact: ticked.does-7c@icloud.com
 
 import streamlit as st
-import gspread
 import pandas as pd
 from datetime import datetime, timedelta
 from collections import defaultdict
-from google.oauth2.service_account import Credentials
 from io import BytesIO
-import matplotlib.pyplot as plt
+from core.cache import cache, week_scope, LOGS_SCOPE, WEEK_KEYS_SCOPE
+from core.export import EXPORT_FORMATS, build_export, month_range, quarter_range, select_weeks
+from core.image_cache import FULL_DPI, PREVIEW_DPI, render_table_png
+from core.week_index import deleted_week_index, saved_week_index
+from core.data_utils import LOG_COLUMNS
+from core.audit_log import get_audit_log
+from core.storage import change_logs_indexed, load_change_log_weeks, load_change_logs, log_weeks, sync_metrics
 
 # ─── Constants ───
 POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
 DAYS_FULL = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-
-# ─── Google Sheets Authorization ───
-try:
-    creds_dict = dict(st.secrets["gcp_service_account"])
-    creds_dict["private_key"] = creds_dict["private_key"].replace("\\n", "\n")
-    creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPE)
-    gspread_client = gspread.authorize(creds)
-except Exception as e:
-    st.error(f"❌ Google Sheets authorization failed: {e}")
-    gspread_client = None
-
-# ─── Table Image Generator ───
-def generate_table_image(df):
-    fig, ax = plt.subplots(figsize=(12, len(df) * 0.6 + 1))
-    ax.axis('off')
-    tbl = ax.table(cellText=df.values,
-                   colLabels=df.columns,
-                   rowLabels=df.index,
-                   loc='center',
-                   cellLoc='center')
-    tbl.auto_set_font_size(False)
-    tbl.set_fontsize(10)
-    tbl.scale(1.2, 1.2)
-    buf = BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=300)
-    buf.seek(0)
-    return buf
 
 # ─── Google Sheet Log Functions ───
-def append_to_google_sheet(log_entry):
-    if gspread_client is None:
-        return
+# One admin action's entries are written as a single bulk append on the audit
+# log worker, so the click doesn't wait on the write
+def append_to_google_sheet(log_entries):
+    get_audit_log().submit(log_entries)
+
+# Reads are cached until the log changes; a failed read raises out of the
+# compute, so it is shown here but never cached and the next run asks again.
+# Backends without a week index read the whole log either way, so the week
+# list and a week's rows both come from one cached full read there.
+def _all_logs():
+    return cache.get_or_compute(("change_logs", None), [LOGS_SCOPE], load_change_logs)
+
+def fetch_logs_from_google_sheet(week_start=None):
     try:
-        sheet = gspread_client.open("change_logs").sheet1
-        sheet.append_row([
-            log_entry["timestamp"],
-            log_entry["admin_id"],
-            log_entry["week_start"],
-            log_entry["day"],
-            log_entry["position"],
-            log_entry["old_value"],
-            log_entry["new_value"],
-            log_entry["admin_users"]
-        ])
+        if week_start is not None and change_logs_indexed():
+            return cache.get_or_compute(("change_logs", week_start), [LOGS_SCOPE], lambda: load_change_logs(week_start))
+        logs = _all_logs()
+        return logs if week_start is None else [log for log in logs if str(log.get("week_start")) == week_start]
     except Exception as e:
-        st.warning(f"Google Sheets error: {e}")
-
-def fetch_logs_from_google_sheet():
-    if gspread_client is None:
+        st.warning(f"Change log read error: {e}")
         return []
+
+def fetch_log_weeks():
     try:
-        sheet = gspread_client.open("change_logs").sheet1
-        records = sheet.get_all_records()
-        return records
+        if change_logs_indexed():
+            return cache.get_or_compute(("change_log_weeks",), [LOGS_SCOPE], load_change_log_weeks)
+        return cache.get_or_compute(("change_log_weeks",), [LOGS_SCOPE], lambda: log_weeks(_all_logs()))
     except Exception as e:
-        st.warning(f"Google Sheets read error: {e}")
+        st.warning(f"Change log read error: {e}")
         return []
 
+# ─── Sheets Sync Status ───
+def _seconds(value):
+    return "–" if value is None else f"{value:.1f}s"
+
+def render_sync_status():
+    try:
+        metrics = sync_metrics()
+    except Exception as e:
+        st.warning(f"Sync status unavailable: {e}")
+        return
+    if metrics is None:
+        return
+
+    with st.expander(f"📡 Google Sheets Sync — {metrics['queue_depth']} pending", expanded=metrics["consecutive_failures"] > 0):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Queued writes", metrics["queue_depth"])
+        col2.metric("Oldest pending", _seconds(metrics["oldest_pending_seconds"]))
+        col3.metric("Sync latency p50 / p95", f"{_seconds(metrics['latency_p50_seconds'])} / {_seconds(metrics['latency_p95_seconds'])}")
+        col4.metric("Synced writes", metrics["pushed"])
+        if metrics["tokens"] is not None:
+            st.caption(f"Rate limit: {metrics['tokens']:.1f} Sheets requests available now · {metrics['calls']} requests made")
+        if not metrics["ready"]:
+            st.warning("⏳ The local mirror has not loaded Google Sheets yet; pages wait until it has.")
+        if metrics["consecutive_failures"]:
+            retry_in = max(0.0, (metrics["retry_at"] or 0) - datetime.now().timestamp())
+            st.warning(f"⚠️ {metrics['consecutive_failures']} failed attempt(s), retrying in {retry_in:.0f}s — {metrics['last_error']}")
+
+# ─── Bulk Export ───
+EXPORT_MIME = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+}
+
+def render_bulk_export(rotas):
+    st.markdown("<h4 style='margin-top:0;'>📦 Bulk Export</h4><hr style='margin-top:0.3em; margin-bottom:1em;'>", unsafe_allow_html=True)
+    if not rotas:
+        st.info("📭 No saved rotas to export.")
+        return
+
+    years = sorted({int(wk[:4]) for wk in rotas}, reverse=True)
+    scope = st.radio("Range", ["Month", "Quarter", "Custom range"], horizontal=True, key="export_scope")
+
+    if scope == "Custom range":
+        all_weeks = sorted(rotas)
+        start, end = st.select_slider("Weeks", options=all_weeks, value=(all_weeks[0], all_weeks[-1]), key="export_weeks")
+    else:
+        col1, col2 = st.columns(2)
+        year = col1.selectbox("Year", years, key="export_year")
+        if scope == "Month":
+            month = col2.selectbox("Month", range(1, 13), format_func=lambda m: datetime(2000, m, 1).strftime("%B"), key="export_month")
+            start, end = month_range(year, month)
+        else:
+            quarter = col2.selectbox("Quarter", [1, 2, 3, 4], format_func=lambda q: f"Q{q}", key="export_quarter")
+            start, end = quarter_range(year, quarter)
+
+    week_keys = select_weeks(rotas, start, end)
+    fmt = st.radio(
+        "Format",
+        EXPORT_FORMATS,
+        format_func=lambda f: "Excel workbook (sheet per week)" if f == "xlsx" else "ZIP of PNG images",
+        horizontal=True,
+        key="export_format"
+    )
+
+    if not week_keys:
+        st.info("📭 No saved rotas in this range.")
+        return
+
+    # Dosya yalnızca butona tıklanınca oluşturulur
+    st.download_button(
+        label=f"📦 Download {len(week_keys)} week{'s' if len(week_keys) != 1 else ''}",
+        data=lambda: build_export(rotas, week_keys, fmt),
+        file_name=f"rotas_{week_keys[0]}_{week_keys[-1]}.{fmt}",
+        mime=EXPORT_MIME[fmt],
+        key="bulk_export"
+    )
+
 # ─── Admin Panel ───
 def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_deleted_rota):
     if not st.session_state.get("is_admin", False):
@@ -83,24 +138,22 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
     st.markdown("<hr style='margin-top:0; margin-bottom:1em; border: 2px solid black;'>", unsafe_allow_html=True)
 
     if st.button("🔄 Clear Cached Data"):
+        cache.clear()
         st.cache_data.clear()
         st.success("✅ Cache cleared. Please refresh the page manually.")
 
+    render_sync_status()
+
     st.markdown("<h4 style='margin-top:0;'>📁 Saved Weekly Rotas</h4><hr style='margin-top:0.3em; margin-bottom:1em;'>", unsafe_allow_html=True)
     use_month_filter_saved = st.checkbox("📅 View by specific month", value=False, key="month_filter_saved_rotas")
 
+    saved_index = saved_week_index(rotas)
+
     if use_month_filter_saved:
-        available_months_saved = sorted(
-            {datetime.strptime(w, "%Y-%m-%d").strftime("%B %Y") for w in rotas.keys()},
-            reverse=True
-        )
-        selected_month_saved = st.selectbox("🗓️ Select a Month", available_months_saved, key="select_month_saved_rotas")
-        week_list = sorted([
-            wk for wk in rotas.keys()
-            if datetime.strptime(wk, "%Y-%m-%d").strftime("%B %Y") == selected_month_saved
-        ])
+        selected_month_saved = st.selectbox("🗓️ Select a Month", saved_index.months(), key="select_month_saved_rotas")
+        week_list = saved_index.in_month(selected_month_saved)
     else:
-        week_list = sorted(rotas.keys(), reverse=True)[:4]
+        week_list = saved_index.latest(4)
 
     for wk in week_list:
         with st.expander(f"🔗️ {wk}"):
@@ -114,11 +167,12 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
 
             rota_df = rota_df.reindex(display_days)[POSITIONS].fillna("")
 
-            image_buf = generate_table_image(rota_df)
-            st.image(image_buf, caption=f"📸 Rota Table for the week of {wk}", use_container_width=True)
+            # Ekranda küçük önizleme; 300 dpi PNG yalnızca indirirken çizilir
+            preview = render_table_png(rota_df, dpi=PREVIEW_DPI)
+            st.image(BytesIO(preview), caption=f"📸 Rota Table for the week of {wk}", use_container_width=True)
             st.download_button(
                 label="📥 Download Rota",
-                data=image_buf,
+                data=lambda df=rota_df: render_table_png(df, dpi=FULL_DPI),
                 file_name=f"rota_{wk}.png",
                 mime="image/png",
                 key=f"download_{wk}"
@@ -131,12 +185,13 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
                 if st.button("📂 Save Changes", key=f"save_{wk}"):
                     original = rota_df.fillna("")
                     new = edited_df.fillna("")
+                    log_entries = []
                     for day in display_days:
                         for pos in POSITIONS:
                             old_val = original.at[day, pos]
                             new_val = new.at[day, pos]
                             if old_val != new_val:
-                                append_to_google_sheet({
+                                log_entries.append({
                                     "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
                                     "admin_id": st.session_state.get("admin_user", "admin"),
                                     "week_start": wk,
@@ -146,15 +201,15 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
                                     "new_value": new_val,
                                     "admin_users": st.session_state.get("admin_user", "admin")
                                 })
+                    append_to_google_sheet(log_entries)
                     rotas[wk] = new.to_dict(orient="index")
                     save_rotas(wk, rotas[wk])
                     st.session_state["feedback"] = f"✅ Rota for {wk} updated."
-                    st.cache_data.clear()
                     st.rerun()
 
             with col2:
                 if st.button("🗑️ Delete Rota", key=f"delete_{wk}_final_unique"):
-                    append_to_google_sheet({
+                    append_to_google_sheet([{
                         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
                         "admin_id": st.session_state.get("admin_user", "admin"),
                         "week_start": wk,
@@ -163,7 +218,7 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
                         "old_value": "Full rota deleted",
                         "new_value": "-",
                         "admin_users": st.session_state.get("admin_user", "admin")
-                    })
+                    }])
                     deleted_rota = delete_rota(wk)
                     archive_deleted_rota(
                         wk,
@@ -171,24 +226,20 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
                     )
                     rotas.pop(wk)
                     st.session_state["feedback"] = f"🗑️ Rota for {wk} deleted."
-                    st.cache_data.clear()
                     st.rerun()
 
+    render_bulk_export(rotas)
+
     st.markdown("<h4 style='margin-top:0;'>🗑️ Deleted Weekly Rotas</h4><hr style='margin-top:0.3em; margin-bottom:1em;'>", unsafe_allow_html=True)
     use_month_filter_deleted = st.checkbox("📅 View deleted by specific month", value=False, key="month_filter_deleted_rotas")
 
+    deleted_index = deleted_week_index(deleted_rotas)
+
     if use_month_filter_deleted:
-        available_months_deleted = sorted(
-            {datetime.strptime(w, "%Y-%m-%d").strftime("%B %Y") for w in deleted_rotas.keys()},
-            reverse=True
-        )
-        selected_month_deleted = st.selectbox("🗓️ Select a Month", available_months_deleted, key="select_month_deleted_rotas")
-        deleted_week_list = sorted([
-            wk for wk in deleted_rotas.keys()
-            if datetime.strptime(wk, "%Y-%m-%d").strftime("%B %Y") == selected_month_deleted
-        ])
+        selected_month_deleted = st.selectbox("🗓️ Select a Month", deleted_index.months(), key="select_month_deleted_rotas")
+        deleted_week_list = deleted_index.in_month(selected_month_deleted)
     else:
-        deleted_week_list = sorted(deleted_rotas.keys(), reverse=True)[:4]
+        deleted_week_list = deleted_index.latest(4)
 
     for wk in deleted_week_list:
         with st.expander(f"🗑️ {wk}"):
@@ -202,8 +253,8 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
 
             rota_df = rota_df.reindex(display_days)[POSITIONS].fillna("")
 
-            image_buf = generate_table_image(rota_df)
-            st.image(image_buf, caption=f"📸 Deleted rota for the week of {wk}", use_container_width=True)
+            preview = render_table_png(rota_df, dpi=PREVIEW_DPI)
+            st.image(BytesIO(preview), caption=f"📸 Deleted rota for the week of {wk}", use_container_width=True)
 
     # Monthly Summary Section
 
@@ -211,25 +262,24 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
     st.markdown("<hr style='margin-top:2em; margin-bottom:2em; border: 2px solid #999;'>", unsafe_allow_html=True)
     st.markdown("<h4 style='margin-top:0;'>📊 Monthly Assignment Summary</h4><hr style='margin-top:0.3em; margin-bottom:1em;'>", unsafe_allow_html=True)
 
-    with st.expander("📈 Recent 4-Week FCI/OFFLINE Load", expanded=True):
+    with st.expander("📈 Recent FCI/OFFLINE Load", expanded=True):
         use_month_filter = st.checkbox("📅 View by specific month", value=False)
+        window_weeks = st.selectbox(
+            "📏 Fairness window",
+            [4, 12, 52],
+            format_func=lambda n: f"Last {n} weeks",
+            key="fairness_window_weeks"
+        )
 
         combined_assignments = defaultdict(dict)
 
         if use_month_filter:
-            available_months = sorted(
-                {datetime.strptime(w, "%Y-%m-%d").strftime("%B %Y") for w in rotas.keys()},
-                reverse=True
-            )
-            selected_month = st.selectbox("🗓️ Select a Month", available_months)
+            selected_month = st.selectbox("🗓️ Select a Month", saved_index.months())
 
-            month_week_keys = [
-                wk for wk in rotas.keys()
-                if datetime.strptime(wk, "%Y-%m-%d").strftime("%B %Y") == selected_month
-            ]
+            month_week_keys = saved_index.in_month(selected_month)
 
             if month_week_keys:
-                first_month_date = min(datetime.strptime(wk, "%Y-%m-%d") for wk in month_week_keys)
+                first_month_date = datetime.strptime(month_week_keys[0], "%Y-%m-%d")
                 additional_weeks = [
                     (first_month_date - timedelta(weeks=i)).strftime("%Y-%m-%d")
                     for i in range(1, 4)
@@ -238,13 +288,22 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
             else:
                 combined_weeks = []
         else:
-            combined_weeks = sorted(rotas.keys(), reverse=True)[:4]
+            combined_weeks = saved_index.latest(4)
 
         if combined_weeks:
             latest_week = max(combined_weeks)
             from core.algorithm import calculate_fairness_summary
-
-            fairness_summary = calculate_fairness_summary(rotas, latest_week, combined_assignments)
+            from core.ledger import get_ledger
+
+            window_keys = saved_index.latest(window_weeks, until=latest_week)
+            fairness_summary = cache.get_or_compute(
+                ("fairness_summary", latest_week, window_weeks),
+                [WEEK_KEYS_SCOPE] + [week_scope(wk) for wk in window_keys],
+                lambda: calculate_fairness_summary(
+                    rotas, latest_week, combined_assignments,
+                    ledger=get_ledger(), window_weeks=window_weeks
+                )
+            )
             df_summary = pd.DataFrame.from_dict(fairness_summary, orient="index")
             df_summary = df_summary.sort_values(by="Total Weighted Score", ascending=False)
             st.dataframe(df_summary, use_container_width=True)
@@ -254,14 +313,14 @@ def render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_de
     st.markdown("<hr style='margin-top:2em; margin-bottom:2em; border: 2px solid #999;'>", unsafe_allow_html=True)
     st.markdown("<h4 style='margin-top:0;'>🗓️ System Activity & Logs</h4><hr style='margin-top:0.3em; margin-bottom:1em;'>", unsafe_allow_html=True)
 
-    logs = fetch_logs_from_google_sheet()
-    if not logs:
+    # Hafta listesi ve seçilen haftanın kayıtları yerel indeksten (ya da tek bir tam okumadan) gelir
+    week_options = fetch_log_weeks()
+    if not week_options:
         st.info("No manual edits recorded.")
     else:
-        df = pd.DataFrame(logs)
-        week_options = sorted(df["week_start"].unique(), reverse=True)
         selected_week = st.selectbox("Select Week", week_options)
-        filtered = df[df["week_start"] == selected_week]
+        week_logs = fetch_logs_from_google_sheet(selected_week)
+        filtered = pd.DataFrame(week_logs, columns=LOG_COLUMNS)
         st.dataframe(filtered[["timestamp", "day", "position", "old_value", "new_value", "admin_users"]])
 
     st.markdown("<hr style='margin-top:1; margin-bottom:1; border: 2px solid black;'>", unsafe_allow_html=True)
@@ -0,0 +1,414 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# benchmarks/load_test.py
+# Concurrent load test of the Streamlit pages.
+#
+#   python benchmarks/load_test.py [--sessions 8] [--flows 80] [--mix homepage=6,admin=2,generate=1]
+#                                  [--backend fake_sheets|mirror|memory] [--latency-ms 50] [--output results.json]
+#
+# Each session is a headless AppTest run in its own thread, so sessions share
+# the process-wide storage backend and caches the way real browser sessions
+# share one Streamlit server. Flows:
+#
+#   homepage  a visitor opening the homepage (display_latest_rota)
+#   admin     an admin opening the panel and listing a month of saved weeks
+#   generate  a planner picking a week, selecting inspectors and saving a rota
+#
+# Sheets calls are counted by a FakeSheetsService and charged to the flow
+# whose script made them; calls from background threads (mirror sync, audit
+# log) are reported separately.
+#
+# The harness drives Streamlit's AppTest internals (runtime, script runner
+# and pages manager), which change between releases; it is written against
+# the streamlit version pinned in benchmarks/requirements.txt and refuses to
+# run on another one.
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic import WEEKDAYS, percentiles, sheet_rows, synthetic_history
+from core.fake_sheets import FakeSheetsService
+
+RESULT_VERSION = 1
+HOMEPAGE = os.path.join(ROOT_DIR, "0_Homepage.py")
+ADMIN_PAGE = "pages/1_Admin Panel.py"
+FLOW_KEY = "_load_test_flow"
+BACKGROUND = "background"
+RUN_TIMEOUT = 120  # seconds for one script run
+DEFAULT_MIX = "homepage=6,admin=2,generate=1"
+BACKENDS = ("fake_sheets", "mirror", "memory")
+STREAMLIT_SERIES = "1.65"  # keep in step with benchmarks/requirements.txt
+
+
+class FlowError(Exception):
+    pass
+
+
+class CountingSheetsService(FakeSheetsService):
+    # Charges each call to the flow tagged in the calling session's state
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.by_flow = defaultdict(Counter)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+            self.by_flow.clear()
+
+    def _call(self, method):
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+        flow = ctx.session_state[FLOW_KEY] if ctx and FLOW_KEY in ctx.session_state else BACKGROUND
+        super()._call(method)
+        with self._lock:
+            self.by_flow[flow][method] += 1
+
+
+# ─── Setup ───
+def load_inspectors():
+    with open(os.path.join(ROOT_DIR, "inspectors.json")) as f:
+        return sorted(json.load(f))
+
+
+def build_backend(name, rotas, latency=0.0, db_dir=None):
+    from core.local_store import SQLiteBackend
+    from core.storage import MemoryBackend, SheetsBackend
+
+    if name == "memory":
+        return MemoryBackend(rotas), None
+    service = CountingSheetsService(latency=latency)
+    service.worksheet("rota_data").rows = sheet_rows(rotas)
+    sheets = SheetsBackend(service.worksheet)
+    if name == "fake_sheets":
+        return sheets, service
+    backend = SQLiteBackend(os.path.join(db_dir, "load_test.sqlite3"), upstream=sheets)
+    backend.start()
+    return backend, service
+
+
+class LoadContext:
+    def __init__(self, rotas, inspectors, next_week, seed):
+        from core.week_index import WeekIndex
+
+        self.inspectors = inspectors
+        self.months = WeekIndex(rotas).months()
+        self.next_monday = datetime.strptime(next_week, "%Y-%m-%d").date()
+        self._weeks = itertools.count()
+        self._lock = threading.Lock()
+        self.rng = random.Random(seed)
+
+    def new_week(self):
+        # Every generate flow plans its own future week so saves never collide
+        with self._lock:
+            return self.next_monday + timedelta(weeks=next(self._weeks))
+
+    def pick(self, seq):
+        with self._lock:
+            return self.rng.choice(seq)
+
+    def sample(self, seq, k):
+        with self._lock:
+            return self.rng.sample(seq, k)
+
+
+@contextmanager
+def _concurrent_apptest():
+    # AppTest is written for one run at a time. Each run installs a mock
+    # Runtime and a patched config.get_option as process globals and restores
+    # them when it finishes, and resets the class-wide "uses pages directory"
+    # flag the script runner reads; all of that pulls the ground out from
+    # under any run still going in another session. While the load test runs,
+    # keep the last runtime available, keep reporting global.appTest and pin
+    # the flag to its value for the homepage, then restore everything.
+    #
+    # Each run also gets a fresh script cache, so every run re-parses the page
+    # scripts, and Python 3.11's parser is not safe to call from several
+    # threads at once. Share one cache, as a real server does.
+    from streamlit import config
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner import script_runner
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.testing.v1.util import build_mock_config_get_option
+
+    class PinnedPagesManager(PagesManager):
+        uses_pages_directory = os.path.isdir(os.path.join(ROOT_DIR, "pages"))
+
+    original = Runtime.__dict__["instance"]
+    last = {"runtime": None}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+        runtime = cls._instance or last["runtime"]
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return runtime
+
+    original_get_option = config.get_option
+    Runtime.instance = classmethod(instance)
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+    script_runner.PagesManager = PinnedPagesManager
+    shared_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: shared_cache
+    try:
+        yield
+    finally:
+        Runtime.instance = original
+        config.get_option = original_get_option
+        script_runner.PagesManager = PagesManager
+        app_test.ScriptCache = local_script_runner.ScriptCache = ScriptCache
+
+
+# ─── Flows ───
+def _app(flow, page=None, **state):
+    # Every session starts from the homepage script and reaches other pages
+    # with switch_page, as in the browser
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(HOMEPAGE, default_timeout=RUN_TIMEOUT)
+    if page:
+        at.switch_page(page)
+    at.session_state[FLOW_KEY] = flow
+    for key, value in state.items():
+        at.session_state[key] = value
+    return at
+
+
+def _run(at):
+    at.run()
+    if at.exception:
+        raise FlowError(at.exception[0].message)
+    return at
+
+
+def flow_homepage(ctx):
+    _run(_app("homepage"))
+
+
+def flow_admin(ctx):
+    at = _run(_app("admin", ADMIN_PAGE, is_admin=True, admin_user="admin"))
+    at.checkbox(key="month_filter_saved_rotas").check()
+    _run(at)
+    at.selectbox(key="select_month_saved_rotas").set_value(ctx.pick(ctx.months))
+    _run(at)
+
+
+def flow_generate(ctx):
+    at = _run(_app("generate", is_planner=True))
+    at.date_input[0].set_value(ctx.new_week())
+    _run(at)
+    crews = {day: ctx.sample(ctx.inspectors, 6) for day in WEEKDAYS}
+    for day, crew in crews.items():
+        at.multiselect(key=day).set_value(crew)
+    _run(at)
+    for day, crew in crews.items():
+        at.selectbox(key=day + "_head").set_value(crew[0])
+    _run(at)
+    generate = next((b for b in at.button if b.label == "Generate Rota"), None)
+    if generate is None:
+        raise FlowError("Generate Rota button not shown")
+    generate.click()
+    _run(at)
+    if at.error:
+        # An infeasible random crew is a planner outcome, not a harness failure
+        return "infeasible"
+
+
+FLOWS = {"homepage": flow_homepage, "admin": flow_admin, "generate": flow_generate}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in FLOWS:
+            raise ValueError(f"unknown flow: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _drain(store, timeout=60):
+    # Seconds until the mirror's outbox is empty, i.e. every write reached Sheets
+    if not hasattr(store, "sync_metrics"):
+        return None
+    start = time.perf_counter()
+    while store.sync_metrics()["queue_depth"] and time.perf_counter() - start < timeout:
+        time.sleep(0.05)
+    return time.perf_counter() - start
+
+
+# ─── Driver ───
+def _session(ctx, plan, results, lock):
+    # One simulated browser session working through its share of the flows
+    for flow in plan:
+        start = time.perf_counter()
+        outcome, error = "ok", None
+        try:
+            outcome = FLOWS[flow](ctx) or "ok"
+        except Exception as e:
+            outcome, error = "error", f"{type(e).__name__}: {e}"
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            results[flow].append((elapsed, outcome, error))
+
+
+def run_load(sessions=8, flows=80, mix=None, backend="fake_sheets", latency=0.0, years=3, seed=8216):
+    from core import ledger
+    from core.cache import cache
+    from core.storage import set_backend
+
+    mix = mix or parse_mix(DEFAULT_MIX)
+    inspectors = load_inspectors()
+    rotas, _, next_week = synthetic_history(years=years, names=inspectors, seed=seed)
+    ctx = LoadContext(rotas, inspectors, next_week, seed)
+
+    rng = random.Random(seed)
+    names, weights = zip(*mix.items())
+    schedule = rng.choices(names, weights=weights, k=flows)
+    plans = [schedule[i::sessions] for i in range(sessions)]
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        store, service = build_backend(backend, rotas, latency=latency, db_dir=db_dir)
+        set_backend(store)
+        # Saves go to the temp dir, never to the real ./fairness_ledger.json
+        ledger_file, ledger.LEDGER_FILE = ledger.LEDGER_FILE, os.path.join(db_dir, "fairness_ledger.json")
+        ledger._ledger = ledger.FairnessLedger.from_rotas(rotas)
+        cache.clear()
+        results, lock = defaultdict(list), threading.Lock()
+        try:
+            with _concurrent_apptest():
+                # One untimed pass of each flow loads the lazy imports and compiles the pages
+                _session(ctx, list(mix), defaultdict(list), lock)
+                if service:
+                    service.reset_stats()
+                rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as pool:
+                    for future in [pool.submit(_session, ctx, plan, results, lock) for plan in plans]:
+                        future.result()
+                wall = time.perf_counter() - started
+            drain = _drain(store)
+        finally:
+            # The next get_backend() / get_ledger() load the configured ones again
+            set_backend(None)
+            ledger._ledger = None
+            ledger.LEDGER_FILE = ledger_file
+            cache.clear()
+
+    report = {}
+    for flow, samples in sorted(results.items()):
+        calls = service.by_flow.get(flow, Counter()) if service else Counter()
+        outcomes = Counter(outcome for _, outcome, _ in samples)
+        report[flow] = {
+            "runs": len(samples),
+            "outcomes": dict(outcomes),
+            "errors": sorted({error for _, _, error in samples if error})[:5],
+            "latency": percentiles([ms for ms, _, _ in samples]),
+            "sheets_calls": {
+                "per_flow": sum(calls.values()) / len(samples),
+                "by_method": dict(calls),
+            },
+        }
+    return {
+        "version": RESULT_VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "config": {"sessions": sessions, "flows": flows, "mix": mix, "backend": backend,
+                   "latency_ms": latency * 1000, "weeks": len(rotas), "seed": seed},
+        "wall_seconds": wall,
+        "mirror_drain_seconds": drain,
+        "throughput_per_second": flows / wall if wall else None,
+        "flows": report,
+        "background_sheets_calls": dict(service.by_flow.get(BACKGROUND, Counter())) if service else {},
+        "total_sheets_calls": sum(sum(c.values()) for c in service.by_flow.values()) if service else 0,
+        # ru_maxrss is in KB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rss_growth_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+    }
+
+
+def summary(results):
+    config = results["config"]
+    lines = [
+        f"{config['sessions']} sessions, {config['flows']} flows on {config['backend']} "
+        f"({config['weeks']} weeks, {config['latency_ms']:.0f} ms per Sheets call): "
+        f"{results['wall_seconds']:.1f}s, {results['throughput_per_second']:.1f} flows/s, "
+        f"peak RSS {results['peak_rss_mb']:.0f} MB",
+        f"{'flow':<10}{'runs':>6}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'Sheets calls':>15}",
+    ]
+    for flow, r in results["flows"].items():
+        lat = r["latency"]
+        lines.append(
+            f"{flow:<10}{r['runs']:>6}{r['outcomes'].get('error', 0):>8}"
+            f"{lat['p50_ms']:>8.0f}ms{lat['p95_ms']:>8.0f}ms{lat['p99_ms']:>8.0f}ms"
+            f"{r['sheets_calls']['per_flow']:>15.1f}"
+        )
+    if results["background_sheets_calls"]:
+        lines.append(f"background Sheets calls: {sum(results['background_sheets_calls'].values())}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the Streamlit pages with concurrent headless sessions.")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--flows", type=int, default=80, help="total flows across all sessions")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="relative flow weights, e.g. homepage=6,admin=2,generate=1")
+    parser.add_argument("--backend", default="fake_sheets")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency of each Sheets call")
+    parser.add_argument("--years", type=int, default=3, help="years of synthetic history to load")
+    parser.add_argument("--seed", type=int, default=8216)
+    parser.add_argument("--output", help="also write the JSON results here")
+    args = parser.parse_args(argv)
+
+    if args.backend not in BACKENDS:
+        parser.error(f"unknown backend: {args.backend}; choose from {', '.join(BACKENDS)}")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    import streamlit
+
+    if streamlit.__version__.split(".")[:2] != STREAMLIT_SERIES.split("."):
+        parser.error(
+            f"streamlit {streamlit.__version__} is installed but the harness needs {STREAMLIT_SERIES}.*; "
+            "install benchmarks/requirements.txt"
+        )
+
+    os.chdir(ROOT_DIR)  # the pages load assets and inspectors.json relative to the app root
+    results = run_load(args.sessions, args.flows, mix, args.backend, args.latency_ms / 1000, args.years, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    print(summary(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
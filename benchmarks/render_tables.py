@@ -0,0 +1,108 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# benchmarks/render_tables.py
+# Side-by-side benchmark of the rota table image renderers.
+#
+#   python benchmarks/render_tables.py [--weeks 20] [--dpi 100 300]
+#
+# Each renderer runs in its own interpreter so import time and peak RSS are
+# measured from a cold start and don't leak into each other.
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+NAMES = [f"Inspector {chr(65 + i)}" for i in range(12)]
+
+
+def synthetic_weeks(n, seed=8216):
+    import pandas as pd
+
+    rng = random.Random(seed)
+    return [
+        pd.DataFrame(
+            [[rng.choice(NAMES) for _ in POSITIONS] for _ in DAYS],
+            index=DAYS, columns=POSITIONS,
+        )
+        for _ in range(n)
+    ]
+
+
+def run_one(renderer, weeks, dpis):
+    # Runs inside the child interpreter; prints one JSON line
+    weeks_df = synthetic_weeks(weeks)
+    start = time.perf_counter()
+    from core.utils import generate_table_image
+    generate_table_image(weeks_df[0], title="warm-up", dpi=dpis[0], renderer=renderer)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    per_dpi = {}
+    for dpi in dpis:
+        start = time.perf_counter()
+        total_bytes = 0
+        for i, df in enumerate(weeks_df):
+            total_bytes += len(generate_table_image(df, title=f"Week {i}", dpi=dpi, renderer=renderer).getvalue())
+        elapsed = time.perf_counter() - start
+        per_dpi[str(dpi)] = {"ms_per_image": elapsed * 1000 / weeks, "avg_png_kb": total_bytes / weeks / 1024}
+
+    print(json.dumps({
+        "renderer": renderer,
+        "first_image_ms": first_ms,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "dpi": per_dpi,
+    }))
+
+
+def main(argv=None):
+    from core.utils import IMAGE_RENDERERS
+
+    parser = argparse.ArgumentParser(description="Benchmark the rota table image renderers.")
+    parser.add_argument("--weeks", type=int, default=20)
+    parser.add_argument("--dpi", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--only", choices=IMAGE_RENDERERS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.only:
+        run_one(args.only, args.weeks, args.dpi)
+        return 0
+
+    results = []
+    for renderer in IMAGE_RENDERERS:
+        out = subprocess.run(
+            [sys.executable, __file__, "--only", renderer, "--weeks", str(args.weeks), "--dpi", *map(str, args.dpi)],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{args.weeks} weeks per resolution\n")
+    print(f"{'renderer':<12}{'first image':>14}{'peak RSS':>12}" + "".join(f"{f'{dpi} dpi':>14}{'PNG':>10}" for dpi in args.dpi))
+    for r in results:
+        row = f"{r['renderer']:<12}{r['first_image_ms']:>11.0f} ms{r['peak_rss_mb']:>9.0f} MB"
+        for dpi in args.dpi:
+            d = r["dpi"][str(dpi)]
+            row += f"{d['ms_per_image']:>11.1f} ms{d['avg_png_kb']:>7.0f} KB"
+        print(row)
+
+    by_name = {r["renderer"]: r for r in results}
+    print()
+    for dpi in args.dpi:
+        ratio = by_name["matplotlib"]["dpi"][str(dpi)]["ms_per_image"] / by_name["pil"]["dpi"][str(dpi)]["ms_per_image"]
+        print(f"pil is {ratio:.1f}x faster than matplotlib at {dpi} dpi")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# benchmarks/suite.py
+# Performance benchmarks over synthetic histories.
+#
+#   python benchmarks/suite.py [--scenario small large ...] [--repeats 30] [--output results.json]
+#
+# For each scenario in benchmarks/synthetic.py this times rota generation,
+# fairness scoring, load_rotas parsing, the compact history store, table
+# images and the save/delete paths against core.fake_sheets, and writes the results as JSON so runs on
+# different versions can be diffed.
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic import POSITIONS, SCENARIOS, percentiles, scenario, sheet_rows, week_keys, week_request
+
+RESULT_VERSION = 1
+# The week search filters its all-different groups, so tight weeks settle in
+# a few hundred tried values; this cap only guards the benchmark against a
+# regression and reports such a week as abandoned
+MAX_SOLVER_NODES = 50_000
+
+
+class SearchAbandoned(Exception):
+    pass
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+@contextmanager
+def _count_solver_nodes(max_nodes=MAX_SOLVER_NODES):
+    # Swap in a WeekSolver that remembers how many values each search tried
+    from core import algorithm
+
+    solvers = []
+    original = algorithm.WeekSolver
+
+    class CountingSolver(original):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            solvers.append(self)
+
+        def assign(self, slot, value):
+            if self.nodes > max_nodes:
+                raise SearchAbandoned
+            return super().assign(slot, value)
+
+    algorithm.WeekSolver = CountingSolver
+    try:
+        yield solvers
+    finally:
+        algorithm.WeekSolver = original
+
+
+# ─── Benchmarks ───
+def bench_generate_rota(rotas, names, week_key, config, repeats, rng):
+    from core import algorithm
+    from core.ledger import FairnessLedger
+
+    ledger, ledger_ms = _timed(FairnessLedger.from_rotas, rotas)
+    latencies, nodes, succeeded, rejected, abandoned = [], [], 0, 0, 0
+    with _count_solver_nodes() as solvers:
+        for _ in range(repeats):
+            daily_workers, daily_heads = week_request(rng, names, config["saturday"], config["staffing"])
+            searches = len(solvers)
+            start = time.perf_counter()
+            try:
+                rota = algorithm.generate_rota(daily_workers, daily_heads, rotas, names, week_key, ledger=ledger)
+                succeeded += "error" not in rota
+                # Weeks the feasibility pre-check turns down never reach the solver
+                rejected += "diagnostics" in rota
+            except SearchAbandoned:
+                abandoned += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+            nodes.append(solvers[-1].nodes if len(solvers) > searches else 0)
+    return {
+        "ledger_build_ms": ledger_ms,
+        "success_rate": succeeded / repeats,
+        "rejected_by_precheck": rejected,
+        "abandoned": abandoned,
+        "attempts": {"mean": sum(nodes) / len(nodes), "max": max(nodes), "limit": MAX_SOLVER_NODES},
+        "latency": percentiles(latencies),
+    }
+
+
+def bench_fairness_scores(rotas, week_key, repeats):
+    from core.algorithm import calculate_fairness_scores
+    from core.ledger import FairnessLedger
+
+    ledger = FairnessLedger.from_rotas(rotas)
+    with_ledger = [_timed(calculate_fairness_scores, rotas, week_key, {}, ledger=ledger)[1] for _ in range(repeats)]
+    # Without a ledger every call rebuilds the history grid from the rotas
+    scan_repeats = max(1, repeats // 10)
+    from_rotas = [_timed(calculate_fairness_scores, rotas, week_key, {})[1] for _ in range(scan_repeats)]
+    return {"ledger": percentiles(with_ledger), "history_scan": percentiles(from_rotas)}
+
+
+def bench_load_rotas(rotas, repeats):
+    from core.data_utils import load_rotas
+    from core.fake_sheets import FakeSheetsService
+
+    sheet = FakeSheetsService().worksheet("rota_data")
+    sheet.rows = sheet_rows(rotas)
+    samples = [_timed(load_rotas, sheet)[1] for _ in range(max(1, repeats // 5))]
+    return {"rows": len(sheet.rows) - 1, "latency": percentiles(samples)}
+
+
+def bench_history_store(rotas, week_key, repeats):
+    from core.data_utils import load_rotas
+    from core.fairness import HistoryGrid
+    from core.fake_sheets import FakeSheetsService
+    from core.history import HistoryStore
+
+    sheet = FakeSheetsService().worksheet("rota_data")
+    rows = sheet_rows(rotas)
+
+    def parse():
+        # Every cell gets its own string object, as when gspread parses the API
+        # response; only what the parsed history keeps is left allocated
+        sheet.rows = [[cell.encode().decode() for cell in row] for row in rows]
+        try:
+            return load_rotas(sheet)
+        finally:
+            sheet.rows = []
+
+    def allocated(build):
+        tracemalloc.start()
+        try:
+            value = build()
+            return value, tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    loaded, dict_bytes = allocated(parse)
+    store, store_bytes = allocated(lambda: HistoryStore.from_rotas(loaded))
+    return {
+        "dict_mb": dict_bytes / 1e6,
+        "store_mb": store_bytes / 1e6,
+        "window_scan": {
+            # Without a ledger the dicts are re-encoded into a grid on every call
+            "dict": percentiles([_timed(lambda: HistoryGrid(loaded).window_counts(week_key, 4))[1] for _ in range(max(1, repeats // 10))]),
+            "store": percentiles([_timed(store.window_counts, week_key, 4)[1] for _ in range(repeats)]),
+        },
+        "copy": {
+            "dict": percentiles([_timed(dict, loaded)[1] for _ in range(repeats)]),
+            "store": percentiles([_timed(store.copy)[1] for _ in range(repeats)]),
+        },
+    }
+
+
+def bench_table_image(rotas, repeats, dpis=(100, 300)):
+    import pandas as pd
+    from core.utils import IMAGE_RENDERER, generate_table_image
+
+    weeks = [rotas[wk] for wk in sorted(rotas)[-repeats:]]
+    frames = [pd.DataFrame.from_dict(week, orient="index").reindex(columns=POSITIONS) for week in weeks]
+    generate_table_image(frames[0], dpi=dpis[0])  # font loading and imports
+    return {
+        "renderer": IMAGE_RENDERER,
+        "dpi": {str(dpi): percentiles([_timed(generate_table_image, df, dpi=dpi)[1] for df in frames]) for dpi in dpis},
+    }
+
+
+def bench_save_delete(rotas, week_key, repeats, rng):
+    from core.data_utils import delete_rota, save_rotas
+    from core.fake_sheets import FakeSheetsService
+
+    service = FakeSheetsService()
+    sheet = service.worksheet("rota_data")
+    sheet.rows = sheet_rows(rotas)
+    saved = sorted(rotas)
+    # Any saved week has the right shape to write back
+    week = rotas[saved[-1]]
+
+    def measure(fn, *args):
+        before = service.total_calls
+        _, ms = _timed(fn, *args, sheet=sheet)
+        return ms, service.total_calls - before
+
+    results = {"append": [], "update": [], "delete": []}
+    for new_week in week_keys(repeats, first=datetime.strptime(week_key, "%Y-%m-%d").date()):
+        results["append"].append(measure(save_rotas, new_week, week))
+        results["update"].append(measure(save_rotas, rng.choice(saved), week))
+        target = saved.pop(rng.randrange(len(saved)))
+        results["delete"].append(measure(delete_rota, target))
+
+    return {
+        op: {"latency": percentiles([ms for ms, _ in samples]), "sheets_calls": max(calls for _, calls in samples)}
+        for op, samples in results.items()
+    }
+
+
+def run_scenario(name, repeats, seed):
+    config = SCENARIOS[name]
+    (rotas, names, week_key), build_ms = _timed(scenario, name, seed)
+    rng = random.Random(seed)
+    return {
+        "config": config,
+        "weeks": len(rotas),
+        "history_build_ms": build_ms,
+        "generate_rota": bench_generate_rota(rotas, names, week_key, config, repeats, rng),
+        "calculate_fairness_scores": bench_fairness_scores(rotas, week_key, repeats),
+        "load_rotas": bench_load_rotas(rotas, repeats),
+        "history_store": bench_history_store(rotas, week_key, repeats),
+        "generate_table_image": bench_table_image(rotas, min(repeats, 10)),
+        "save_delete": bench_save_delete(rotas, week_key, min(repeats, 10), rng),
+    }
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(names, repeats=30, seed=8216):
+    return {
+        "version": RESULT_VERSION,
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "scenarios": {name: run_scenario(name, repeats, seed) for name in names},
+    }
+
+
+def summary(results):
+    lines = []
+    for name, r in results["scenarios"].items():
+        gen = r["generate_rota"]
+        lines.append(
+            f"{name:<12} {r['weeks']:>4} weeks  generate p50 {gen['latency']['p50_ms']:7.1f} ms "
+            f"p95 {gen['latency']['p95_ms']:7.1f} ms  success {gen['success_rate']:4.0%} "
+            f"(rejected {gen['rejected_by_precheck']}, abandoned {gen['abandoned']})  "
+            f"fairness {r['calculate_fairness_scores']['ledger']['p50_ms']:6.2f} ms  "
+            f"load_rotas {r['load_rotas']['latency']['p50_ms']:7.1f} ms  "
+            f"history {r['history_store']['dict_mb']:5.1f} -> {r['history_store']['store_mb']:4.2f} MB  "
+            f"save {r['save_delete']['update']['latency']['p50_ms']:6.1f} ms  "
+            f"delete {r['save_delete']['delete']['latency']['p50_ms']:6.1f} ms"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the rota planner on synthetic histories.")
+    parser.add_argument("--scenario", nargs="+", default=list(SCENARIOS))
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=8216)
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenario if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+
+    results = run(args.scenario, args.repeats, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(summary(results))
+    else:
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
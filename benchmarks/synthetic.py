@@ -0,0 +1,104 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# benchmarks/synthetic.py
+# Synthetic rota history and week requests for the benchmarks.
+#
+# Everything is driven by a seeded random.Random, so the same scenario always
+# produces the same history and the same planning requests.
+
+import random
+from datetime import date, timedelta
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+WORK_POSITIONS = [pos for pos in POSITIONS if pos != "HEAD"]
+# Inspectors available to a week: "tight" is exactly one day's crew, so the same
+# six people cover every day; "loose" spreads six-a-day over a wider pool
+STAFFING = {"tight": 6, "loose": 9}
+
+SCENARIOS = {
+    "small": {"years": 2, "inspectors": 15, "saturday": False, "staffing": "loose"},
+    "small-tight": {"years": 2, "inspectors": 15, "saturday": False, "staffing": "tight"},
+    "medium": {"years": 5, "inspectors": 60, "saturday": True, "staffing": "loose"},
+    # Six days from six people only works if each of them is HEAD exactly once,
+    # so most of these weeks are infeasible: this measures how fast we say so
+    "weekend-tight": {"years": 3, "inspectors": 30, "saturday": True, "staffing": "tight"},
+    "large": {"years": 10, "inspectors": 500, "saturday": False, "staffing": "loose"},
+    "large-tight": {"years": 10, "inspectors": 500, "saturday": False, "staffing": "tight"},
+}
+
+
+def inspector_names(n):
+    return [f"Inspector {i:03d}" for i in range(1, n + 1)]
+
+
+def week_keys(n_weeks, first=date(2020, 1, 6)):
+    # Consecutive Mondays ending with the returned "next" week to plan
+    return [(first + timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(n_weeks)]
+
+
+def week_request(rng, names, saturday=False, staffing="loose"):
+    """Day selections as the planner page produces them: (daily_workers, daily_heads)."""
+    days = WEEKDAYS + ["Saturday"] if saturday else list(WEEKDAYS)
+    pool = rng.sample(names, min(len(names), STAFFING[staffing]))
+    daily_workers, daily_heads = {}, {}
+    for day in days:
+        crew = rng.sample(pool, 6)
+        daily_heads[day] = crew[0]
+        daily_workers[day] = crew[1:]
+    return daily_workers, daily_heads
+
+
+def random_week(rng, daily_workers, daily_heads):
+    # A plausible saved week; history doesn't need to satisfy the solver's rules
+    week = {}
+    for day, workers in daily_workers.items():
+        shuffled = rng.sample(workers, len(workers))
+        week[day] = {"HEAD": daily_heads[day], **dict(zip(WORK_POSITIONS, shuffled))}
+    return week
+
+
+def synthetic_history(years=2, inspectors=15, saturday=False, staffing="loose", seed=8216, names=None):
+    """Return (rotas, names, next_week_key) for a history of `years` years of weeks."""
+    rng = random.Random(seed)
+    names = list(names) if names else inspector_names(inspectors)
+    keys = week_keys(52 * years + 1)
+    rotas = {
+        wk: random_week(rng, *week_request(rng, names, saturday, staffing))
+        for wk in keys[:-1]
+    }
+    return rotas, names, keys[-1]
+
+
+def scenario(name, seed=8216):
+    return synthetic_history(seed=seed, **SCENARIOS[name])
+
+
+def sheet_rows(rotas):
+    # The rota_data sheet as load_rotas reads it: header plus one row per day
+    rows = [["week_start", "day"] + POSITIONS]
+    for wk in sorted(rotas):
+        for day, roles in rotas[wk].items():
+            rows.append([wk, day] + [roles.get(pos, "") for pos in POSITIONS])
+    return rows
+
+
+def percentiles(samples_ms):
+    if not samples_ms:
+        return {"n": 0}
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "n": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1],
+    }
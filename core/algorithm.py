@@ -6,80 +6,40 @@
 from collections import defaultdict
 from datetime import datetime, timedelta
 import random
-import streamlit as st
-from math import log
-
-st.cache_data.clear()
+from core.fairness import HistoryGrid, iter_scores
+from core.feasibility import MIN_DAYS, SAME_DAY_BLOCK, diagnose
+from core.history import HistoryStore
+from core.ledger import FairnessLedger, count_week
+from core.solver import WeekSolver
 
 POSITIONS = ["CAR1", "CAR2", "OFFAL", "FCI", "OFFLINE"]
-DEFAULT_ATTEMPTS = 1000
 MIN_REQUIRED_DAYS_FOR_FCI_OFFLINE = 2
-
-# Fairness scores based on how many easy (reward) roles the person received relative to their total work days
-def calculate_fairness_scores(rotas, current_week_key, current_week_assignments):
-    from collections import defaultdict
-    from datetime import datetime
-
-    past_fci_count = defaultdict(int)
-    past_offline_count = defaultdict(int)
-    past_day_count = defaultdict(int)
-
-    all_weeks = sorted(rotas.keys(), reverse=True)
-    current_date = datetime.strptime(current_week_key, "%Y-%m-%d")
-    parsed_weeks = [w for w in all_weeks if datetime.strptime(w, "%Y-%m-%d") <= current_date]
-    past_weeks = parsed_weeks[:4]
-
-    # 1️⃣ Geçmiş 4 haftalık günleri say
-    for week_key in past_weeks:
-        week_data = rotas.get(week_key, {})
-        for day_data in week_data.values():
-            for role, person in day_data.items():
-                if person and person != "Not Working":
-                    past_day_count[person] += 1
-                    if role == "FCI":
-                        past_fci_count[person] += 1
-                    elif role == "OFFLINE":
-                        past_offline_count[person] += 1
+FAIRNESS_WINDOW_WEEKS = 4
+
+# Past-window counts plus the week being planned, as {inspector: [days, fci, offline]}
+def _window_counts(rotas, current_week_key, current_week_assignments, ledger, window_weeks):
+    # 1️⃣ Geçmiş haftalar — ledger varsa iki prefix satırının farkı
+    if ledger is not None and ledger.covers(rotas):
+        counts = ledger.window(current_week_key, window_weeks)
+    elif isinstance(rotas, HistoryStore):
+        counts = rotas.window_counts(current_week_key, window_weeks)
+    else:
+        counts = HistoryGrid(rotas).window_counts(current_week_key, window_weeks)
 
     # 2️⃣ Bu haftaki görevleri de dahil et
-    for day, assignments in current_week_assignments.items():
-        for role, person in assignments.items():
-            if person and person != "Not Working":
-                past_day_count[person] += 1
-                if role == "FCI":
-                    past_fci_count[person] += 1
-                elif role == "OFFLINE":
-                    past_offline_count[person] += 1
-
-    TARGET_RATIO_FCI = 0.2
-    TARGET_RATIO_OFFLINE = 0.2
-
-    fairness_scores = {}
-    all_inspectors = set(past_day_count) | set(past_fci_count) | set(past_offline_count)
-
-    for inspector in all_inspectors:
-        days = past_day_count[inspector]
-        fci = past_fci_count[inspector]
-        offline = past_offline_count[inspector]
-
-        if days < 4:
-            fci_score = 0
-            offline_score = 0
-            total_score = 0
-        else:
-            fci_ratio = fci / days
-            offline_ratio = offline / days
-
-            effort_multiplier = 1 + (days / 5)
+    for person, (days, fci, offline) in count_week(current_week_assignments).items():
+        row = counts.setdefault(person, [0, 0, 0])
+        row[0] += days
+        row[1] += fci
+        row[2] += offline
 
-            base_fci_score = max(0, (TARGET_RATIO_FCI - fci_ratio) * 10)
-            base_offline_score = max(0, (TARGET_RATIO_OFFLINE - offline_ratio) * 10)
+    return counts
 
-            fci_score = round(base_fci_score * effort_multiplier, 2)
-            offline_score = round(base_offline_score * effort_multiplier, 2)
-            total_score = round(fci_score + offline_score, 2)
-
-        fairness_scores[inspector] = {
+# Fairness scores based on how many easy (reward) roles the person received relative to their total work days
+def calculate_fairness_scores(rotas, current_week_key, current_week_assignments, ledger=None, window_weeks=FAIRNESS_WINDOW_WEEKS):
+    counts = _window_counts(rotas, current_week_key, current_week_assignments, ledger, window_weeks)
+    return {
+        inspector: {
             "Days": days,
             "FCI": fci,
             "OFFLINE": offline,
@@ -87,8 +47,8 @@ def calculate_fairness_scores(rotas, current_week_key, current_week_assignments)
             "OFFLINE_score": offline_score,
             "Total Weighted Score": total_score
         }
-
-    return fairness_scores
+        for inspector, days, fci, offline, fci_score, offline_score, total_score in iter_scores(counts)
+    }
 
 
 
@@ -107,8 +67,19 @@ def get_last_week_same_day_restrictions(rotas, current_week_key):
 
     return restrictions
 
+# En iyi 3 FCI/Offline skoruna sahip kişileri belirle (bu hafta çalışanlar arasından)
+def get_top_fairness_candidates(fairness_scores, worker_days, n=3):
+    all_scores = defaultdict(float)
+    for person in fairness_scores:
+        all_scores[person] = fairness_scores[person].get("FCI_score", 0) + fairness_scores[person].get("OFFLINE_score", 0)
+    top = sorted(all_scores, key=all_scores.get, reverse=True)[:n]
+    return [p for p in top if worker_days.get(p, 0) > 0]
+
 # Main rota generator
-def generate_rota(daily_workers, daily_heads, rotas, inspectors, week_key):
+# optimal=True skips the random ordering and returns the single rota whose
+# FCI/OFFLINE assignments maximise the total fairness score for the whole week
+# (the best one found within the solver's MINIMIZE_NODES budget)
+def generate_rota(daily_workers, daily_heads, rotas, inspectors, week_key, optimal=False, ledger=None):
     all_days = list(daily_workers.keys())
     worker_days = defaultdict(int)
     current_week_assignments = {}
@@ -118,140 +89,105 @@ def generate_rota(daily_workers, daily_heads, rotas, inspectors, week_key):
         for worker in daily_workers[day]:
             worker_days[worker] += 1
 
-    fairness_scores = calculate_fairness_scores(rotas, week_key, current_week_assignments)
+    fairness_scores = calculate_fairness_scores(rotas, week_key, current_week_assignments, ledger=ledger)
     same_day_block = get_last_week_same_day_restrictions(rotas, week_key)
 
-    # En iyi 3 FCI/Offline skoruna sahip kişileri belirle
-    all_scores = defaultdict(float)
-    for person in fairness_scores:
-        all_scores[person] = fairness_scores[person].get("FCI_score", 0) + fairness_scores[person].get("OFFLINE_score", 0)
-    top3 = sorted(all_scores, key=all_scores.get, reverse=True)[:3]
-    top3 = [p for p in top3 if worker_days[p] > 0]
-
-    for attempt in range(DEFAULT_ATTEMPTS):
-        used = defaultdict(list)
-        rota_table = {}
-        fci_offline_count = defaultdict(int)
-        assigned_top3 = set()
-        success = True
-
-        for day in all_days:
-            day_workers = daily_workers[day][:]
-            head = daily_heads[day]
-            if head in day_workers:
-                day_workers.remove(head)
-            random.shuffle(day_workers)
-
-            assignments = {"HEAD": head}
-            current_week_assignments[day].update(assignments)
-            available = set(day_workers)
-
-            for pos in POSITIONS:
-                eligible = [w for w in day_workers if pos not in used[w]]
-                if pos in ["FCI", "OFFLINE"]:
-                    eligible = [w for w in eligible if worker_days[w] >= MIN_REQUIRED_DAYS_FOR_FCI_OFFLINE]
-                    eligible = sorted(
-                        eligible,
-                        key=lambda w: -fairness_scores.get(w, {}).get(f"{pos}_score", 0) + random.random() * 0.01
-                    )
-                else:
-                    random.shuffle(eligible)
-
-                for candidate in eligible:
-                    if candidate in available:
-                        if pos == "FCI" and fci_offline_count.get((candidate, "FCI"), 0) >= 1:
-                            continue
-                        if pos == "OFFLINE" and fci_offline_count.get((candidate, "OFFLINE"), 0) >= 1:
-                            continue
-                        if same_day_block.get(day, {}).get(pos) == candidate:
-                            continue
-                        assignments[pos] = candidate
-                        used[candidate].append(pos)
-                        if pos in ["FCI", "OFFLINE"]:
-                            fci_offline_count[(candidate, pos)] += 1
-                        available.remove(candidate)
-                        if candidate in top3:
-                            assigned_top3.add(candidate)
-                        break
-                else:
-                    success = False
-                    break
-
-            if not success:
-                break
-
-            rota_table[day] = assignments
-            current_week_assignments[day] = assignments
-
-        if success and assigned_top3.issuperset(top3):
-            return rota_table
-
-    return {"error": f"Could not generate rota without conflicts after {DEFAULT_ATTEMPTS} attempts."}
-
-def calculate_fairness_summary(rotas, current_week_key, current_week_assignments):
-    from collections import defaultdict
-    from datetime import datetime
-
-    past_fci_count = defaultdict(int)
-    past_offline_count = defaultdict(int)
-    past_day_count = defaultdict(int)
-
-    all_weeks = sorted(rotas.keys(), reverse=True)
-    current_date = datetime.strptime(current_week_key, "%Y-%m-%d")
-    parsed_weeks = [w for w in all_weeks if datetime.strptime(w, "%Y-%m-%d") <= current_date]
-    past_weeks = parsed_weeks[:4]
-
-    # 1️⃣ Geçmiş 4 haftayı say
-    for week_key in past_weeks:
-        week_data = rotas.get(week_key, {})
-        for day_data in week_data.values():
-            for role, person in day_data.items():
-                if person and person != "Not Working":
-                    past_day_count[person] += 1
-                    if role == "FCI":
-                        past_fci_count[person] += 1
-                    elif role == "OFFLINE":
-                        past_offline_count[person] += 1
+    top3 = get_top_fairness_candidates(fairness_scores, worker_days)
 
-    # 2️⃣ Bu haftayı da ekle
-    for day, assignments in current_week_assignments.items():
-        for role, person in assignments.items():
-            if person and person != "Not Working":
-                past_day_count[person] += 1
-                if role == "FCI":
-                    past_fci_count[person] += 1
-                elif role == "OFFLINE":
-                    past_offline_count[person] += 1
-
-    TARGET_RATIO_FCI = 0.2
-    TARGET_RATIO_OFFLINE = 0.2
-
-    summary = {}
-    all_inspectors = set(past_day_count) | set(past_fci_count) | set(past_offline_count)
-
-    for inspector in all_inspectors:
-        days = past_day_count[inspector]
-        fci = past_fci_count[inspector]
-        offline = past_offline_count[inspector]
-
-        if days < 4:
-            fci_score = 0
-            offline_score = 0
-            total_score = 0
+    # Her (gün, pozisyon) için aday listesi — tercih sırasıyla
+    domains = {}
+    # Workers the unary rules left out of a slot, for the diagnostics
+    excluded = defaultdict(dict)
+    for day in all_days:
+        head = daily_heads[day]
+        day_workers = [w for w in daily_workers[day] if w != head]
+        if optimal:
+            day_workers.sort()
         else:
-            fci_ratio = fci / days
-            offline_ratio = offline / days
-
-            effort_multiplier = 1 + (days / 5)
+            random.shuffle(day_workers)
 
-            base_fci_score = max(0, (TARGET_RATIO_FCI - fci_ratio) * 10)
-            base_offline_score = max(0, (TARGET_RATIO_OFFLINE - offline_ratio) * 10)
+        for pos in POSITIONS:
+            blocked = same_day_block.get(day, {}).get(pos)
+            if blocked in day_workers:
+                excluded[(day, pos)][blocked] = SAME_DAY_BLOCK
+            eligible = [w for w in day_workers if w != blocked]
+            if pos in ["FCI", "OFFLINE"]:
+                for w in eligible:
+                    if worker_days[w] < MIN_REQUIRED_DAYS_FOR_FCI_OFFLINE:
+                        excluded[(day, pos)][w] = MIN_DAYS
+                eligible = [w for w in eligible if worker_days[w] >= MIN_REQUIRED_DAYS_FOR_FCI_OFFLINE]
+                jitter = 0 if optimal else 0.01
+                eligible = sorted(
+                    eligible,
+                    key=lambda w: -fairness_scores.get(w, {}).get(f"{pos}_score", 0) + random.random() * jitter
+                )
+            domains[(day, pos)] = eligible
+
+    # Matching-based pre-check: reject provably impossible weeks before searching
+    problems = diagnose(domains, required=top3, excluded=excluded)
+    if problems:
+        return {
+            "error": f"Could not generate rota without conflicts: {problems[0]['message']}",
+            "diagnostics": problems,
+        }
 
-            fci_score = round(base_fci_score * effort_multiplier, 2)
-            offline_score = round(base_offline_score * effort_multiplier, 2)
-            total_score = round(fci_score + offline_score, 2)
+    solver = WeekSolver(domains, required=top3)
+    if optimal:
+        # Whole-week min-cost assignment: cost is the negative fairness score
+        costs = {
+            (day, pos): {w: -fairness_scores.get(w, {}).get(f"{pos}_score", 0) for w in domains[(day, pos)]}
+            for day in all_days for pos in ["FCI", "OFFLINE"]
+        }
+        solution = solver.minimize(costs)
+    else:
+        solution = solver.solve()
+    if solution is None:
+        return {"error": "Could not generate rota without conflicts: no valid assignment exists for the selected inspectors."}
 
-        summary[inspector] = {
+    rota_table = {}
+    for day in all_days:
+        assignments = {"HEAD": daily_heads[day]}
+        for pos in POSITIONS:
+            assignments[pos] = solution[(day, pos)]
+        rota_table[day] = assignments
+
+    return rota_table
+
+# Plans consecutive weeks in one call. week_requests is
+# {week_key: (daily_workers, daily_heads)}. Each planned week joins the
+# fairness window of the weeks after it and blocks their same-day repeats,
+# with no save/reload in between. Nothing is saved here; the caller saves the
+# returned weeks in one batch.
+def generate_horizon(week_requests, rotas, inspectors, optimal=False, ledger=None):
+    # Kendi kopyamız — paylaşılan ledger planlanan haftalarla kirlenmesin.
+    # Both advance together below, so the copy keeps covering the history
+    history = HistoryStore.from_rotas(rotas)
+    if ledger is not None and ledger.covers(rotas):
+        ledger = ledger.copy()
+    else:
+        ledger = FairnessLedger.from_rotas(history)
+
+    planned = {}
+    for week_key in sorted(week_requests):
+        daily_workers, daily_heads = week_requests[week_key]
+        rota = generate_rota(daily_workers, daily_heads, history, inspectors, week_key, optimal=optimal, ledger=ledger)
+        if "error" in rota:
+            return {
+                "error": f"Week {week_key}: {rota['error']}",
+                "week_key": week_key,
+                "rotas": planned,
+                "diagnostics": rota.get("diagnostics", []),
+            }
+        planned[week_key] = rota
+        history[week_key] = rota
+        ledger.set_week(week_key, rota)
+
+    return {"rotas": planned}
+
+def calculate_fairness_summary(rotas, current_week_key, current_week_assignments, ledger=None, window_weeks=FAIRNESS_WINDOW_WEEKS):
+    counts = _window_counts(rotas, current_week_key, current_week_assignments, ledger, window_weeks)
+    return {
+        inspector: {
             "Total Days": days,
             "FCI": fci,
             "OFFLINE": offline,
@@ -259,6 +195,5 @@ def calculate_fairness_summary(rotas, current_week_key, current_week_assignments
             "OFFLINE Score": offline_score,
             "Total Weighted Score": total_score
         }
-
-    return summary
-
+        for inspector, days, fci, offline, fci_score, offline_score, total_score in iter_scores(counts)
+    }
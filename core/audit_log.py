@@ -0,0 +1,90 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/audit_log.py
+# Buffered, asynchronous change-log writer for admin edits.
+#
+# The entries produced by one admin action are collected in a batch and handed
+# to a background thread, which writes the whole batch with a single bulk
+# append and retries with backoff if the write fails. The Streamlit script
+# thread never waits on the write.
+
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 1.0
+
+
+class AuditLogWriter:
+    def __init__(self, append=None, max_attempts=MAX_ATTEMPTS, backoff=BACKOFF_SECONDS, sleep=time.sleep):
+        if append is None:
+            from core.storage import append_change_logs as append
+        self.append = append
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.sleep = sleep
+        self.failed = []  # batches given up on, kept for inspection
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._worker = None
+
+    def _ensure_worker(self):
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                self._worker.start()
+
+    def submit(self, entries):
+        entries = [dict(entry) for entry in entries]
+        if entries:
+            self._ensure_worker()
+            self._queue.put(entries)
+
+    def flush(self, timeout=None):
+        """Block until every submitted batch has been written or given up on."""
+        if self._worker is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _write(self, entries):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.append(entries)
+                return
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    logger.error("Dropping %d change log entries after %d attempts: %s", len(entries), attempt, e)
+                    self.failed.append(entries)
+                    return
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning("Change log write failed (attempt %d), retrying in %.1fs: %s", attempt, delay, e)
+                self.sleep(delay)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+            else:
+                self._write(item)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_log():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AuditLogWriter()
+        return _writer
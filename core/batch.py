@@ -0,0 +1,182 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/batch.py
+# Batch planning across sites.
+#
+# One deployment can plan every plant's week in one call: each request names
+# a site, a week and that week's daily selections, every site brings its own
+# storage backend (and therefore its own history and fairness), the weeks are
+# solved in a process pool, and each site's rotas are written back with one
+# bulk save_weeks call.
+#
+#   plan_batch([
+#       {"site": "north", "week_key": "2025-03-03", "daily_workers": {...}, "daily_heads": {...}},
+#       {"site": "south", "week_key": "2025-03-03", "daily_workers": {...}, "daily_heads": {...}},
+#   ], backends={"north": north_backend, "south": south_backend})
+#
+# At most one site may go without a backend of its own; that site uses this
+# deployment's storage, so the local fairness ledger and page caches stay in
+# step.
+
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from core import storage
+from core.algorithm import generate_rota
+from core.history import HistoryStore
+from core.ledger import FairnessLedger
+
+REQUIRED_FIELDS = ("site", "week_key", "daily_workers", "daily_heads")
+
+
+def _validate(requests, backends):
+    seen = set()
+    for i, request in enumerate(requests):
+        missing = [field for field in REQUIRED_FIELDS if field not in request]
+        if missing:
+            raise ValueError(f"Request {i} is missing {', '.join(missing)}")
+        if set(request["daily_workers"]) != set(request["daily_heads"]):
+            raise ValueError(f"Request {i} ({request['site']} {request['week_key']}): workers and heads cover different days")
+        key = (request["site"], request["week_key"])
+        if key in seen:
+            raise ValueError(f"Week {request['week_key']} is requested twice for site {request['site']}")
+        seen.add(key)
+    # Sites without a backend share one history: their weeks would overwrite each other
+    shared = sorted({request["site"] for request in requests if request["site"] not in backends})
+    if len(shared) > 1:
+        raise ValueError(
+            f"Sites {', '.join(shared)} have no backend and would share this deployment's storage; "
+            f"give all but one of them a backend"
+        )
+
+
+def _roster(request):
+    # Everyone selected for the week, unless the request brings the site's roster
+    if request.get("inspectors"):
+        return list(request["inspectors"])
+    people = {head for head in request["daily_heads"].values()}
+    for workers in request["daily_workers"].values():
+        people.update(workers)
+    return sorted(people)
+
+
+# ─── Solving ───
+def _solve_site(args):
+    # Runs in a worker process: the site's weeks in date order, each planned on
+    # top of the ones before it like generate_horizon, so same-day blocks and
+    # fairness carry across the batch
+    site, rotas, requests = args
+    history = HistoryStore.from_rotas(rotas)
+    ledger = FairnessLedger.from_rotas(history)
+    results = []
+    failed = None
+    for request in sorted(requests, key=lambda r: r["week_key"]):
+        week_key = request["week_key"]
+        if failed is not None:
+            results.append((week_key, {"error": f"Not planned: the earlier week {failed} could not be planned."}))
+            continue
+        rota = generate_rota(
+            request["daily_workers"], request["daily_heads"], history, _roster(request), week_key,
+            optimal=request.get("optimal", False), ledger=ledger,
+        )
+        results.append((week_key, rota))
+        if "error" in rota:
+            failed = week_key
+            continue
+        history[week_key] = rota
+        ledger.set_week(week_key, rota)
+    return site, results
+
+
+def _load_history(site, backends):
+    backend = backends.get(site)
+    return backend.load_rotas() if backend is not None else storage.load_rotas()
+
+
+def _save_site(site, weeks, backends):
+    backend = backends.get(site)
+    if backend is not None:
+        backend.save_weeks(weeks)
+    else:
+        storage.save_weeks(weeks)
+
+
+def plan_batch(requests, backends=None, workers=None, save=True):
+    """Plan every requested (site, week) concurrently and save each site in one write.
+
+    requests: dicts with site, week_key, daily_workers and daily_heads, plus
+    optional inspectors (the site roster) and optimal. backends maps a site
+    to its StorageBackend; at most one other site may use this deployment's
+    storage.
+
+    Weeks of the same site are planned in date order, each against the saved
+    history plus the weeks planned before it. Once a week fails, the site's
+    later weeks are not planned and get an error too. Returns {"results": [...] in request order, each
+    {"site", "week_key"} plus "rota" or "error", "saved": {site: [week_key]},
+    "save_errors": {site: message}, "elapsed": seconds}.
+    """
+    started = time.time()
+    requests = list(requests)
+    backends = backends or {}
+    _validate(requests, backends)
+
+    by_site = defaultdict(list)
+    for request in requests:
+        by_site[request["site"]].append(request)
+
+    solved, results = {}, {}
+    tasks = []
+    for site, site_requests in by_site.items():
+        try:
+            tasks.append((site, _load_history(site, backends), site_requests))
+        except Exception as e:
+            for request in site_requests:
+                results[(site, request["week_key"])] = {"error": f"Could not load history: {e}"}
+
+    def collect(site, result):
+        try:
+            solved[site] = result()[1]
+        except Exception as e:
+            for request in by_site[site]:
+                results[(site, request["week_key"])] = {"error": f"Planning failed: {e}"}
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    if workers == 1:
+        for task in tasks:
+            collect(task[0], lambda: _solve_site(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            futures = {task[0]: pool.submit(_solve_site, task) for task in tasks}
+            for site, future in futures.items():
+                collect(site, future.result)
+
+    saved, save_errors = {}, {}
+    for site, site_results in solved.items():
+        weeks = {}
+        for week_key, rota in site_results:
+            results[(site, week_key)] = rota if "error" in rota else {"rota": rota}
+            if "error" not in rota:
+                weeks[week_key] = rota
+        if not (save and weeks):
+            continue
+        try:
+            _save_site(site, weeks, backends)
+            saved[site] = list(weeks)
+        except Exception as e:
+            save_errors[site] = f"{type(e).__name__}: {e}"
+
+    return {
+        "results": [
+            {"site": r["site"], "week_key": r["week_key"], **results[(r["site"], r["week_key"])]}
+            for r in requests
+        ],
+        "saved": saved,
+        "save_errors": save_errors,
+        "elapsed": time.time() - started,
+    }
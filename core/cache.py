@@ -0,0 +1,151 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/cache.py
+# Process-wide revisioned cache shared by every Streamlit session.
+#
+# Each entry records the revision of every scope it was computed from. A
+# mutation bumps only the scopes it touches (one week, the set of saved week
+# keys, the deleted archive or the change log), so unrelated entries survive.
+# The saved/deleted rota collections are patched in place on writes instead of
+# being reloaded.
+
+import threading
+from collections import OrderedDict
+
+from core.history import HistoryStore
+
+MAX_ENTRIES = 512
+
+WEEK_KEYS_SCOPE = "week_keys"
+DELETED_SCOPE = "deleted"
+LOGS_SCOPE = "logs"
+ROTAS_SCOPE = "rotas"
+
+_ROTAS_KEY = ("collection", "rotas")
+_DELETED_KEY = ("collection", "deleted")
+
+
+def week_scope(week_key):
+    return f"week:{week_key}"
+
+
+class RevisionedCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._revisions = {}
+        self._epoch = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def revision(self, scope):
+        with self._lock:
+            return self._revisions.get(scope, 0)
+
+    def _stamp(self, scopes):
+        return self._epoch, {scope: self.revision(scope) for scope in scopes}
+
+    def _fresh(self, stamp):
+        epoch, revisions = stamp
+        return epoch == self._epoch and all(rev == self.revision(scope) for scope, rev in revisions.items())
+
+    def bump(self, *scopes):
+        with self._lock:
+            for scope in scopes:
+                self._revisions[scope] = self._revisions.get(scope, 0) + 1
+
+    def bump_all(self):
+        # Invalidates every entry, e.g. after a full reconcile with Sheets
+        with self._lock:
+            self._epoch += 1
+
+    def get_or_compute(self, key, scopes, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._fresh(entry[1]):
+                self._entries.move_to_end(key)
+                return entry[0]
+            stamp = self._stamp(scopes)
+
+        value = compute()
+
+        with self._lock:
+            # A write that landed while computing leaves the value already stale
+            if self._fresh(stamp):
+                self._entries[key] = (value, stamp)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def patch(self, key, update, *scopes):
+        # Bump scopes, then apply update(value) -> value to a still-fresh entry
+        # and re-stamp it, so it survives the bump while in-flight loads don't
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry is not None and self._fresh(entry[1])
+            self.bump(*scopes)
+            if fresh:
+                value, (epoch, revisions) = entry
+                self._entries[key] = (update(value), self._stamp(revisions))
+            else:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+
+cache = RevisionedCache()
+
+
+# ─── Rota collections ───
+def cached_rotas(loader):
+    # The saved history is held as a compact HistoryStore. Callers get their
+    # own copy so they can add or pop weeks without touching the cache
+    return cache.get_or_compute(_ROTAS_KEY, [ROTAS_SCOPE], lambda: HistoryStore.from_rotas(loader())).copy()
+
+
+def cached_deleted_rotas(loader):
+    return dict(cache.get_or_compute(_DELETED_KEY, [DELETED_SCOPE], loader))
+
+
+def _with_week(week_key, week_data):
+    def update(collection):
+        collection = collection.copy()
+        collection[week_key] = week_data
+        return collection
+    return update
+
+
+def _without_week(week_key):
+    def update(collection):
+        collection = collection.copy()
+        collection.pop(week_key, None)
+        return collection
+    return update
+
+
+def week_saved(week_key, rota_dict, is_new):
+    cache.bump(week_scope(week_key), *([WEEK_KEYS_SCOPE] if is_new else []))
+    cache.patch(_ROTAS_KEY, _with_week(week_key, rota_dict), ROTAS_SCOPE)
+
+
+def week_deleted(week_key):
+    cache.bump(week_scope(week_key), WEEK_KEYS_SCOPE)
+    cache.patch(_ROTAS_KEY, _without_week(week_key), ROTAS_SCOPE)
+
+
+def week_archived(week_key, rota_dict):
+    def update(collection):
+        collection = dict(collection)
+        collection[week_key] = {**collection.get(week_key, {}), **rota_dict}
+        return collection
+    cache.patch(_DELETED_KEY, update, DELETED_SCOPE)
+
+
+def logs_changed():
+    cache.bump(LOGS_SCOPE)
@@ -0,0 +1,177 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/candidates.py
+# Best-of-N rota generation.
+#
+# generate_rota returns the first random assignment that satisfies the
+# constraints, so two runs can differ a lot in fairness. This module draws
+# many independent candidates in a process pool until a wall-clock budget
+# runs out, scores each one with a week-wide objective and returns the best
+# (or the top k for the planner to choose from).
+
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from statistics import pvariance
+
+from core.algorithm import calculate_fairness_scores, generate_rota, get_top_fairness_candidates
+from core.ledger import FairnessLedger
+
+DEFAULT_CANDIDATES = 64
+DEFAULT_TIME_BUDGET = 5.0  # seconds
+# Ratio variances are typically 0.01–0.05; one uncovered top-3 inspector
+# (a third of the coverage) should weigh about as much as that
+TOP3_WEIGHT = 0.1
+# Extra time the parent waits for workers to hand back results after the budget
+RESULT_GRACE_SECONDS = 1.0
+
+
+# ─── Objective ───
+def rota_objective(fairness_scores, week_rota, top3):
+    """Score a week by how evenly FCI/OFFLINE are spread; lower is better.
+
+    fairness_scores is calculate_fairness_scores() for the window including
+    this week, top3 the inspectors most owed an FCI/OFFLINE before it.
+    """
+    worked = [s for s in fairness_scores.values() if s["Days"] > 0]
+    fci_variance = pvariance([s["FCI"] / s["Days"] for s in worked]) if len(worked) > 1 else 0.0
+    offline_variance = pvariance([s["OFFLINE"] / s["Days"] for s in worked]) if len(worked) > 1 else 0.0
+
+    rewarded = {
+        day_data.get(pos)
+        for day_data in week_rota.values()
+        for pos in ("FCI", "OFFLINE")
+    }
+    top3_coverage = sum(p in rewarded for p in top3) / len(top3) if top3 else 1.0
+
+    return {
+        "score": fci_variance + offline_variance + TOP3_WEIGHT * (1 - top3_coverage),
+        "fci_variance": fci_variance,
+        "offline_variance": offline_variance,
+        "top3_coverage": top3_coverage,
+    }
+
+
+def _top3(daily_workers, daily_heads, rotas, week_key, ledger):
+    # Same selection generate_rota makes, from the scores before any role is assigned
+    worker_days = defaultdict(int)
+    for day, workers in daily_workers.items():
+        for worker in workers:
+            worker_days[worker] += 1
+    heads_only = {day: {"HEAD": head} for day, head in daily_heads.items()}
+    scores = calculate_fairness_scores(rotas, week_key, heads_only, ledger=ledger)
+    return get_top_fairness_candidates(scores, worker_days)
+
+
+# ─── Search ───
+def _search(args):
+    # Runs in a worker process: draw candidates until the seeds or the time run out
+    daily_workers, daily_heads, rotas, inspectors, week_key, ledger, seeds, deadline, top_k = args
+    if ledger is None or not ledger.covers(rotas):
+        ledger = FairnessLedger.from_rotas(rotas)
+    top3 = _top3(daily_workers, daily_heads, rotas, week_key, ledger)
+
+    best, seen = [], set()
+    generated = failed = 0
+    for seed in seeds:
+        if generated + failed and time.time() >= deadline:
+            break
+        random.seed(seed)
+        rota = generate_rota(daily_workers, daily_heads, rotas, inspectors, week_key, ledger=ledger)
+        if "diagnostics" in rota:
+            # Rejected by the pre-check, which doesn't depend on the seed
+            failed += 1
+            break
+        if "error" in rota:
+            failed += 1
+            continue
+        generated += 1
+        fingerprint = json.dumps(rota, sort_keys=True)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        scores = calculate_fairness_scores(rotas, week_key, rota, ledger=ledger)
+        best.append({"seed": seed, "rota": rota, "objective": rota_objective(scores, rota, top3)})
+        best.sort(key=lambda c: (c["objective"]["score"], c["seed"]))
+        del best[top_k:]
+    return {
+        "candidates": best,
+        "generated": generated,
+        "failed": failed,
+        "error": None if generated else rota.get("error"),
+        "diagnostics": rota.get("diagnostics", []),
+    }
+
+
+_pool = None
+_pool_workers = 0
+
+
+def _get_pool(workers):
+    # Kept alive between Streamlit reruns so later runs skip the worker start-up
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        _pool_workers = workers
+    return _pool
+
+
+def generate_candidates(daily_workers, daily_heads, rotas, inspectors, week_key,
+                        n=DEFAULT_CANDIDATES, top_k=1, time_budget=DEFAULT_TIME_BUDGET,
+                        workers=None, ledger=None, seed=None):
+    """Generate up to n rotas within time_budget seconds and keep the top_k.
+
+    Returns {"candidates": [{"seed", "rota", "objective"}, ...] best first,
+    "generated", "failed", "elapsed"}, or {"error": ...} like generate_rota
+    when no candidate satisfies the constraints.
+    """
+    started = time.time()
+    deadline = started + time_budget
+    workers = max(1, min(workers or os.cpu_count() or 1, n))
+    base_seed = random.randrange(2 ** 32) if seed is None else seed
+    seeds = [base_seed + i for i in range(n)]
+
+    tasks = [
+        (daily_workers, daily_heads, rotas, inspectors, week_key, ledger, seeds[i::workers], deadline, top_k)
+        for i in range(workers)
+    ]
+    if workers == 1:
+        results = [_search(tasks[0])]
+    else:
+        futures = [_get_pool(workers).submit(_search, task) for task in tasks]
+        done, _ = wait(futures, timeout=max(0.0, deadline - time.time()) + RESULT_GRACE_SECONDS)
+        if not done:
+            # Worker start-up ate the budget; take the first result rather than nothing
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        results = [f.result() for f in done]
+
+    merged, seen = [], set()
+    for result in results:
+        for candidate in result["candidates"]:
+            fingerprint = json.dumps(candidate["rota"], sort_keys=True)
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                merged.append(candidate)
+    merged.sort(key=lambda c: (c["objective"]["score"], c["seed"]))
+
+    if not merged:
+        errors = [r for r in results if r["error"]]
+        if not errors:
+            return {"error": "No rota could be generated within the time budget."}
+        return {"error": errors[0]["error"], "diagnostics": errors[0]["diagnostics"]}
+
+    return {
+        "candidates": merged[:top_k],
+        "generated": sum(r["generated"] for r in results),
+        "failed": sum(r["failed"] for r in results),
+        "elapsed": time.time() - started,
+    }
@@ -0,0 +1,66 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/connection.py
+# Shared Google Sheets connection layer.
+#
+# One authorized gspread client per process, plus opened worksheet handles
+# cached by spreadsheet name. The client's AuthorizedSession refreshes the
+# service-account token on its own when it expires, so the cached handles stay
+# valid for the lifetime of the Streamlit server.
+#
+# gspread and google-auth are imported on first connect, so pages served from
+# the local mirror never load them on the request path.
+
+import threading
+
+import streamlit as st
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+_lock = threading.RLock()
+_client = None
+_worksheets = {}
+
+
+def _credentials():
+    from google.oauth2.service_account import Credentials
+
+    creds_dict = dict(st.secrets["gcp_service_account"])
+    if "private_key" in creds_dict:
+        creds_dict["private_key"] = creds_dict["private_key"].replace("\\n", "\n")
+    return Credentials.from_service_account_info(creds_dict, scopes=SCOPE)
+
+
+def _authorize(credentials):
+    import gspread
+
+    return gspread.authorize(credentials)
+
+
+def get_client():
+    global _client
+    with _lock:
+        if _client is None:
+            _client = _authorize(_credentials())
+        return _client
+
+
+def get_worksheet(spreadsheet_name):
+    # First worksheet of the named spreadsheet, opened once and reused
+    with _lock:
+        sheet = _worksheets.get(spreadsheet_name)
+        if sheet is None:
+            sheet = get_client().open(spreadsheet_name).sheet1
+            _worksheets[spreadsheet_name] = sheet
+        return sheet
+
+
+def reset_connection():
+    # Drop the client and every cached handle, e.g. after credentials change
+    global _client
+    with _lock:
+        _client = None
+        _worksheets.clear()
@@ -3,57 +3,119 @@
 # Unauthorized use, copying, modification, or distribution is strictly prohibited.
 # Contact: ticked.does-7c@icloud.com
 
-import gspread
-from google.oauth2.service_account import Credentials
-import streamlit as st
 from typing import Dict
 from datetime import datetime
+from core.connection import get_worksheet
 
 # Google Sheets bağlantısı
 SHEET_NAME = "rota_data"
 DELETED_SHEET_NAME = "deleted_rota"
+LOG_SHEET_NAME = "change_logs"
 
 POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+LOG_COLUMNS = ["timestamp", "admin_id", "week_start", "day", "position", "old_value", "new_value", "admin_users"]
 
 def get_sheet():
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    credentials = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"], scopes=scope
-    )
-    gc = gspread.authorize(credentials)
-    return gc.open(SHEET_NAME).sheet1
+    return get_worksheet(SHEET_NAME)
 
 def get_deleted_sheet():
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    credentials = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"], scopes=scope
-    )
-    gc = gspread.authorize(credentials)
-    return gc.open(DELETED_SHEET_NAME).sheet1
-
-def save_rotas(week_key: str, rota_dict: Dict[str, Dict[str, str]]):
-    sheet = get_sheet()
-    existing = sheet.get_all_values()
-    header = ["week_start", "day"] + POSITIONS
-
-    # Header yoksa ekle
-    if not existing:
-        sheet.append_row(header)
-
-    # Eski haftayı sil
-    rows_to_keep = [row for row in existing if len(row) >= 1 and (row[0] != week_key or row[0] == "week_start")]
-    sheet.clear()
-    for row in rows_to_keep:
-        sheet.append_row(row)
-
-    # Yeni haftayı ekle
-    for day, roles in rota_dict.items():
-        row = [week_key, day] + [roles.get(pos, "") for pos in POSITIONS]
-        sheet.append_row(row)
-
-
-def load_rotas():
-    sheet = get_sheet()
+    return get_worksheet(DELETED_SHEET_NAME)
+
+def get_log_sheet():
+    return get_worksheet(LOG_SHEET_NAME)
+
+HEADER = ["week_start", "day"] + POSITIONS
+
+
+def _row_range(start, end, width=len(HEADER)):
+    # A1 range covering whole rows start..end (1-based, inclusive)
+    return f"A{start}:{chr(ord('A') + width - 1)}{end}"
+
+
+def _week_row_runs(week_column, week_key):
+    # Contiguous (start, end) sheet row numbers holding week_key, top to bottom
+    runs = []
+    for i, value in enumerate(week_column, start=1):
+        if value == week_key and value != "week_start":
+            if runs and runs[-1][1] == i - 1:
+                runs[-1] = (runs[-1][0], i)
+            else:
+                runs.append((i, i))
+    return runs
+
+
+def _delete_runs(sheet, runs):
+    # One API call whatever the number of row blocks; bottom-up so indices stay valid
+    if not runs:
+        return
+    if len(runs) == 1:
+        sheet.delete_rows(*runs[0])
+        return
+    sheet.spreadsheet.batch_update({"requests": [
+        {"deleteDimension": {"range": {
+            "sheetId": sheet.id,
+            "dimension": "ROWS",
+            "startIndex": start - 1,
+            "endIndex": end,
+        }}}
+        for start, end in reversed(runs)
+    ]})
+
+
+def save_rotas(week_key: str, rota_dict: Dict[str, Dict[str, str]], sheet=None):
+    sheet = sheet or get_sheet()
+    # Sadece A sütunu okunur — haftanın satırlarını bulmak için yeterli
+    week_column = sheet.col_values(1)
+    new_rows = [[week_key, day] + [roles.get(pos, "") for pos in POSITIONS] for day, roles in rota_dict.items()]
+
+    # Header yoksa ekle — başlık ve yeni hafta tek çağrıda
+    if not week_column:
+        sheet.append_rows([HEADER] + new_rows)
+    else:
+        runs = _week_row_runs(week_column, week_key)
+        if not runs:
+            sheet.append_rows(new_rows)
+        else:
+            # Eski haftanın ilk bloğunu yerinde güncelle
+            start, end = runs[0]
+            block_size = end - start + 1
+            overlap = new_rows[:block_size]
+            if overlap:
+                sheet.batch_update([{"range": _row_range(start, start + len(overlap) - 1), "values": overlap}])
+
+            surplus = [(start + len(overlap), end)] if len(overlap) < block_size else []
+            _delete_runs(sheet, surplus + runs[1:])
+
+            if len(new_rows) > block_size:
+                sheet.insert_rows(new_rows[block_size:], row=end + 1)
+
+
+def save_weeks(weeks: Dict[str, Dict[str, Dict[str, str]]], sheet=None):
+    # Several weeks at once: one read of column A, then at most one in-place
+    # update, one row delete and one append however many weeks there are
+    sheet = sheet or get_sheet()
+    week_column = sheet.col_values(1)
+    updates, stale_runs, appended = [], [], []
+    for week_key, rota_dict in weeks.items():
+        new_rows = [[week_key, day] + [roles.get(pos, "") for pos in POSITIONS] for day, roles in rota_dict.items()]
+        runs = _week_row_runs(week_column, week_key)
+        if len(runs) == 1 and runs[0][1] - runs[0][0] + 1 == len(new_rows):
+            # Aynı boyuttaki blok yerinde güncellenir
+            updates.append({"range": _row_range(*runs[0]), "values": new_rows})
+        else:
+            # Boyutu değişen haftalar silinip sona eklenir
+            stale_runs.extend(runs)
+            appended.extend(new_rows)
+
+    if updates:
+        sheet.batch_update(updates)
+    _delete_runs(sheet, sorted(stale_runs))
+    if appended:
+        sheet.append_rows(appended if week_column else [HEADER] + appended)
+
+
+def load_rotas(sheet=None):
+    sheet = sheet or get_sheet()
     rows = sheet.get_all_values()
     all_rotas = {}
 
@@ -75,35 +137,36 @@ def load_rotas():
 
     return all_rotas
 
-def delete_rota(week_key: str):
-    sheet = get_sheet()
-    rows = sheet.get_all_values()
+def delete_rota(week_key: str, sheet=None):
+    sheet = sheet or get_sheet()
+    runs = _week_row_runs(sheet.col_values(1), week_key)
     deleted_data = {}
-    for row in rows:
-        if len(row) >= 2 and row[0] == week_key and row[0] != "week_start":
-            day = row[1]
-            roles = dict(zip(POSITIONS, row[2:2 + len(POSITIONS)]))
-            deleted_data[day] = roles
+    if not runs:
+        return deleted_data
+
+    # Haftanın satırlarını tek çağrıda oku
+    blocks = sheet.batch_get([_row_range(start, end) for start, end in runs])
+    for block in blocks:
+        for row in block:
+            if len(row) >= 2:
+                day = row[1]
+                roles = dict(zip(POSITIONS, row[2:2 + len(POSITIONS)]))
+                deleted_data[day] = roles
 
-    rows_to_keep = [row for row in rows if row[0] != week_key or row[0] == "week_start"]
-    sheet.clear()
-    for row in rows_to_keep:
-        sheet.append_row(row)
+    _delete_runs(sheet, runs)
 
     return deleted_data
 
-def archive_deleted_rota(week_key: str, rota_dict: Dict[str, Dict[str, str]]):
-    sheet = get_deleted_sheet()
-    existing = sheet.get_all_values()
-    header = ["week_start", "day"] + POSITIONS
-    if not existing:
-        sheet.append_row(header)
-    for day, roles in rota_dict.items():
-        row = [week_key, day] + [roles.get(pos, "") for pos in POSITIONS]
-        sheet.append_row(row)
-
-def load_deleted_rotas():
-    sheet = get_deleted_sheet()
+def archive_deleted_rota(week_key: str, rota_dict: Dict[str, Dict[str, str]], sheet=None):
+    sheet = sheet or get_deleted_sheet()
+    rows = [[week_key, day] + [roles.get(pos, "") for pos in POSITIONS] for day, roles in rota_dict.items()]
+    if not sheet.row_values(1):
+        rows = [HEADER] + rows
+    if rows:
+        sheet.append_rows(rows)
+
+def load_deleted_rotas(sheet=None):
+    sheet = sheet or get_deleted_sheet()
     rows = sheet.get_all_values()
     all_rotas = {}
 
@@ -127,3 +190,22 @@ def load_deleted_rotas():
 def get_saved_week_keys():
     rotas = load_rotas()
     return list(rotas.keys())
+
+def append_change_logs(entries, sheet=None):
+    rows = [[entry.get(col, "") for col in LOG_COLUMNS] for entry in entries]
+    if rows:
+        (sheet or get_log_sheet()).append_rows(rows)
+
+def load_change_logs(sheet=None):
+    return (sheet or get_log_sheet()).get_all_records()
+
+def load_change_logs_since(position, sheet=None):
+    # The log sheet is append-only: read only the rows after the first
+    # `position` entries. Returns (entries, new position).
+    last_col = chr(ord('A') + len(LOG_COLUMNS) - 1)
+    rows = (sheet or get_log_sheet()).get(f"A{position + 2}:{last_col}")
+    entries = [
+        dict(zip(LOG_COLUMNS, list(row) + [""] * (len(LOG_COLUMNS) - len(row))))
+        for row in rows if any(row)
+    ]
+    return entries, position + len(rows)
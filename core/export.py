@@ -0,0 +1,133 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/export.py
+# Bulk export of many weeks at once.
+#
+# XLSX exports are written with openpyxl in write-only mode (one sheet per
+# week, rows streamed straight to disk). PNG exports are rendered in a process
+# pool and written into a ZIP one image at a time, with only a few renders in
+# flight. Both are built in a temporary file that is handed to the download
+# button as is, so memory stays flat however many weeks are selected.
+
+import os
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from multiprocessing import get_context
+
+from core.data_utils import POSITIONS
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+EXPORT_FORMATS = ("xlsx", "zip")
+PARALLEL_MIN_WEEKS = 8  # below this a pool costs more to start than it saves
+
+
+# ─── Week selection ───
+def month_range(year, month):
+    first = date(year, month, 1)
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")
+
+
+def quarter_range(year, quarter):
+    start, _ = month_range(year, 3 * quarter - 2)
+    _, end = month_range(year, 3 * quarter)
+    return start, end
+
+
+def select_weeks(rotas, start=None, end=None):
+    # Week keys (Mondays) between start and end inclusive, oldest first
+    return sorted(
+        wk for wk in rotas
+        if (start is None or wk >= start) and (end is None or wk <= end)
+    )
+
+
+def week_rows(week_data):
+    # (day, [values in POSITIONS order]) for the weekdays plus a worked Saturday
+    days = list(WEEKDAYS)
+    if any(week_data.get("Saturday", {}).values()):
+        days.append("Saturday")
+    return [(day, [week_data.get(day, {}).get(pos, "") for pos in POSITIONS]) for day in days]
+
+
+# ─── XLSX ───
+def write_xlsx(rotas, week_keys, fileobj):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for wk in week_keys:
+        ws = wb.create_sheet(title=wk)
+        ws.append(["Day"] + POSITIONS)
+        for day, values in week_rows(rotas[wk]):
+            ws.append([day] + values)
+    wb.save(fileobj)
+
+
+# ─── ZIP of PNGs ───
+def _render_week(args):
+    # Runs in a worker process
+    import pandas as pd
+    from core.utils import generate_table_image
+
+    week_key, week_data, dpi, renderer = args
+    rows = week_rows(week_data)
+    df = pd.DataFrame([values for _, values in rows], index=[day for day, _ in rows], columns=POSITIONS)
+    start = datetime.strptime(week_key, "%Y-%m-%d")
+    title = f"{start.strftime('%d %b')} – {(start + timedelta(days=4)).strftime('%d %b %Y')} Weekly Rota"
+    return week_key, generate_table_image(df, title=title, dpi=dpi, renderer=renderer).getvalue()
+
+
+def _rendered(tasks, workers):
+    # Yields results in order while keeping at most 2 * workers renders in flight
+    if workers <= 1:
+        yield from map(_render_week, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_render_week, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_png_zip(rotas, week_keys, fileobj, dpi=300, renderer=None, workers=None):
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 4) if len(week_keys) >= PARALLEL_MIN_WEEKS else 1
+    tasks = ((wk, rotas[wk], dpi, renderer) for wk in week_keys)
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as zf:
+        # PNGs are already deflated, so storing them avoids a second pass
+        for week_key, png in _rendered(tasks, workers):
+            zf.writestr(f"rota_{week_key}.png", png)
+
+
+def build_export(rotas, week_keys, fmt, **options):
+    """Return the export as a binary file rewound to the start.
+
+    The file is an anonymous temporary file, so the export is never held in
+    memory by this module; st.download_button accepts it as is (a raw file
+    object). The caller owns it: close it, or let it be collected.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    tmp = tempfile.TemporaryFile()
+    try:
+        if fmt == "xlsx":
+            write_xlsx(rotas, week_keys, tmp)
+        else:
+            write_png_zip(rotas, week_keys, tmp, **options)
+        # download_button takes raw files and BufferedReaders, not the
+        # read/write buffer TemporaryFile wraps around the descriptor
+        raw = tmp.detach()
+    except BaseException:
+        tmp.close()
+        raise
+    raw.seek(0)
+    return raw
@@ -0,0 +1,113 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/fairness.py
+# Vectorized fairness engine shared by calculate_fairness_scores and
+# calculate_fairness_summary.
+#
+# History is encoded as a dense int32 array indexed by (week, day, role) whose
+# cells hold interned inspector IDs (-1 for an empty cell), so window counts
+# are a slice plus np.bincount and the scores are a handful of array ops.
+
+from bisect import bisect_right
+
+import numpy as np
+
+TARGET_RATIO_FCI = 0.2
+TARGET_RATIO_OFFLINE = 0.2
+MIN_DAYS_FOR_SCORE = 4
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+ROLES = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+
+
+def _intern(table, names, value):
+    if value not in table:
+        table[value] = len(names)
+        names.append(value)
+    return table[value]
+
+
+class HistoryGrid:
+    def __init__(self, rotas):
+        self.weeks = sorted(rotas)
+        self.names = []
+        self.ids = {}
+        self.days = list(DAYS)
+        self.roles = list(ROLES)
+        day_ids = {day: i for i, day in enumerate(self.days)}
+        role_ids = {role: i for i, role in enumerate(self.roles)}
+
+        cells = []
+        for w, week_key in enumerate(self.weeks):
+            for day, day_data in rotas[week_key].items():
+                d = _intern(day_ids, self.days, day)
+                for role, person in day_data.items():
+                    if person and person != "Not Working":
+                        r = _intern(role_ids, self.roles, role)
+                        cells.append((w, d, r, _intern(self.ids, self.names, person)))
+
+        self.grid = np.full((len(self.weeks), len(self.days), len(self.roles)), -1, dtype=np.int32)
+        if cells:
+            w, d, r, p = np.array(cells, dtype=np.int32).T
+            self.grid[w, d, r] = p
+
+    def window_counts(self, current_week_key, n_weeks):
+        """{inspector: [days, fci, offline]} over the last n_weeks saved weeks up to current_week_key."""
+        end = bisect_right(self.weeks, current_week_key)
+        block = self.grid[max(0, end - n_weeks):end]
+        n = len(self.names)
+
+        days = np.bincount(block[block >= 0], minlength=n)
+        fci_cells = block[..., self.roles.index("FCI")]
+        offline_cells = block[..., self.roles.index("OFFLINE")]
+        fci = np.bincount(fci_cells[fci_cells >= 0], minlength=n)
+        offline = np.bincount(offline_cells[offline_cells >= 0], minlength=n)
+
+        return {
+            self.names[i]: [int(days[i]), int(fci[i]), int(offline[i])]
+            for i in np.flatnonzero(days)
+        }
+
+
+def score_counts(counts):
+    """Vectorized scores for {inspector: [days, fci, offline]}.
+
+    Returns (names, table) where table maps "days", "fci", "offline",
+    "fci_score" and "offline_score" to arrays aligned with names.
+    """
+    names = list(counts)
+    raw = np.array([counts[name] for name in names], dtype=np.int64).reshape(-1, 3)
+    days, fci, offline = raw[:, 0], raw[:, 1], raw[:, 2]
+
+    safe_days = np.maximum(days, 1)
+    effort_multiplier = 1 + days / 5
+    scored = days >= MIN_DAYS_FOR_SCORE
+
+    fci_score = np.where(scored, np.maximum(0, (TARGET_RATIO_FCI - fci / safe_days) * 10) * effort_multiplier, 0.0)
+    offline_score = np.where(scored, np.maximum(0, (TARGET_RATIO_OFFLINE - offline / safe_days) * 10) * effort_multiplier, 0.0)
+
+    return names, {
+        "days": days,
+        "fci": fci,
+        "offline": offline,
+        "scored": scored,
+        "fci_score": fci_score,
+        "offline_score": offline_score,
+    }
+
+
+def iter_scores(counts):
+    # Yields (inspector, days, fci, offline, fci_score, offline_score, total_score)
+    # with the same rounding the rota planner has always displayed
+    names, table = score_counts(counts)
+    for i, name in enumerate(names):
+        if table["scored"][i]:
+            fci_score = round(float(table["fci_score"][i]), 2)
+            offline_score = round(float(table["offline_score"][i]), 2)
+            total_score = round(fci_score + offline_score, 2)
+        else:
+            fci_score = offline_score = total_score = 0
+        yield name, int(table["days"][i]), int(table["fci"][i]), int(table["offline"][i]), fci_score, offline_score, total_score
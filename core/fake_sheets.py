@@ -0,0 +1,182 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/fake_sheets.py
+# In-process stand-in for the Google Sheets service.
+#
+# Implements the slice of the gspread client/worksheet API that core.data_utils
+# uses, adds a configurable per-call latency and a per-minute request quota,
+# and counts every call by method so I/O paths can be measured offline.
+
+import threading
+import time
+from collections import Counter, deque
+
+
+class QuotaExceeded(Exception):
+    # Mirrors the HTTP 429 Sheets returns once the per-minute quota is spent
+    status_code = 429
+
+
+def _range_rows(range_name):
+    # "A2:H7" -> (2, 7), "A5:H" -> (5, None); only whole-row ranges are used by the app
+    start, _, end = range_name.partition(":")
+    first = int("".join(ch for ch in start if ch.isdigit()))
+    if not end:
+        return first, first
+    digits = "".join(ch for ch in end if ch.isdigit())
+    return first, int(digits) if digits else None
+
+
+class FakeSheetsService:
+    def __init__(self, latency=0.0, quota_per_minute=None, clock=time.monotonic, sleep=time.sleep):
+        self.latency = latency
+        self.quota_per_minute = quota_per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = Counter()
+        self._window = deque()
+        self._lock = threading.Lock()
+        self._spreadsheets = {}
+
+    def _call(self, method):
+        with self._lock:
+            now = self.clock()
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if self.quota_per_minute is not None and len(self._window) >= self.quota_per_minute:
+                self.stats["rejected"] += 1
+                raise QuotaExceeded(f"Quota exceeded: {self.quota_per_minute} requests per minute")
+            self._window.append(now)
+            self.stats[method] += 1
+        if self.latency:
+            self.sleep(self.latency)
+
+    @property
+    def total_calls(self):
+        return sum(count for method, count in self.stats.items() if method != "rejected")
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    # ─── gspread-like client API ───
+    def open(self, name):
+        self._call("open")
+        with self._lock:
+            if name not in self._spreadsheets:
+                self._spreadsheets[name] = FakeSpreadsheet(self, name)
+            return self._spreadsheets[name]
+
+    def worksheet(self, name):
+        # Like core.connection.get_worksheet: the handle is opened once
+        with self._lock:
+            spreadsheet = self._spreadsheets.get(name)
+        return (spreadsheet or self.open(name)).sheet1
+
+
+class FakeSpreadsheet:
+    def __init__(self, service, title):
+        self.service = service
+        self.title = title
+        self.sheet1 = FakeWorksheet(service, self)
+
+    def batch_update(self, body):
+        self.service._call("spreadsheet.batch_update")
+        for request in body.get("requests", []):
+            delete = request.get("deleteDimension")
+            if delete and delete["range"]["dimension"] == "ROWS":
+                rng = delete["range"]
+                del self.sheet1.rows[rng["startIndex"]:rng["endIndex"]]
+
+
+class FakeWorksheet:
+    id = 0
+
+    def __init__(self, service, spreadsheet, rows=None):
+        self.service = service
+        self.spreadsheet = spreadsheet
+        self.rows = [list(r) for r in (rows or [])]
+
+    def _width(self):
+        return max((len(r) for r in self.rows), default=0)
+
+    def _padded(self, rows):
+        width = self._width()
+        return [list(r) + [""] * (width - len(r)) for r in rows]
+
+    # ─── Reads ───
+    def get_all_values(self):
+        self.service._call("get_all_values")
+        return self._padded(self.rows)
+
+    def get_all_records(self):
+        self.service._call("get_all_records")
+        if not self.rows:
+            return []
+        header, *body = self._padded(self.rows)
+        return [dict(zip(header, row)) for row in body]
+
+    def col_values(self, col):
+        self.service._call("col_values")
+        values = [r[col - 1] if len(r) >= col else "" for r in self.rows]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def row_values(self, row):
+        self.service._call("row_values")
+        return list(self.rows[row - 1]) if len(self.rows) >= row else []
+
+    def get(self, range_name):
+        # Like the Sheets API, trailing empty rows and cells are left out
+        self.service._call("get")
+        first, last = _range_rows(range_name)
+        rows = [list(r) for r in self.rows[first - 1:last]]
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def batch_get(self, ranges):
+        self.service._call("batch_get")
+        blocks = []
+        for range_name in ranges:
+            first, last = _range_rows(range_name)
+            blocks.append([list(r) for r in self.rows[first - 1:last]])
+        return blocks
+
+    # ─── Writes ───
+    def append_row(self, values, **kwargs):
+        self.service._call("append_row")
+        self.rows.append(list(values))
+
+    def append_rows(self, values, **kwargs):
+        self.service._call("append_rows")
+        self.rows.extend(list(r) for r in values)
+
+    def insert_rows(self, values, row=1, **kwargs):
+        self.service._call("insert_rows")
+        self.rows[row - 1:row - 1] = [list(r) for r in values]
+
+    def delete_rows(self, start_index, end_index=None):
+        self.service._call("delete_rows")
+        del self.rows[start_index - 1:(end_index or start_index)]
+
+    def batch_update(self, data, **kwargs):
+        self.service._call("batch_update")
+        for item in data:
+            first, _ = _range_rows(item["range"])
+            for offset, values in enumerate(item["values"]):
+                index = first - 1 + offset
+                while len(self.rows) <= index:
+                    self.rows.append([])
+                self.rows[index] = list(values)
+
+    def clear(self):
+        self.service._call("clear")
+        self.rows = []
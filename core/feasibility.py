@@ -0,0 +1,189 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/feasibility.py
+# Fast infeasibility checks run before the backtracking search.
+#
+# The week's constraints are checked as three families of bipartite matchings
+# over the solver's domains:
+#   day       every position of a day needs its own eligible worker
+#   position  a position is used once per person per week, so its days need
+#             distinct people (this is the one-FCI/one-OFFLINE-a-week limit)
+#   person    someone who must work a day needs a position there that they
+#             haven't already taken that week
+# A failed matching comes with a Hall violator: a set of slots that together
+# have fewer candidates than members. It names the day or position and the
+# people involved. These conditions are necessary, not sufficient: a week that
+# passes can still be infeasible, and the solver will say so.
+
+from collections import defaultdict
+
+# Why a worker was left out of a slot's domain, as recorded by generate_rota
+MIN_DAYS = "min_days"
+SAME_DAY_BLOCK = "same_day_block"
+
+_EXCLUSION_TEXT = {
+    MIN_DAYS: "working too few days for FCI/OFFLINE",
+    SAME_DAY_BLOCK: "had this role on the same day last week",
+}
+
+
+def _augment(u, neighbours, match_right, seen):
+    for v in neighbours[u]:
+        if v in seen:
+            continue
+        seen.add(v)
+        if v not in match_right or _augment(match_right[v], neighbours, match_right, seen):
+            match_right[v] = u
+            return True
+    return False
+
+
+def max_matching(neighbours):
+    """Maximum bipartite matching of neighbours: {left: [right, ...]}, as {right: left}."""
+    match_right = {}
+    for u in neighbours:
+        _augment(u, neighbours, match_right, set())
+    return match_right
+
+
+def hall_violator(neighbours):
+    """Check that every left vertex can be matched to a distinct right vertex.
+
+    neighbours: {left: [right, ...]}. Returns None if it can, otherwise
+    (lefts, rights) where rights are all the neighbours of lefts and
+    len(rights) < len(lefts).
+    """
+    match_right = {}
+    for u in neighbours:
+        if _augment(u, neighbours, match_right, set()):
+            continue
+        # Everything reachable from u along alternating paths is matched
+        # (otherwise u could be augmented), so these sets violate Hall
+        lefts, rights, frontier = {u}, set(), [u]
+        while frontier:
+            x = frontier.pop()
+            for v in neighbours[x]:
+                if v not in rights:
+                    rights.add(v)
+                    w = match_right[v]
+                    if w not in lefts:
+                        lefts.add(w)
+                        frontier.append(w)
+        return lefts, rights
+    return None
+
+
+def _names(items, order=None):
+    items = sorted(items, key=order.index) if order else sorted(items)
+    return ", ".join(items) if items else "nobody"
+
+
+def _exclusions(slots, excluded):
+    # "working too few days for FCI/OFFLINE: C, D; had this role ...: E" for the given slots
+    reasons = defaultdict(set)
+    for slot in slots:
+        for person, reason in excluded.get(slot, {}).items():
+            reasons[reason].add(person)
+    return "; ".join(f"{_EXCLUSION_TEXT.get(reason, reason)}: {_names(people)}" for reason, people in sorted(reasons.items()))
+
+
+def _problem(constraint, message, day=None, positions=(), people=()):
+    return {
+        "constraint": constraint,
+        "day": day,
+        "positions": list(positions),
+        "people": sorted(people),
+        "message": message,
+    }
+
+
+def diagnose(domains, required=(), excluded=None):
+    """Return the reasons the week can't be planned, most specific first.
+
+    domains: {(day, pos): [eligible person, ...]} as passed to WeekSolver;
+    required: people who must get a slot; excluded: {(day, pos): {person:
+    reason}} for workers the unary rules removed from a slot. An empty list
+    means no contradiction was found.
+    """
+    excluded = excluded or {}
+    days = list(dict.fromkeys(day for day, _ in domains))
+    positions = list(dict.fromkeys(pos for _, pos in domains))
+    problems = []
+
+    # 1️⃣ Her gün: her pozisyona ayrı bir uygun kişi
+    for day in days:
+        slots = [(day, pos) for pos in positions if (day, pos) in domains]
+        violator = hall_violator({slot: sorted(set(domains[slot])) for slot in slots})
+        if violator is None:
+            continue
+        lefts, people = violator
+        names = [pos for _, pos in sorted(lefts, key=slots.index)]
+        if people:
+            message = (
+                f"{day}: {_names(names, positions)} need {len(names)} different inspectors "
+                f"but only {_names(people)} can take them"
+            )
+        else:
+            message = f"{day}: nobody can take {_names(names, positions)}"
+        reasons = _exclusions(lefts, excluded)
+        if reasons:
+            message += f" ({reasons})"
+        problems.append(_problem("day", message + ".", day=day, positions=names, people=people))
+
+    # 2️⃣ Her pozisyon: haftada bir kişi en fazla bir kez
+    for pos in positions:
+        slots = [(day, pos) for day in days if (day, pos) in domains]
+        violator = hall_violator({slot: sorted(set(domains[slot])) for slot in slots})
+        if violator is None:
+            continue
+        lefts, people = violator
+        on_days = [day for day, _ in sorted(lefts, key=slots.index)]
+        if people:
+            message = (
+                f"{pos} on {_names(on_days, days)} needs {len(on_days)} different inspectors "
+                f"(nobody takes {pos} twice in a week) but only {_names(people)} can take it"
+            )
+        else:
+            message = f"Nobody can take {pos} on {_names(on_days, days)}"
+        reasons = _exclusions(lefts, excluded)
+        if reasons:
+            message += f" ({reasons})"
+        problems.append(_problem("position", message + ".", positions=[pos], people=people))
+
+    # 3️⃣ Her kişi: çalışmak zorunda olduğu günlerde farklı pozisyonlar
+    must_work = defaultdict(list)
+    for day in days:
+        slots = [(day, pos) for pos in positions if (day, pos) in domains]
+        candidates = {person for slot in slots for person in domains[slot]}
+        if len(candidates) == len(slots):
+            # Exactly one worker per position: everyone eligible that day gets a slot
+            for person in candidates:
+                must_work[person].append(day)
+    for person in sorted(must_work):
+        person_days = must_work[person]
+        open_positions = {
+            day: [pos for pos in positions if person in domains.get((day, pos), ())]
+            for day in person_days
+        }
+        violator = hall_violator(open_positions)
+        if violator is None:
+            continue
+        lefts, free = violator
+        on_days = sorted(lefts, key=days.index)
+        message = (
+            f"{person} has to work {_names(on_days, days)} but can only take {_names(free, positions)} "
+            f"on those days, and each position only once a week"
+        )
+        problems.append(_problem("person", message + ".", positions=sorted(free, key=positions.index), people=[person]))
+
+    # 4️⃣ Adil dağılım için seçilen kişiler en az bir yere girebilmeli
+    for person in sorted(set(required)):
+        if not any(person in values for values in domains.values()):
+            problems.append(_problem(
+                "required", f"{person} is owed an FCI/OFFLINE but is not eligible for any slot this week.", people=[person]
+            ))
+
+    return problems
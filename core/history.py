@@ -0,0 +1,287 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/history.py
+# Compact, interned store for the saved rota history.
+#
+# load_rotas returns {week_key: {day: {position: inspector}}}, which repeats
+# every inspector, day and position string in every cell. HistoryStore keeps
+# one flat array('i') instead: a fixed days x positions block per week whose
+# cells are interned inspector ids (-1 where the week has no such cell). A
+# WeekRecord (__slots__) holds the week's row and the order of its days.
+#
+# The store is a MutableMapping with the same shape as the dict, so pages,
+# exports and the algorithm can use either one: a week is turned back into
+# nested dicts only when it is read. Window counts for fairness are a single
+# NumPy pass over the window's rows without building any dicts. numpy is
+# only imported for those scans, so loading the history stays cheap at start.
+#
+# Every store carries a revision token: a fresh one when it is built, and on
+# each write the next one derived from the old token and the week written.
+# Copies keep the token. The fairness ledger derives its own token the same
+# way, so "does this ledger describe this history" is one comparison.
+
+import hashlib
+import json
+import sys
+import threading
+import uuid
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableMapping
+from functools import wraps
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+
+MISSING = -1
+# Cell values that don't count as a worked day
+IDLE = ("", "Not Working")
+
+
+def next_revision(revision, week_key, week_data):
+    """The token after saving week_data (None: deleting) under week_key."""
+    change = json.dumps([revision, week_key, week_data], sort_keys=True)
+    return hashlib.blake2b(change.encode(), digest_size=16).hexdigest()
+
+
+def _locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class WeekRecord:
+    __slots__ = ("row", "days")
+
+    def __init__(self, row, days):
+        self.row = row      # block index in the store's cells
+        self.days = days    # day columns in saved order, a tuple shared between weeks
+
+
+class HistoryStore(MutableMapping):
+    def __init__(self, rotas=None):
+        self.days = list(DAYS)
+        self.positions = list(POSITIONS)
+        self.names = list(IDLE)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.counted = [False] * len(self.names)
+        self.cells = array("i")
+        self.records = {}
+        self._free = []
+        self._layouts = {}
+        self._sorted = None
+        self._lock = threading.RLock()
+        for week_key, week_data in (rotas or {}).items():
+            self._write(week_key, week_data)
+        self.revision = uuid.uuid4().hex
+
+    @classmethod
+    def from_rotas(cls, rotas):
+        if isinstance(rotas, HistoryStore):
+            return rotas.copy()
+        return cls(rotas)
+
+    def __getstate__(self):
+        # Sent to the candidate and batch workers; locks can't be pickled
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def stride(self):
+        return len(self.days) * len(self.positions)
+
+    # ─── Interning ───
+    def _person(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.counted.append(bool(name) and name not in IDLE)
+        return i
+
+    def _layout(self, day_ids):
+        # One tuple per distinct day order, shared by every week that uses it
+        return self._layouts.setdefault(day_ids, day_ids)
+
+    def _widen(self, days=(), positions=()):
+        # A day or position outside the fixed layout: re-encode every block
+        weeks = self.to_rotas()
+        self.days += [d for d in dict.fromkeys(days) if d not in self.days]
+        self.positions += [p for p in dict.fromkeys(positions) if p not in self.positions]
+        self.cells = array("i")
+        self.records, self._free, self._layouts = {}, [], {}
+        for week_key, week_data in weeks.items():
+            self._write(week_key, week_data)
+
+    # ─── Writes ───
+    def _write(self, week_key, week_data):
+        day_index = {day: i for i, day in enumerate(self.days)}
+        pos_index = {pos: i for i, pos in enumerate(self.positions)}
+        new_days = [d for d in week_data if d not in day_index]
+        new_positions = [p for day_data in week_data.values() for p in day_data if p not in pos_index]
+        if new_days or new_positions:
+            self._widen(new_days, new_positions)
+            return self._write(week_key, week_data)
+
+        block = array("i", [MISSING]) * self.stride
+        width = len(self.positions)
+        for day, day_data in week_data.items():
+            base = day_index[day] * width
+            for pos, person in day_data.items():
+                block[base + pos_index[pos]] = self._person(person)
+
+        record = self.records.get(week_key)
+        if record is None and not self._free:
+            row = len(self.cells) // self.stride
+            self.cells.extend(block)
+        else:
+            row = record.row if record is not None else self._free.pop()
+            self.cells[row * self.stride:(row + 1) * self.stride] = block
+        # Records are never changed in place, so copies can share them
+        self.records[week_key] = WeekRecord(row, self._layout(tuple(day_index[d] for d in week_data)))
+
+    @_locked
+    def __setitem__(self, week_key, week_data):
+        if week_key not in self.records:
+            self._sorted = None
+        self._write(week_key, week_data)
+        self.revision = next_revision(self.revision, week_key, week_data)
+
+    @_locked
+    def __delitem__(self, week_key):
+        record = self.records.pop(week_key)
+        self._free.append(record.row)
+        self._sorted = None
+        self.revision = next_revision(self.revision, week_key, None)
+
+    # ─── Reads ───
+    @_locked
+    def __getitem__(self, week_key):
+        return self._week(self.records[week_key])
+
+    def _week(self, record):
+        width = len(self.positions)
+        base = record.row * self.stride
+        week = {}
+        for d in record.days:
+            start = base + d * width
+            week[self.days[d]] = {
+                self.positions[p]: self.names[cell]
+                for p, cell in enumerate(self.cells[start:start + width])
+                if cell != MISSING
+            }
+        return week
+
+    def __iter__(self):
+        return iter(list(self.records))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, week_key):
+        return week_key in self.records
+
+    def __repr__(self):
+        return f"<HistoryStore {len(self)} weeks, {len(self.names) - len(IDLE)} inspectors>"
+
+    def sorted_keys(self):
+        keys = self._sorted
+        if keys is None:
+            keys = self._sorted = sorted(self.records)
+        return keys
+
+    @_locked
+    def to_rotas(self):
+        """The history as the nested dicts load_rotas returns."""
+        return {week_key: self._week(record) for week_key, record in self.records.items()}
+
+    @_locked
+    def copy(self):
+        # Independent store; the cells are one memcpy and records are shared
+        clone = HistoryStore.__new__(HistoryStore)
+        clone.__setstate__({
+            "days": list(self.days),
+            "positions": list(self.positions),
+            "names": list(self.names),
+            "ids": dict(self.ids),
+            "counted": list(self.counted),
+            "cells": array("i", self.cells),
+            "records": dict(self.records),
+            "_free": list(self._free),
+            "_layouts": dict(self._layouts),
+            "_sorted": self._sorted,
+            "revision": self.revision,
+        })
+        return clone
+
+    # ─── Scans ───
+    def _grid(self, np):
+        # weeks x days x positions view over the cells, no copy
+        return np.frombuffer(self.cells, dtype=np.intc).reshape(-1, len(self.days), len(self.positions))
+
+    @_locked
+    def block(self, week_key):
+        """The week as a days x positions int array of inspector ids, days in saved order."""
+        import numpy as np
+
+        record = self.records[week_key]
+        return self._grid(np)[record.row][list(record.days)]
+
+    @_locked
+    def week_counts(self, week_key):
+        """{inspector: [days, fci, offline]} for one week, like ledger.count_week."""
+        width = len(self.positions)
+        fci, offline = self.positions.index("FCI"), self.positions.index("OFFLINE")
+        record = self.records[week_key]
+        start = record.row * self.stride
+        counts = {}
+        for i, cell in enumerate(self.cells[start:start + self.stride]):
+            if cell != MISSING and self.counted[cell]:
+                row = counts.setdefault(self.names[cell], [0, 0, 0])
+                row[0] += 1
+                row[1] += i % width == fci
+                row[2] += i % width == offline
+        return counts
+
+    @_locked
+    def window_counts(self, current_week_key, n_weeks):
+        """{inspector: [days, fci, offline]} over the last n_weeks saved weeks up to current_week_key."""
+        import numpy as np
+
+        keys = self.sorted_keys()
+        end = bisect_right(keys, current_week_key)
+        rows = [self.records[week_key].row for week_key in keys[max(0, end - n_weeks):end]]
+        if not rows:
+            return {}
+        block = self._grid(np)[rows]
+        n = len(self.names)
+        counted = np.array(self.counted, dtype=bool)
+        worked = block[(block >= 0) & counted[block]]
+        days = np.bincount(worked, minlength=n)
+        roles = {}
+        for pos in ("FCI", "OFFLINE"):
+            cells = block[..., self.positions.index(pos)]
+            roles[pos] = np.bincount(cells[(cells >= 0) & counted[cells]], minlength=n)
+        return {
+            self.names[i]: [int(days[i]), int(roles["FCI"][i]), int(roles["OFFLINE"][i])]
+            for i in np.flatnonzero(days)
+        }
+
+    @_locked
+    def nbytes(self):
+        """Approximate memory held by the store's cells and records."""
+        return (
+            self.cells.buffer_info()[1] * self.cells.itemsize
+            + sum(sys.getsizeof(record) for record in self.records.values())
+            + sys.getsizeof(self.records)
+        )
@@ -0,0 +1,176 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/image_cache.py
+# Content-addressed cache for rendered rota table PNGs.
+#
+# An image is keyed by a hash of the table contents plus the render options
+# (renderer backend, title, dpi), so it never needs invalidating: edited data simply
+# hashes to a new key. Hits are served from a bounded in-memory LRU, then from
+# an on-disk LRU that survives restarts; the least recently used files are
+# removed once the directory grows past its byte budget.
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+IMAGE_CACHE_DIR = os.environ.get("ROTA_IMAGE_CACHE_DIR", ".image_cache")
+MAX_MEMORY_BYTES = 32 * 1024 * 1024
+MAX_DISK_BYTES = 256 * 1024 * 1024
+
+# On-screen previews are drawn small; the 300 dpi PNG is only for downloads
+PREVIEW_DPI = 100
+FULL_DPI = 300
+
+
+def image_key(df, **options):
+    payload = json.dumps(
+        {
+            "columns": [str(col) for col in df.columns],
+            "index": [str(row) for row in df.index],
+            "values": [[str(value) for value in row] for row in df.values.tolist()],
+            "options": options,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PNGCache:
+    def __init__(self, directory=IMAGE_CACHE_DIR, max_memory_bytes=MAX_MEMORY_BYTES, max_disk_bytes=MAX_DISK_BYTES):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.png")
+
+    # ─── Memory tier ───
+    def _remember(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # ─── Disk tier ───
+    def _disk_files(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".png"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _touch(self, key):
+        # mtime doubles as the disk LRU clock, so hot images outlive a restart
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        self._touch(key)
+        return data
+
+    def _write_disk(self, key, data):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+            else:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+        except OSError:
+            # A read-only or full disk only costs us the second tier
+            pass
+
+    def _evict_disk(self):
+        files = sorted(self._disk_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    # ─── Public API ───
+    def get(self, key):
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+        if data is not None:
+            self._touch(key)
+            return data
+        data = self._read_disk(key)
+        if data is not None:
+            with self._lock:
+                self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        with self._lock:
+            self._remember(key, data)
+            self._write_disk(key, data)
+
+    def get_or_render(self, key, render):
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+
+png_cache = PNGCache()
+
+
+def render_table_png(df, title=None, dpi=FULL_DPI, renderer=None, cache=None):
+    """Return the PNG bytes of the rota table, rendering only on a cache miss."""
+    from core import utils
+
+    renderer = renderer or utils.IMAGE_RENDERER
+    cache = cache or png_cache
+
+    options = {"renderer": renderer, "dpi": dpi}
+    if title is not None:
+        options["title"] = title
+    key = image_key(df, **options)
+
+    return cache.get_or_render(
+        key,
+        lambda: utils.generate_table_image(df, title=title, dpi=dpi, renderer=renderer).getvalue()
+    )
@@ -0,0 +1,231 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/ledger.py
+# Per-week, per-inspector (days, FCI, OFFLINE) counts with cumulative sums.
+#
+# prefix[i] holds the totals of weeks[0..i], so the counts for any window of
+# consecutive weeks are prefix[end] - prefix[start - 1]: O(inspectors) no
+# matter how long the window or the history is.
+#
+# `synced` is the revision token of the HistoryStore the ledger was last
+# synced with, advanced by every set_week/remove_week exactly as the store
+# advances its own. covers() compares the two tokens, so checking that the
+# ledger may answer for a history is O(1).
+
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right
+from functools import wraps
+
+from core.history import HistoryStore, next_revision
+
+LEDGER_FILE = "fairness_ledger.json"
+LEDGER_VERSION = 1
+
+
+def count_week(week_data):
+    counts = {}
+    for day_data in week_data.values():
+        for role, person in day_data.items():
+            if person and person != "Not Working":
+                row = counts.setdefault(person, [0, 0, 0])
+                row[0] += 1
+                if role == "FCI":
+                    row[1] += 1
+                elif role == "OFFLINE":
+                    row[2] += 1
+    return counts
+
+
+def _week_counts(rotas):
+    # (week_key, counts) for every week; a HistoryStore counts its cells directly
+    if isinstance(rotas, HistoryStore):
+        return ((week_key, rotas.week_counts(week_key)) for week_key in rotas)
+    return ((week_key, count_week(week_data)) for week_key, week_data in rotas.items())
+
+
+def _add(total, counts):
+    row = dict(total)
+    for person, (days, fci, offline) in counts.items():
+        d, f, o = row.get(person, (0, 0, 0))
+        row[person] = (d + days, f + fci, o + offline)
+    return row
+
+
+def _locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class FairnessLedger:
+    def __init__(self, weeks=None):
+        # weeks: {week_key: {inspector: [days, fci, offline]}}
+        self.weeks = {}
+        self.keys = []
+        self.prefix = []
+        self.synced = None
+        # Sessions share the process-wide ledger, so updates, queries and saves
+        # must not interleave
+        self._lock = threading.RLock()
+        for week_key, counts in (weeks or {}).items():
+            self.weeks[week_key] = {p: list(c) for p, c in counts.items()}
+        self.keys = sorted(self.weeks)
+        self._rebuild(0)
+
+    def __getstate__(self):
+        # Locks can't be pickled (the ledger is sent to candidate workers)
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_rotas(cls, rotas):
+        ledger = cls(dict(_week_counts(rotas)))
+        ledger.synced = getattr(rotas, "revision", None)
+        return ledger
+
+    def _rebuild(self, start):
+        # Recompute cumulative rows from index `start` onwards
+        del self.prefix[start:]
+        total = self.prefix[start - 1] if start > 0 else {}
+        for week_key in self.keys[start:]:
+            total = _add(total, self.weeks[week_key])
+            self.prefix.append(total)
+
+    # ─── Incremental updates ───
+    @_locked
+    def set_week(self, week_key, week_data):
+        if self.synced is not None:
+            self.synced = next_revision(self.synced, week_key, week_data)
+        counts = count_week(week_data)
+        if self.weeks.get(week_key) == counts:
+            return False
+        if week_key not in self.weeks:
+            self.keys.insert(bisect_right(self.keys, week_key), week_key)
+        self.weeks[week_key] = counts
+        self._rebuild(self.keys.index(week_key))
+        return True
+
+    @_locked
+    def remove_week(self, week_key):
+        if week_key not in self.weeks:
+            return False
+        if self.synced is not None:
+            self.synced = next_revision(self.synced, week_key, None)
+        index = self.keys.index(week_key)
+        self.keys.pop(index)
+        del self.weeks[week_key]
+        self._rebuild(index)
+        return True
+
+    @_locked
+    def sync(self, rotas):
+        """Bring the ledger in line with a freshly loaded rotas dict.
+
+        Only the prefix rows from the earliest changed week onwards are rebuilt.
+        Returns True if anything changed.
+        """
+        self.synced = getattr(rotas, "revision", None)
+        changed = [wk for wk in self.weeks if wk not in rotas]
+        for week_key, counts in _week_counts(rotas):
+            if self.weeks.get(week_key) != counts:
+                self.weeks[week_key] = counts
+                changed.append(week_key)
+        if not changed:
+            return False
+        for week_key in changed:
+            if week_key not in rotas:
+                del self.weeks[week_key]
+        self.keys = sorted(self.weeks)
+        self._rebuild(bisect_left(self.keys, min(changed)))
+        return True
+
+    @_locked
+    def copy(self):
+        # An independent ledger for planning ahead. Prefix rows are replaced on
+        # update, never changed in place, so the copy can share them.
+        clone = FairnessLedger()
+        clone.weeks = dict(self.weeks)
+        clone.keys = list(self.keys)
+        clone.prefix = list(self.prefix)
+        clone.synced = self.synced
+        return clone
+
+    def covers(self, rotas):
+        # Only a HistoryStore carries a revision; plain dicts are never covered
+        return self.synced is not None and getattr(rotas, "revision", None) == self.synced
+
+    # ─── Queries ───
+    @_locked
+    def window(self, current_week_key, n_weeks):
+        """Counts over the last `n_weeks` saved weeks up to and including current_week_key."""
+        end = bisect_right(self.keys, current_week_key)
+        start = max(0, end - n_weeks)
+        if end == 0:
+            return {}
+        upper = self.prefix[end - 1]
+        lower = self.prefix[start - 1] if start > 0 else {}
+        counts = {}
+        for person, (d, f, o) in upper.items():
+            ld, lf, lo = lower.get(person, (0, 0, 0))
+            if d - ld or f - lf or o - lo:
+                counts[person] = [d - ld, f - lf, o - lo]
+        return counts
+
+    # ─── Persistence ───
+    def to_dict(self):
+        return {"version": LEDGER_VERSION, "weeks": self.weeks}
+
+    @_locked
+    def save(self, path=None):
+        # LEDGER_FILE is read at call time so a run can point it elsewhere
+        path = path or LEDGER_FILE
+        # A unique temp file per save, so concurrent processes can't clobber each other's
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                                        dir=os.path.dirname(path) or ".")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or LEDGER_FILE
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != LEDGER_VERSION:
+            return cls()
+        return cls(data.get("weeks", {}))
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    # Process-wide ledger, loaded from disk on first use
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = FairnessLedger.load()
+        return _ledger
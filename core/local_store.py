@@ -0,0 +1,449 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/local_store.py
+# SQLite storage backend, optionally mirroring an upstream backend.
+#
+# Every read is served from SQLite. Writes land in SQLite at once; when an
+# upstream (normally Google Sheets) is configured they are also queued in an
+# outbox table that a background thread pushes upstream, which stays the
+# system of record. On start the mirror is reconciled with the upstream:
+# pending outbox entries are pushed first, then the upstream is pulled and the
+# still-unsynced writes re-applied on top. The append-only change log is
+# pulled incrementally from a high-water mark kept in the meta table.
+#
+# The outbox doubles as a durable write queue: a save or delete supersedes any
+# queued save or delete of the same week, consecutive log appends go up as one
+# bulk append, upstream calls are paced by a token bucket sized to the Sheets
+# quota and failures are retried with exponential backoff.
+#
+# A fresh mirror has nothing to serve until its first reconcile lands. Until
+# then reads raise MirrorNotReady instead of returning an empty history, and
+# the sync thread keeps retrying the reconcile with the same backoff.
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+from core.data_utils import LOG_COLUMNS, POSITIONS
+
+DB_FILE = "rota_store.sqlite3"
+SYNC_RETRY_SECONDS = 30
+BACKOFF_BASE_SECONDS = 2
+BACKOFF_MAX_SECONDS = 300
+
+# Upper bound of Sheets requests each queued write or a reconcile makes, from
+# core.data_utils: save and save_weeks read column A, then update, delete and
+# insert/append; delete reads column A, batch-gets and deletes; archive reads
+# the header row and appends; reconcile reads the three sheets
+CALL_COST = {"save": 4, "save_weeks": 4, "delete": 3, "archive": 2, "logs": 1, "reconcile": 3}
+
+logger = logging.getLogger(__name__)
+
+
+class MirrorNotReady(Exception):
+    pass
+
+_POSITION_COLUMNS = ", ".join(f'"{pos}" TEXT NOT NULL DEFAULT \'\'' for pos in POSITIONS)
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS rotas (
+    week_start TEXT NOT NULL,
+    day TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    {_POSITION_COLUMNS},
+    PRIMARY KEY (week_start, day)
+);
+CREATE TABLE IF NOT EXISTS deleted_rotas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    week_start TEXT NOT NULL,
+    day TEXT NOT NULL,
+    {_POSITION_COLUMNS}
+);
+CREATE TABLE IF NOT EXISTS change_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {", ".join(f"{col} TEXT NOT NULL DEFAULT ''" for col in LOG_COLUMNS)},
+    upstream_row INTEGER
+);
+CREATE INDEX IF NOT EXISTS change_logs_week ON change_logs (week_start);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    week_key TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# ─── Local table helpers ───
+def _write_week(conn, table, week_key, rota_dict, seq=True):
+    cols = ", ".join(f'"{pos}"' for pos in POSITIONS)
+    marks = ", ".join("?" for _ in POSITIONS)
+    for i, (day, roles) in enumerate(rota_dict.items()):
+        values = [roles.get(pos, "") for pos in POSITIONS]
+        if seq:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} (week_start, day, seq, {cols}) VALUES (?, ?, ?, {marks})",
+                [week_key, day, i] + values,
+            )
+        else:
+            conn.execute(
+                f"INSERT INTO {table} (week_start, day, {cols}) VALUES (?, ?, {marks})",
+                [week_key, day] + values,
+            )
+
+
+def _read_weeks(conn, table, order, where="", params=()):
+    cols = ", ".join(f'"{pos}"' for pos in POSITIONS)
+    all_rotas = {}
+    for row in conn.execute(f"SELECT week_start, day, {cols} FROM {table} {where} ORDER BY {order}", params):
+        week, day, *assignments = row
+        all_rotas.setdefault(week, {})[day] = dict(zip(POSITIONS, assignments))
+    return all_rotas
+
+
+def _insert_logs(conn, entries, first_row=None):
+    # first_row: upstream row number of the first entry; None for local-only rows
+    for i, entry in enumerate(entries):
+        conn.execute(
+            f"INSERT INTO change_logs ({', '.join(LOG_COLUMNS)}, upstream_row) VALUES ({', '.join('?' for _ in LOG_COLUMNS)}, ?)",
+            [str(entry.get(col, "")) for col in LOG_COLUMNS] + [None if first_row is None else first_row + i],
+        )
+
+
+def _apply_local(conn, kind, payload):
+    # Applies one write to the local tables; also used to replay the outbox on
+    # top of freshly pulled data during reconcile
+    if kind == "save":
+        conn.execute("DELETE FROM rotas WHERE week_start = ?", (payload["week_key"],))
+        _write_week(conn, "rotas", payload["week_key"], payload["rota"])
+    elif kind == "save_weeks":
+        for week_key, rota_dict in payload["weeks"].items():
+            conn.execute("DELETE FROM rotas WHERE week_start = ?", (week_key,))
+            _write_week(conn, "rotas", week_key, rota_dict)
+    elif kind == "delete":
+        conn.execute("DELETE FROM rotas WHERE week_start = ?", (payload["week_key"],))
+    elif kind == "archive":
+        _write_week(conn, "deleted_rotas", payload["week_key"], payload["rota"], seq=False)
+    elif kind == "logs":
+        _insert_logs(conn, payload["entries"])
+
+
+def _push(upstream, kind, payload):
+    if kind == "save":
+        upstream.save_rotas(payload["week_key"], payload["rota"])
+    elif kind == "save_weeks":
+        upstream.save_weeks(payload["weeks"])
+    elif kind == "delete":
+        upstream.delete_rota(payload["week_key"])
+    elif kind == "archive":
+        upstream.archive_deleted_rota(payload["week_key"], payload["rota"])
+    elif kind == "logs":
+        upstream.append_change_logs(payload["entries"])
+
+
+class SQLiteBackend:
+    # change_log_weeks and per-week log reads are served from the week_start index
+    indexed_change_logs = True
+
+    def __init__(self, path=DB_FILE, upstream=None, retry_seconds=SYNC_RETRY_SECONDS, on_reconcile=None,
+                 rate_limiter=None, backoff_base=BACKOFF_BASE_SECONDS, backoff_max=BACKOFF_MAX_SECONDS):
+        self.path = path
+        self.upstream = upstream
+        self.on_reconcile = on_reconcile
+        self.retry_seconds = retry_seconds
+        self.rate_limiter = rate_limiter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._worker = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"pushed": 0, "calls": 0, "failures": 0, "consecutive_failures": 0,
+                       "last_error": None, "last_push": None, "retry_at": None}
+        self._latencies = deque(maxlen=200)  # queued -> acknowledged upstream, seconds
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            log_columns = {row[1] for row in conn.execute("PRAGMA table_info(change_logs)")}
+            if "upstream_row" not in log_columns:
+                # Mirrors created before incremental log sync: re-pull the log once
+                conn.execute("ALTER TABLE change_logs ADD COLUMN upstream_row INTEGER")
+                conn.execute("DELETE FROM meta WHERE key = 'logs_seen'")
+            if "week_key" not in {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}:
+                conn.execute("ALTER TABLE outbox ADD COLUMN week_key TEXT")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _write(self, kind, payload):
+        week_key = payload.get("week_key")
+        with self._connect() as conn:
+            _apply_local(conn, kind, payload)
+            if self.upstream is not None:
+                if kind in ("save", "delete"):
+                    # Sheets only needs the week's final state: a save replaces
+                    # the week outright and a delete removes it
+                    conn.execute("DELETE FROM outbox WHERE week_key = ? AND kind IN ('save', 'delete')", (week_key,))
+                elif kind == "save_weeks":
+                    conn.executemany(
+                        "DELETE FROM outbox WHERE week_key = ? AND kind IN ('save', 'delete')",
+                        [(wk,) for wk in payload["weeks"]],
+                    )
+                conn.execute(
+                    "INSERT INTO outbox (kind, payload, created, week_key) VALUES (?, ?, ?, ?)",
+                    (kind, json.dumps(payload), time.time(), week_key),
+                )
+        self._wake.set()
+
+    # ─── Upstream sync ───
+    def _next_batch(self):
+        # The oldest entry, plus any log appends queued right after it
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, kind, payload, created FROM outbox ORDER BY id LIMIT 100").fetchall()
+        if not rows or rows[0][1] != "logs":
+            return rows[:1]
+        batch = []
+        for row in rows:
+            if row[1] != "logs":
+                break
+            batch.append(row)
+        return batch
+
+    def _spend(self, kind):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(CALL_COST[kind])
+        with self._stats_lock:
+            self._stats["calls"] += CALL_COST[kind]
+
+    def _record_failure(self, error):
+        with self._stats_lock:
+            self._stats["failures"] += 1
+            self._stats["consecutive_failures"] += 1
+            self._stats["last_error"] = f"{type(error).__name__}: {error}"
+            self._stats["retry_at"] = time.time() + self.next_retry_delay()
+
+    def push_pending(self):
+        """Push queued writes upstream in order. Stops at the first failure."""
+        if self.upstream is None:
+            return True
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return True
+            kind = batch[0][1]
+            payloads = [json.loads(row[2]) for row in batch]
+            payload = payloads[0] if kind != "logs" else {"entries": [e for p in payloads for e in p["entries"]]}
+            self._spend(kind)
+            try:
+                _push(self.upstream, kind, payload)
+            except Exception as e:
+                logger.warning("Upstream sync failed for %s #%s: %s", kind, batch[0][0], e)
+                self._record_failure(e)
+                return False
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM outbox WHERE id = ?", [(row[0],) for row in batch])
+            now = time.time()
+            with self._stats_lock:
+                self._stats["pushed"] += len(batch)
+                self._stats["consecutive_failures"] = 0
+                self._stats["retry_at"] = None
+                self._stats["last_push"] = now
+                self._latencies.extend(now - row[3] for row in batch)
+
+    def next_retry_delay(self):
+        # Exponential backoff with jitter, after the consecutive failures so far
+        failures = max(1, self._stats["consecutive_failures"])
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _wait_for_retry(self):
+        # New writes must not cut a backoff short while Sheets is refusing us
+        with self._stats_lock:
+            retry_at = self._stats["retry_at"] or time.time()
+        time.sleep(max(0.0, retry_at - time.time()))
+
+    def is_ready(self):
+        """False until a mirror of an upstream has pulled it at least once."""
+        if self.upstream is None:
+            return True
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM meta WHERE key = 'last_reconcile'").fetchone() is not None
+
+    def _check_ready(self):
+        if not self.is_ready():
+            with self._stats_lock:
+                error = self._stats["last_error"]
+            raise MirrorNotReady(
+                "The local mirror has not loaded Google Sheets yet" + (f" (last error: {error})" if error else "")
+            )
+
+    def pending_count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def sync_metrics(self):
+        """Queue depth, latency and failure counters for the admin panel."""
+        with self._connect() as conn:
+            depth, oldest = conn.execute("SELECT COUNT(*), MIN(created) FROM outbox").fetchone()
+        with self._stats_lock:
+            metrics = dict(self._stats)
+            latencies = sorted(self._latencies)
+        now = time.time()
+        metrics.update(
+            ready=self.is_ready(),
+            queue_depth=depth,
+            oldest_pending_seconds=now - oldest if oldest is not None else 0.0,
+            latency_p50_seconds=latencies[len(latencies) // 2] if latencies else None,
+            latency_p95_seconds=latencies[int(len(latencies) * 0.95)] if latencies else None,
+            tokens=self.rate_limiter.tokens if self.rate_limiter is not None else None,
+        )
+        return metrics
+
+    def _logs_seen(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'logs_seen'").fetchone()
+        return int(row[0]) if row else None
+
+    def reconcile(self):
+        """Push pending writes, then replace the mirror with the upstream contents.
+
+        The change log only grows, so when the upstream supports it only the
+        rows after the high-water mark are pulled; rows already mirrored keep
+        their upstream row number and stay put.
+        """
+        if self.upstream is None:
+            return True
+        if not self.push_pending():
+            return False
+        incremental = hasattr(self.upstream, "load_change_logs_since")
+        seen = self._logs_seen() if incremental else None
+        self._spend("reconcile")
+        try:
+            rotas = self.upstream.load_rotas()
+            deleted = self.upstream.load_deleted_rotas()
+            if incremental:
+                logs, position = self.upstream.load_change_logs_since(seen or 0)
+            else:
+                logs = self.upstream.load_change_logs()
+        except Exception as e:
+            logger.warning("Upstream reconcile failed: %s", e)
+            self._record_failure(e)
+            return False
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM rotas")
+            conn.execute("DELETE FROM deleted_rotas")
+            for week_key, week_data in rotas.items():
+                _write_week(conn, "rotas", week_key, week_data)
+            for week_key, week_data in deleted.items():
+                _write_week(conn, "deleted_rotas", week_key, week_data, seq=False)
+            if incremental and seen is not None:
+                # Local-only rows have been pushed by now or are still in the
+                # outbox; either way they come back below
+                conn.execute("DELETE FROM change_logs WHERE upstream_row IS NULL")
+            else:
+                conn.execute("DELETE FROM change_logs")
+            _insert_logs(conn, logs, first_row=(seen or 0) + 1 if incremental else None)
+            if incremental:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('logs_seen', ?)", (str(position),))
+            # Writes queued while the pull was running are still only local
+            for kind, payload in conn.execute("SELECT kind, payload FROM outbox ORDER BY id").fetchall():
+                _apply_local(conn, kind, json.loads(payload))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_reconcile', ?)", (str(time.time()),))
+        if self.on_reconcile is not None:
+            self.on_reconcile()
+        return True
+
+    def _sync_loop(self, reconcile_first):
+        if reconcile_first:
+            self.reconcile()
+        # A mirror that has never pulled the upstream retries that before anything else
+        while not self.is_ready():
+            if not self.reconcile():
+                self._wait_for_retry()
+        while True:
+            if self.push_pending():
+                self._wake.wait(self.retry_seconds)
+                self._wake.clear()
+            else:
+                self._wait_for_retry()
+
+    def start(self):
+        if self.upstream is None:
+            return
+        with self._start_lock:
+            if self._worker is not None:
+                return
+            never_synced = not self.is_ready()
+            # An empty mirror has nothing to serve yet, so the very first pull blocks;
+            # otherwise reconcile in the background and serve local data meanwhile
+            if never_synced:
+                self.reconcile()
+            self._worker = threading.Thread(target=self._sync_loop, args=(not never_synced,), name="sheets-sync", daemon=True)
+            self._worker.start()
+
+    # ─── Storage API ───
+    def load_rotas(self):
+        self._check_ready()
+        with self._connect() as conn:
+            return _read_weeks(conn, "rotas", "week_start, seq")
+
+    def load_deleted_rotas(self):
+        self._check_ready()
+        with self._connect() as conn:
+            return _read_weeks(conn, "deleted_rotas", "id")
+
+    def save_rotas(self, week_key: str, rota_dict: Dict[str, Dict[str, str]]):
+        self._write("save", {"week_key": week_key, "rota": rota_dict})
+
+    def save_weeks(self, weeks: Dict[str, Dict[str, Dict[str, str]]]):
+        # One local transaction and one queued upstream write for all the weeks
+        if weeks:
+            self._write("save_weeks", {"weeks": weeks})
+
+    def delete_rota(self, week_key: str):
+        with self._connect() as conn:
+            deleted_data = _read_weeks(conn, "rotas", "seq", "WHERE week_start = ?", (week_key,)).get(week_key, {})
+        self._write("delete", {"week_key": week_key})
+        return deleted_data
+
+    def archive_deleted_rota(self, week_key: str, rota_dict: Dict[str, Dict[str, str]]):
+        self._write("archive", {"week_key": week_key, "rota": rota_dict})
+
+    def append_change_logs(self, entries):
+        entries = list(entries)
+        if entries:
+            self._write("logs", {"entries": entries})
+
+    def load_change_logs(self, week_start=None):
+        self._check_ready()
+        where, params = ("WHERE week_start = ?", (week_start,)) if week_start is not None else ("", ())
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {', '.join(LOG_COLUMNS)} FROM change_logs {where} ORDER BY id", params).fetchall()
+        return [dict(zip(LOG_COLUMNS, row)) for row in rows]
+
+    def change_log_weeks(self):
+        # Served from the week_start index
+        self._check_ready()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT DISTINCT week_start FROM change_logs ORDER BY week_start DESC").fetchall()
+        return [row[0] for row in rows]
@@ -0,0 +1,123 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/profiling.py
+# Cold-start import profiler for the Streamlit entry points.
+#
+#   python -m core.profiling [homepage] [admin] [--budget-ms N] [--top N]
+#
+# The top-level imports of each entry point are replayed in a fresh
+# interpreter under `python -X importtime`. The slowest modules are reported
+# and the exit status is non-zero when an entry point goes over the budget or
+# loads a module that has to stay lazy until first use.
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+COLD_START_BUDGET_MS = 1500
+
+# name -> (script, modules that must not be imported at start)
+ENTRY_POINTS = {
+    "homepage": ("0_Homepage.py", ("matplotlib", "gspread", "google.oauth2", "pandas")),
+    "admin": ("pages/1_Admin Panel.py", ("matplotlib", "gspread", "google.oauth2")),
+}
+
+
+def _is_stop_gate(node):
+    # `if ...: st.stop()` ends what every visitor runs
+    return isinstance(node, ast.If) and any(
+        isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and call.func.attr == "stop"
+        for call in ast.walk(node)
+    )
+
+
+def top_level_imports(path):
+    # Module-level imports up to the first st.stop() gate; imports inside
+    # functions or behind the gate are the ones that stay lazy
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if _is_stop_gate(node):
+            break
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package" -> list of
+    # (module, self_ms, cumulative_ms, depth) in import order
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(parts[0]) / 1000, int(parts[1]) / 1000, depth))
+    return rows
+
+
+def profile_entry(name):
+    script, lazy_modules = ENTRY_POINTS[name]
+    modules = top_level_imports(os.path.join(ROOT_DIR, script))
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {script} failed:\n{result.stderr[-2000:]}")
+
+    rows = parse_importtime(result.stderr)
+    loaded = {module for module, _, _, _ in rows}
+    return {
+        "entry": name,
+        "script": script,
+        "total_ms": sum(cumulative for _, _, cumulative, depth in rows if depth == 0),
+        "modules": rows,
+        "eager": sorted(m for m in lazy_modules if m in loaded),
+    }
+
+
+def report(profile, budget_ms, top=15):
+    lines = [f"{profile['entry']} ({profile['script']}): {profile['total_ms']:.0f} ms of {budget_ms} ms budget"]
+    slowest = sorted(profile["modules"], key=lambda row: row[1], reverse=True)[:top]
+    for module, self_ms, cumulative_ms, _ in slowest:
+        lines.append(f"  {self_ms:8.1f} ms self {cumulative_ms:9.1f} ms cumulative  {module}")
+    if profile["eager"]:
+        lines.append(f"  loaded at start but should be lazy: {', '.join(profile['eager'])}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report per-module import time of the Streamlit entry points.")
+    parser.add_argument("entries", nargs="*", metavar="entry", help=f"one of {', '.join(ENTRY_POINTS)} (default: all)")
+    parser.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.entries if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry point: {', '.join(unknown)}")
+
+    ok = True
+    for name in args.entries or list(ENTRY_POINTS):
+        profile = profile_entry(name)
+        print(report(profile, args.budget_ms, args.top))
+        ok = ok and profile["total_ms"] <= args.budget_ms and not profile["eager"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
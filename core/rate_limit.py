@@ -0,0 +1,58 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/rate_limit.py
+# Token bucket used to keep Sheets traffic under the per-minute quota.
+
+import os
+import threading
+import time
+
+# Google Sheets allows 60 requests per minute per user by default
+SHEETS_QUOTA_PER_MINUTE = int(os.environ.get("ROTA_SHEETS_QUOTA_PER_MINUTE", "60"))
+BURST_FRACTION = 0.2
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_quota(cls, per_minute, burst_fraction=BURST_FRACTION, **kwargs):
+        # A bucket lets through capacity + rate * 60 requests in any minute, so
+        # split the quota between the burst and the refill to stay under it
+        capacity = max(1.0, per_minute * burst_fraction)
+        return cls((per_minute - capacity) / 60, capacity, **kwargs)
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, n=1):
+        """Take n tokens, sleeping until they are available. Returns the time waited."""
+        n = min(n, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return waited
+                delay = (n - self._tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
@@ -0,0 +1,425 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/solver.py
+# Backtracking constraint solver over the (day, position) slots of a week.
+#
+# A slot conflicts with every other slot on the same day (one person per
+# position per day) and every slot of the same position on other days (each
+# position used only once per person per week). Domains arrive already
+# filtered for unary rules (FCI/OFFLINE minimum days, same-day blocks) and in
+# preference order; the solver keeps that order when trying values.
+#
+# Each day and each position is an all-different group. After every
+# assignment the touched groups are filtered to a fixpoint with Régin's
+# matching-based rule: a value stays in a slot's domain only if some matching
+# that gives every open slot of the group its own person uses it. Tight weeks
+# (as many workers as positions) are then mostly decided by propagation
+# instead of by backtracking.
+
+from core.feasibility import max_matching
+
+
+# Values tried with plain forward checking before the search restarts with
+# full filtering; most weeks are solved well within it
+FORWARD_CHECK_NODES = 200
+
+
+# Values the optimising search may try before it settles for the best
+# assignment found so far
+MINIMIZE_NODES = 5_000
+
+
+class _OutOfNodes(Exception):
+    pass
+
+
+def _peers(slots):
+    return {
+        slot: [other for other in slots if other != slot and (other[0] == slot[0] or other[1] == slot[1])]
+        for slot in slots
+    }
+
+
+def _groups(slots):
+    # Slots sharing a day or a position must all receive different people
+    groups = {}
+    for slot in slots:
+        groups.setdefault(("day", slot[0]), []).append(slot)
+        groups.setdefault(("pos", slot[1]), []).append(slot)
+    return groups
+
+
+def _strongly_connected(graph):
+    # Tarjan's algorithm: {node: component id}
+    index, low, component, stack, on_stack = {}, {}, {}, [], set()
+
+    def visit(node):
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        for succ in graph[node]:
+            if succ not in index:
+                visit(succ)
+                low[node] = min(low[node], low[succ])
+            elif succ in on_stack:
+                low[node] = min(low[node], index[succ])
+        if low[node] == index[node]:
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component[member] = node
+                if member == node:
+                    break
+
+    for node in graph:
+        if node not in index:
+            visit(node)
+    return component
+
+
+def supported_values(domains):
+    """Régin's all-different filtering of one group.
+
+    domains: {slot: values}. Returns {slot: set of values some complete
+    matching gives it}, or None if the slots can't all get different values.
+    """
+    if all(len(values) >= len(domains) for values in domains.values()):
+        # Whatever one slot takes, the others still have enough values left
+        return {slot: set(values) for slot, values in domains.items()}
+    match_right = max_matching(domains)
+    if len(match_right) < len(domains):
+        return None
+    match_left = {slot: value for value, slot in match_right.items()}
+
+    # Alternating paths over values: v -> M(x) for every slot x that could take v instead
+    graph = {}
+    for slot, values in domains.items():
+        for value in values:
+            graph.setdefault(value, [])
+            if value != match_left[slot]:
+                graph[value].append(match_left[slot])
+
+    # Values on an alternating path from an unmatched value can be swapped in
+    free = [value for value in graph if value not in match_right]
+    reachable, frontier = set(free), list(free)
+    while frontier:
+        for succ in graph[frontier.pop()]:
+            if succ not in reachable:
+                reachable.add(succ)
+                frontier.append(succ)
+    # ...and so can values on an alternating cycle through the slot's own value
+    component = _strongly_connected(graph)
+
+    return {
+        slot: {
+            value for value in values
+            if value == match_left[slot] or value in reachable or component[value] == component[match_left[slot]]
+        }
+        for slot, values in domains.items()
+    }
+
+
+def min_cost_assignment(rows):
+    """Cheapest way to give every row its own value (Hungarian method).
+
+    rows: [{value: cost}, ...]. Returns the total cost, or inf if the rows
+    can't all get different values.
+    """
+    columns = list({value for row in rows for value in row})
+    if len(columns) < len(rows):
+        return float("inf")
+    # Missing pairs cost more than any complete assignment could
+    missing = 1 + sum(max((abs(c) for c in row.values()), default=0) for row in rows)
+    missing *= 2
+    n, m = len(rows), len(columns)
+    u, v = [0.0] * (n + 1), [0.0] * (m + 1)
+    owner, way = [0] * (m + 1), [0] * (m + 1)
+    for i in range(1, n + 1):
+        owner[0], j0 = i, 0
+        minv, used = [float("inf")] * (m + 1), [False] * (m + 1)
+        while owner[j0]:
+            used[j0] = True
+            i0, delta, j1 = owner[j0], float("inf"), 0
+            row = rows[i0 - 1]
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                cur = row.get(columns[j - 1], missing) - u[i0] - v[j]
+                if cur < minv[j]:
+                    minv[j], way[j] = cur, j0
+                if minv[j] < delta:
+                    delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    total, complete = 0, True
+    for j in range(1, m + 1):
+        if owner[j]:
+            row = rows[owner[j] - 1]
+            if columns[j - 1] not in row:
+                complete = False
+            else:
+                total += row[columns[j - 1]]
+    return total if complete else float("inf")
+
+
+class WeekSolver:
+    def __init__(self, domains, required=()):
+        # domains: {(day, pos): [candidate, ...]} in preference order
+        self.slots = list(domains)
+        self.order = {slot: list(dict.fromkeys(values)) for slot, values in domains.items()}
+        self.live = {slot: set(values) for slot, values in self.order.items()}
+        self.required = set(required)
+        self.peers = _peers(self.slots)
+        self.groups = _groups(self.slots)
+        self.days = {key[1]: members for key, members in self.groups.items() if key[0] == "day"}
+        self.slot_groups = {slot: [] for slot in self.slots}
+        for key, members in self.groups.items():
+            for slot in members:
+                self.slot_groups[slot].append(key)
+        self.assignment = {}
+        self.nodes = 0
+        self.filtering = True
+        self.node_limit = None
+
+    # ─── Consistency checks ───
+    def _group_ok(self, key):
+        open_slots = [s for s in self.groups[key] if s not in self.assignment]
+        if not open_slots:
+            return True
+        candidates = set()
+        for slot in open_slots:
+            candidates |= self.live[slot]
+        return len(candidates) >= len(open_slots)
+
+    def _required_ok(self):
+        placed = set(self.assignment.values())
+        for person in self.required - placed:
+            if not any(person in self.live[s] for s in self.slots if s not in self.assignment):
+                return False
+        return True
+
+    def consistent(self, keys=None):
+        keys = self.groups if keys is None else keys
+        if any(not self.live[s] for s in self.slots if s not in self.assignment):
+            return False
+        return all(self._group_ok(key) for key in keys) and self._required_ok()
+
+    # ─── Search ───
+    def _select_slot(self, slots):
+        # Most-constrained first; ties broken by the caller's slot order
+        open_slots = [s for s in slots if s not in self.assignment]
+        if not open_slots:
+            return None
+        return min(open_slots, key=lambda s: len(self.live[s]))
+
+    def _values(self, slot):
+        return [v for v in self.order[slot] if v in self.live[slot]]
+
+    def _person_domains(self, person):
+        # {day: open positions the person could take} over the days where every
+        # candidate has to work; those days need different positions
+        domains = {}
+        for day, members in self.days.items():
+            open_slots = [s for s in members if s not in self.assignment]
+            mine = [s for s in open_slots if person in self.live[s]]
+            if mine and len(set().union(*(self.live[s] for s in open_slots))) == len(open_slots):
+                domains[day] = mine
+        return domains
+
+    def _supported(self, key):
+        # {slot: supported values} for a day/position group or a person, None on a wipe-out
+        if key[0] != "person":
+            open_slots = [s for s in self.groups[key] if s not in self.assignment]
+            return supported_values({s: self.live[s] for s in open_slots})
+        person = key[1]
+        domains = self._person_domains(person)
+        supported = supported_values({day: [slot[1] for slot in mine] for day, mine in domains.items()})
+        if supported is None:
+            return None
+        return {
+            slot: self.live[slot] - {person}
+            for day, mine in domains.items() for slot in mine if slot[1] not in supported[day]
+        }
+
+    def _propagate(self, keys, removed):
+        # Filter the given groups, and any group whose domains that shrinks, to
+        # a fixpoint. Removed (slot, value) pairs are appended to removed.
+        queue = list(keys)
+        queued = set(queue)
+
+        def touch(key):
+            if key not in queued:
+                queue.append(key)
+                queued.add(key)
+
+        while queue:
+            key = queue.pop()
+            queued.discard(key)
+            supported = self._supported(key)
+            if supported is None:
+                return False
+            for slot, values in supported.items():
+                dropped = self.live[slot] - values
+                if not dropped:
+                    continue
+                self.live[slot] -= dropped
+                removed.extend((slot, value) for value in dropped)
+                for other in self.slot_groups[slot]:
+                    touch(other)
+                for value in dropped:
+                    touch(("person", value))
+        return True
+
+    def assign(self, slot, value):
+        # Forward checking: drop value from every unassigned peer, then filter
+        removed = []
+        self.assignment[slot] = value
+        for peer in self.peers[slot]:
+            if peer not in self.assignment and value in self.live[peer]:
+                self.live[peer].discard(value)
+                removed.append((peer, value))
+        keys = {key for peer, _ in removed for key in self.slot_groups[peer]}
+        keys.update(self.slot_groups[slot])
+        if not self.filtering:
+            return removed, self.consistent(keys)
+        keys.add(("person", value))
+        return removed, self._propagate(keys, removed) and self._required_ok()
+
+    def unassign(self, slot, value, removed):
+        del self.assignment[slot]
+        for peer, dropped in removed:
+            self.live[peer].add(dropped)
+
+    def _root_ok(self):
+        # Filtering before the first choice is never undone
+        people = {("person", person) for values in self.live.values() for person in values}
+        return self.consistent() and self._propagate(list(self.groups) + sorted(people), [])
+
+    def _search(self, slots):
+        slot = self._select_slot(slots)
+        if slot is None:
+            return True
+        for value in self._values(slot):
+            if self.node_limit is not None and self.nodes >= self.node_limit:
+                raise _OutOfNodes
+            self.nodes += 1
+            removed, ok = self.assign(slot, value)
+            if ok and self._search(slots):
+                return True
+            self.unassign(slot, value, removed)
+        return False
+
+    def _settle(self, slots):
+        # Plain forward checking first: it is cheaper per value and enough for
+        # most weeks. A week it can't settle within the budget is searched
+        # again from the same point with full filtering, which keeps tight
+        # weeks from going exponential.
+        saved = (dict(self.assignment), {s: set(v) for s, v in self.live.items()})
+        filtering = self.filtering
+        self.filtering, self.node_limit = False, self.nodes + FORWARD_CHECK_NODES
+        try:
+            return self._search(slots)
+        except _OutOfNodes:
+            self.assignment, self.live = saved
+            self.filtering, self.node_limit = True, None
+            return self._search(slots)
+        finally:
+            self.filtering, self.node_limit = filtering, None
+
+    def solve(self):
+        """Return a complete {(day, pos): person} assignment, or None if none exists."""
+        if not self._root_ok():
+            return None
+        if self._settle(self.slots):
+            return dict(self.assignment)
+        return None
+
+    # ─── Optimisation ───
+    def _complete(self, slots):
+        # Feasibility of the unweighted slots without disturbing search state
+        saved = (dict(self.assignment), {s: set(v) for s, v in self.live.items()})
+        found = dict(self.assignment) if self._settle(slots) else None
+        self.assignment, self.live = saved
+        return found
+
+    def minimize(self, costs):
+        """Branch and bound over the weighted slots.
+
+        costs: {(day, pos): {person: cost}}. Returns the complete assignment with
+        the lowest total cost over the weighted slots, or None if none exists.
+        A search that runs past MINIMIZE_NODES tried values stops and returns
+        the cheapest assignment found by then.
+        """
+        weighted = [s for s in self.slots if s in costs]
+        rest = [s for s in self.slots if s not in costs]
+        for slot in weighted:
+            self.order[slot].sort(key=lambda v: costs[slot].get(v, 0))
+        best = {"cost": float("inf"), "assignment": None}
+        # A position's days need different people, so the open weighted slots
+        # of each position are bounded by their cheapest assignment rather
+        # than by each slot's cheapest person
+        by_pos = {}
+        for slot in weighted:
+            by_pos.setdefault(slot[1], []).append(slot)
+
+        def bound():
+            total = 0
+            for members in by_pos.values():
+                rows = []
+                for slot in members:
+                    if slot in self.assignment:
+                        total += costs[slot].get(self.assignment[slot], 0)
+                    else:
+                        rows.append({v: costs[slot].get(v, 0) for v in self.live[slot]})
+                if rows:
+                    total += min_cost_assignment(rows)
+            return total
+
+        def branch():
+            if bound() >= best["cost"]:
+                return
+            slot = self._select_slot(weighted)
+            if slot is None:
+                found = self._complete(rest)
+                if found is not None:
+                    best["cost"] = bound()
+                    best["assignment"] = found
+                return
+            for value in self._values(slot):
+                if self.nodes >= budget:
+                    raise _OutOfNodes
+                self.nodes += 1
+                removed, ok = self.assign(slot, value)
+                if ok:
+                    branch()
+                self.unassign(slot, value, removed)
+
+        if not self._root_ok():
+            return None
+        budget = self.nodes + MINIMIZE_NODES
+        saved = (dict(self.assignment), {s: set(v) for s, v in self.live.items()})
+        # Filtering rarely narrows the few weighted slots; the bound does the
+        # pruning here and each leaf is completed with _settle
+        self.filtering = False
+        try:
+            branch()
+        except _OutOfNodes:
+            self.assignment, self.live = saved
+        finally:
+            self.filtering = True
+        if best["assignment"] is None and self.nodes >= budget:
+            # Out of budget before any leaf completed: any valid week will do
+            return dict(self.assignment) if self._settle(self.slots) else None
+        return best["assignment"]
@@ -0,0 +1,276 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/storage.py
+# Pluggable storage backends and the module-level API the pages use.
+#
+# The backend is chosen per deployment with the ROTA_STORAGE_BACKEND
+# environment variable (root-level Streamlit secrets are exported as
+# environment variables too):
+#   mirror       SQLite read path synced to Google Sheets (default), writes
+#                paced to ROTA_SHEETS_QUOTA_PER_MINUTE
+#   sheets       Google Sheets directly
+#   sqlite       SQLite only, no Sheets
+#   memory       in-process dicts, nothing persisted
+#   fake_sheets  the Sheets code path against core.fake_sheets, with
+#                ROTA_FAKE_LATENCY_MS and ROTA_FAKE_QUOTA_PER_MINUTE
+
+import copy
+import os
+import threading
+from typing import Dict, Protocol
+
+from core import data_utils
+from core.cache import cache as revision_cache, logs_changed, week_archived, week_deleted, week_saved
+from core.history import HistoryStore
+from core.ledger import get_ledger
+
+BACKEND_ENV = "ROTA_STORAGE_BACKEND"
+DEFAULT_BACKEND = "mirror"
+
+
+class StorageBackend(Protocol):
+    def load_rotas(self) -> Dict[str, Dict[str, Dict[str, str]]]: ...
+    def load_deleted_rotas(self) -> Dict[str, Dict[str, Dict[str, str]]]: ...
+    def save_rotas(self, week_key: str, rota_dict: Dict[str, Dict[str, str]]) -> None: ...
+    def save_weeks(self, weeks: Dict[str, Dict[str, Dict[str, str]]]) -> None: ...
+    def delete_rota(self, week_key: str) -> Dict[str, Dict[str, str]]: ...
+    def archive_deleted_rota(self, week_key: str, rota_dict: Dict[str, Dict[str, str]]) -> None: ...
+    def append_change_logs(self, entries) -> None: ...
+    def load_change_logs(self, week_start=None) -> list: ...
+    def change_log_weeks(self) -> list: ...
+
+
+def log_weeks(logs):
+    # Distinct week_start values, newest first
+    return sorted({str(log.get("week_start", "")) for log in logs}, reverse=True)
+
+
+class SheetsBackend:
+    def __init__(self, open_worksheet=None):
+        if open_worksheet is None:
+            from core.connection import get_worksheet
+            open_worksheet = get_worksheet
+        self.open_worksheet = open_worksheet
+
+    def load_rotas(self):
+        return data_utils.load_rotas(self.open_worksheet(data_utils.SHEET_NAME))
+
+    def load_deleted_rotas(self):
+        return data_utils.load_deleted_rotas(self.open_worksheet(data_utils.DELETED_SHEET_NAME))
+
+    def save_rotas(self, week_key, rota_dict):
+        data_utils.save_rotas(week_key, rota_dict, self.open_worksheet(data_utils.SHEET_NAME))
+
+    def save_weeks(self, weeks):
+        data_utils.save_weeks(weeks, self.open_worksheet(data_utils.SHEET_NAME))
+
+    def delete_rota(self, week_key):
+        return data_utils.delete_rota(week_key, self.open_worksheet(data_utils.SHEET_NAME))
+
+    def archive_deleted_rota(self, week_key, rota_dict):
+        data_utils.archive_deleted_rota(week_key, rota_dict, self.open_worksheet(data_utils.DELETED_SHEET_NAME))
+
+    def append_change_logs(self, entries):
+        data_utils.append_change_logs(entries, self.open_worksheet(data_utils.LOG_SHEET_NAME))
+
+    def load_change_logs(self, week_start=None):
+        logs = data_utils.load_change_logs(self.open_worksheet(data_utils.LOG_SHEET_NAME))
+        return logs if week_start is None else [log for log in logs if str(log.get("week_start")) == week_start]
+
+    def change_log_weeks(self):
+        return log_weeks(self.load_change_logs())
+
+    def load_change_logs_since(self, position):
+        # Used by the SQLite mirror to pull only rows appended since its last sync
+        return data_utils.load_change_logs_since(position, self.open_worksheet(data_utils.LOG_SHEET_NAME))
+
+
+class MemoryBackend:
+    def __init__(self, rotas=None, deleted_rotas=None, logs=None):
+        self.rotas = copy.deepcopy(rotas or {})
+        self.deleted_rotas = copy.deepcopy(deleted_rotas or {})
+        self.logs = list(logs or [])
+        self._lock = threading.Lock()
+
+    def load_rotas(self):
+        with self._lock:
+            return copy.deepcopy(self.rotas)
+
+    def load_deleted_rotas(self):
+        with self._lock:
+            return copy.deepcopy(self.deleted_rotas)
+
+    def save_rotas(self, week_key, rota_dict):
+        with self._lock:
+            self.rotas[week_key] = copy.deepcopy(rota_dict)
+
+    def save_weeks(self, weeks):
+        with self._lock:
+            self.rotas.update(copy.deepcopy(weeks))
+
+    def delete_rota(self, week_key):
+        with self._lock:
+            return self.rotas.pop(week_key, {})
+
+    def archive_deleted_rota(self, week_key, rota_dict):
+        with self._lock:
+            self.deleted_rotas.setdefault(week_key, {}).update(copy.deepcopy(rota_dict))
+
+    def append_change_logs(self, entries):
+        with self._lock:
+            self.logs.extend(dict(entry) for entry in entries)
+
+    def load_change_logs(self, week_start=None):
+        with self._lock:
+            return [dict(entry) for entry in self.logs if week_start is None or entry.get("week_start") == week_start]
+
+    def change_log_weeks(self):
+        return log_weeks(self.load_change_logs())
+
+    def load_change_logs_since(self, position):
+        with self._lock:
+            return [dict(entry) for entry in self.logs[position:]], len(self.logs)
+
+
+def create_backend(name=None):
+    from core.local_store import DB_FILE, SQLiteBackend
+    from core.rate_limit import SHEETS_QUOTA_PER_MINUTE, TokenBucket
+
+    name = name or os.environ.get(BACKEND_ENV, DEFAULT_BACKEND)
+    db_file = os.environ.get("ROTA_DB_FILE", DB_FILE)
+    if name == "mirror":
+        # Sheets may hold edits made elsewhere, so a reconcile invalidates everything
+        return SQLiteBackend(
+            db_file,
+            upstream=SheetsBackend(),
+            on_reconcile=revision_cache.bump_all,
+            rate_limiter=TokenBucket.for_quota(SHEETS_QUOTA_PER_MINUTE),
+        )
+    if name == "sheets":
+        return SheetsBackend()
+    if name == "sqlite":
+        return SQLiteBackend(db_file)
+    if name == "memory":
+        return MemoryBackend()
+    if name == "fake_sheets":
+        from core.fake_sheets import FakeSheetsService
+
+        quota = os.environ.get("ROTA_FAKE_QUOTA_PER_MINUTE")
+        service = FakeSheetsService(
+            latency=float(os.environ.get("ROTA_FAKE_LATENCY_MS", "0")) / 1000,
+            quota_per_minute=int(quota) if quota else None,
+        )
+        return SheetsBackend(service.worksheet)
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            if hasattr(_backend, "start"):
+                _backend.start()
+        return _backend
+
+
+def set_backend(backend):
+    # Swap the process-wide backend, e.g. for benchmarks and tests
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+# ─── Module-level API used by the pages ───
+def load_rotas():
+    # A HistoryStore, so the ledger synced with it can answer for it and its copies
+    all_rotas = HistoryStore.from_rotas(get_backend().load_rotas())
+
+    ledger = get_ledger()
+    if ledger.sync(all_rotas):
+        ledger.save()
+
+    return all_rotas
+
+
+def load_deleted_rotas():
+    return get_backend().load_deleted_rotas()
+
+
+def get_saved_week_keys():
+    return list(get_backend().load_rotas().keys())
+
+
+def save_rotas(week_key: str, rota_dict: Dict[str, Dict[str, str]]):
+    get_backend().save_rotas(week_key, rota_dict)
+
+    ledger = get_ledger()
+    is_new = week_key not in ledger.weeks
+    if ledger.set_week(week_key, rota_dict):
+        ledger.save()
+    week_saved(week_key, rota_dict, is_new)
+
+
+def save_weeks(weeks: Dict[str, Dict[str, Dict[str, str]]]):
+    # Many weeks in one backend write, e.g. a batch or a planning horizon
+    if not weeks:
+        return
+    get_backend().save_weeks(weeks)
+
+    ledger = get_ledger()
+    new_weeks = {week_key for week_key in weeks if week_key not in ledger.weeks}
+    changed = [ledger.set_week(week_key, rota_dict) for week_key, rota_dict in weeks.items()]
+    if any(changed):
+        ledger.save()
+    for week_key, rota_dict in weeks.items():
+        week_saved(week_key, rota_dict, week_key in new_weeks)
+
+
+def delete_rota(week_key: str):
+    deleted_data = get_backend().delete_rota(week_key)
+
+    ledger = get_ledger()
+    if ledger.remove_week(week_key):
+        ledger.save()
+    week_deleted(week_key)
+
+    return deleted_data
+
+
+def archive_deleted_rota(week_key: str, rota_dict: Dict[str, Dict[str, str]]):
+    get_backend().archive_deleted_rota(week_key, rota_dict)
+    week_archived(week_key, rota_dict)
+
+
+def append_change_logs(entries):
+    get_backend().append_change_logs(entries)
+    logs_changed()
+
+
+def load_change_logs(week_start=None):
+    return get_backend().load_change_logs(week_start)
+
+
+def load_change_log_weeks():
+    return get_backend().change_log_weeks()
+
+
+def change_logs_indexed():
+    # Whether the backend answers the week list and one week's rows without
+    # reading the whole log; otherwise callers should read it once and derive both
+    return getattr(get_backend(), "indexed_change_logs", False)
+
+
+def sync_metrics():
+    # Write-queue metrics of the mirror, or None for backends without a queue
+    backend = get_backend()
+    if getattr(backend, "upstream", None) is None:
+        return None
+    return backend.sync_metrics()
@@ -1,8 +1,28 @@
 # core/utils.py
+import os
+from functools import lru_cache
+from html import escape
 from io import BytesIO
-import matplotlib.pyplot as plt
 
-def generate_table_image(df, title=None):
+# "matplotlib" is the original renderer and stays the default; "pil" is an
+# opt-in that draws the table directly, several times faster than building a
+# matplotlib figure
+IMAGE_RENDERER = os.environ.get("ROTA_IMAGE_RENDERER", "matplotlib")
+IMAGE_RENDERERS = ("matplotlib", "pil")
+
+
+def generate_table_image(df, title=None, dpi=300, renderer=None):
+    renderer = renderer or IMAGE_RENDERER
+    if renderer == "pil":
+        return _table_image_pil(df, title, dpi)
+    if renderer == "matplotlib":
+        return _table_image_matplotlib(df, title, dpi)
+    raise ValueError(f"Unknown image renderer: {renderer}")
+
+
+def _table_image_matplotlib(df, title, dpi):
+    # matplotlib takes about a second to import, so only load it when a PNG is rendered
+    import matplotlib.pyplot as plt
 
     fig_height = len(df) * 0.43 + 0.6
     fig, ax = plt.subplots(figsize=(12, fig_height))
@@ -25,6 +45,95 @@ def generate_table_image(df, title=None):
     plt.subplots_adjust(top=1, bottom=0.1)
 
     buf = BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=300, pad_inches=0.01)
+    plt.savefig(buf, format='png', bbox_inches='tight', dpi=dpi, pad_inches=0.01)
+    plt.close(fig)
+    buf.seek(0)
+    return buf
+
+
+# ─── PIL renderer ───
+# Sizes in inches / points, matching the matplotlib layout above
+_COLUMN_WIDTH_IN = 1.86
+_ROW_HEIGHT_IN = 0.235
+_CELL_PAD_IN = 0.1
+_FONT_PT = 10
+_TITLE_PT = 14
+
+
+@lru_cache(maxsize=16)
+def _font(size, bold=False):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def _cell_text(value):
+    return "" if value is None or value != value else str(value)  # NaN != NaN
+
+
+def _table_image_pil(df, title, dpi):
+    from PIL import Image, ImageDraw
+
+    font = _font(round(_FONT_PT * dpi / 72))
+    title_font = _font(round(_TITLE_PT * dpi / 72), bold=True)
+    line = max(1, round(dpi / 100))
+    pad = round(_CELL_PAD_IN * dpi)
+    col_w = round(_COLUMN_WIDTH_IN * dpi)
+    row_h = round(_ROW_HEIGHT_IN * dpi)
+
+    row_labels = [str(label) for label in df.index]
+    columns = [str(col) for col in df.columns]
+    label_w = round(max((font.getlength(label) for label in row_labels), default=0)) + 2 * pad
+
+    title_h = round(title_font.size * 2.2) if title else 0
+    width = label_w + col_w * len(columns) + line
+    height = title_h + row_h * (len(row_labels) + 1) + line + pad
+
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+
+    if title:
+        draw.text((width / 2, title_h / 2), str(title), font=title_font, fill="black", anchor="mm")
+
+    def cell(x, y, w, text, align="center"):
+        draw.rectangle([x, y, x + w, y + row_h], outline="black", width=line)
+        if align == "left":
+            draw.text((x + pad, y + row_h / 2), text, font=font, fill="black", anchor="lm")
+        else:
+            draw.text((x + w / 2, y + row_h / 2), text, font=font, fill="black", anchor="mm")
+
+    # Header row has no corner cell, like matplotlib's colLabels
+    for i, col in enumerate(columns):
+        cell(label_w + i * col_w, title_h, col_w, col)
+
+    for r, (label, values) in enumerate(zip(row_labels, df.values.tolist())):
+        y = title_h + (r + 1) * row_h
+        cell(0, y, label_w, label, align="left")
+        for i, value in enumerate(values):
+            cell(label_w + i * col_w, y, col_w, _cell_text(value))
+
+    buf = BytesIO()
+    img.save(buf, format="PNG", dpi=(dpi, dpi))
     buf.seek(0)
     return buf
+
+
+def generate_table_html(rows, columns, title=None):
+    # Same layout as generate_table_image, as plain HTML for on-screen display.
+    # rows: list of (row label, {column: value})
+    cell = "border:1px solid #c7d8e2; padding:0.35em 0.6em; text-align:center;"
+    head = "".join(f"<th style='{cell} background:#e9f1f7;'>{escape(col)}</th>" for col in columns)
+    body = "".join(
+        f"<tr><th style='{cell} background:#e9f1f7;'>{escape(label)}</th>"
+        + "".join(f"<td style='{cell}'>{escape(str(values.get(col, '')))}</td>" for col in columns)
+        + "</tr>"
+        for label, values in rows
+    )
+    caption = f"<div style='text-align:center; font-weight:bold; font-size:1.15em; margin-bottom:0.4em;'>{escape(title)}</div>" if title else ""
+    return (
+        f"{caption}<table style='border-collapse:collapse; width:100%; margin-bottom:1em;'>"
+        f"<thead><tr><th style='{cell}'></th>{head}</tr></thead><tbody>{body}</tbody></table>"
+    )
@@ -0,0 +1,73 @@
+# © 2025 Doğukan Dağ. All rights reserved.
+# This file is protected by copyright law.
+# Unauthorized use, copying, modification, or distribution is strictly prohibited.
+# Contact: ticked.does-7c@icloud.com
+
+# core/week_index.py
+# Sorted index over week keys, built once per data revision.
+#
+# Week keys are parsed a single time into dates and grouped into "%B %Y"
+# month buckets, so the admin sections and the homepage can list months in
+# O(1), look up a month's weeks in O(1) and answer date-range queries with
+# bisect instead of re-parsing every key on each rerun.
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from core.cache import DELETED_SCOPE, WEEK_KEYS_SCOPE, cache
+
+DATE_FORMAT = "%Y-%m-%d"
+MONTH_FORMAT = "%B %Y"
+
+
+class WeekIndex:
+    def __init__(self, week_keys):
+        self.keys = sorted(week_keys)
+        self.dates = [datetime.strptime(wk, DATE_FORMAT).date() for wk in self.keys]
+        self._months = {}
+        for wk, day in zip(self.keys, self.dates):
+            self._months.setdefault(day.strftime(MONTH_FORMAT), []).append(wk)
+        # Insertion follows the sorted keys, so this is oldest month first
+        self._month_labels = list(reversed(self._months))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def months(self):
+        """Month labels that have at least one week, newest first."""
+        return list(self._month_labels)
+
+    def in_month(self, label):
+        """Week keys starting in the given "%B %Y" month, oldest first."""
+        return list(self._months.get(label, ()))
+
+    def between(self, start=None, end=None):
+        """Week keys with start <= key <= end (either bound may be None)."""
+        lo = 0 if start is None else bisect_left(self.keys, start)
+        hi = len(self.keys) if end is None else bisect_right(self.keys, end)
+        return self.keys[lo:hi]
+
+    def latest(self, n, until=None):
+        """The n most recent week keys up to `until`, newest first."""
+        hi = len(self.keys) if until is None else bisect_right(self.keys, until)
+        return self.keys[max(0, hi - n):hi][::-1]
+
+    def first_since(self, day):
+        """Index of the first week starting on or after the given date."""
+        return bisect_left(self.dates, day)
+
+
+def _cached_index(name, scope, collection):
+    index = cache.get_or_compute(("week_index", name), [scope], lambda: WeekIndex(collection))
+    # The caller may hold a collection it has already changed locally
+    if len(index) != len(collection):
+        index = WeekIndex(collection)
+    return index
+
+
+def saved_week_index(rotas):
+    return _cached_index("saved", WEEK_KEYS_SCOPE, rotas)
+
+
+def deleted_week_index(deleted_rotas):
+    return _cached_index("deleted", DELETED_SCOPE, deleted_rotas)
@@ -1,7 +1,9 @@
 import streamlit as st
 import base64
 from admin_panel import render_admin_panel
-from core.data_utils import load_rotas, save_rotas, delete_rota, archive_deleted_rota
+from core.storage import load_rotas, save_rotas, delete_rota, archive_deleted_rota
+from core.cache import cached_rotas, cached_deleted_rotas
+from core.local_store import MirrorNotReady
 from app_texts import ADMIN_PANEL_HELP
 
 st.set_page_config(page_title="Admin Panel", layout="wide")
@@ -55,19 +57,21 @@ if not st.session_state.get("is_admin", False):
     st.stop()
 
 
-@st.cache_data
 def cached_load_rotas():
-    return load_rotas()
+    return cached_rotas(load_rotas)
 
 
-@st.cache_data
 def cached_load_deleted_rotas():
-    from core.data_utils import load_deleted_rotas
-    return load_deleted_rotas()
+    from core.storage import load_deleted_rotas
+    return cached_deleted_rotas(load_deleted_rotas)
 
 
-rotas = cached_load_rotas()
-deleted_rotas = cached_load_deleted_rotas()
+try:
+    rotas = cached_load_rotas()
+    deleted_rotas = cached_load_deleted_rotas()
+except MirrorNotReady as e:
+    st.warning(f"⏳ {e}. Please refresh in a moment.")
+    st.stop()
 
 render_admin_panel(rotas, deleted_rotas, save_rotas, delete_rota, archive_deleted_rota)
 
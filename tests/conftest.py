@@ -0,0 +1,26 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+INSPECTORS = ["A", "B", "C", "D", "E", "F", "G", "H", "I"]
+
+
+def _make_history(n_weeks, seed=0):
+    # n_weeks of random weekday rotas from 2024-01-01, the same for the same seed
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    rotas = {}
+    for i in range(n_weeks):
+        week_key = (start + timedelta(weeks=i)).strftime("%Y-%m-%d")
+        rotas[week_key] = {
+            day: dict(zip(POSITIONS, rng.sample(INSPECTORS, len(POSITIONS)))) for day in DAYS
+        }
+    return rotas
+
+
+@pytest.fixture
+def make_history():
+    return _make_history
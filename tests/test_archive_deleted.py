@@ -20,11 +20,34 @@ import core.data_utils as data_utils
 class FakeSheet:
     def __init__(self, rows=None):
         self.rows = rows or []
+        self.calls = 0
     def get_all_values(self):
+        self.calls += 1
         return [list(r) for r in self.rows]
+    def col_values(self, col):
+        self.calls += 1
+        return [r[col - 1] if len(r) >= col else "" for r in self.rows]
+    def row_values(self, row):
+        self.calls += 1
+        return list(self.rows[row - 1]) if len(self.rows) >= row else []
+    def batch_get(self, ranges):
+        self.calls += 1
+        blocks = []
+        for rng in ranges:
+            start, end = rng.split(":")
+            blocks.append([list(r) for r in self.rows[int(start[1:]) - 1:int(end[1:])]])
+        return blocks
     def append_row(self, row):
+        self.calls += 1
         self.rows.append(list(row))
+    def append_rows(self, rows):
+        self.calls += 1
+        self.rows.extend(list(r) for r in rows)
+    def delete_rows(self, start_index, end_index=None):
+        self.calls += 1
+        del self.rows[start_index - 1:(end_index or start_index)]
     def clear(self):
+        self.calls += 1
         self.rows = []
 
 
@@ -53,6 +76,11 @@ def test_delete_and_archive_rota():
         data_utils.get_deleted_sheet = original_get_deleted
 
     assert week_key not in [r[0] for r in sheet.rows if r]
+    assert sheet.rows == [header, ["2025-01-13", "Monday", "X", "H", "Y", "Z", "W", "Q"]]
+    assert deleted["Tuesday"]["OFFLINE"] == "E2"
+    # Locate, read and delete the block, then check the header and bulk-append the archive
+    assert sheet.calls == 3
+    assert deleted_sheet.calls == 2
     assert deleted_sheet.rows[0] == ["week_start", "day"] + data_utils.POSITIONS
     assert len(deleted_sheet.rows[1]) == len(deleted_sheet.rows[0])
     assert len(deleted_sheet.rows) == 1 + len(deleted)
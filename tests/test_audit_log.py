@@ -0,0 +1,47 @@
+import os
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.audit_log import AuditLogWriter
+
+
+def entry(pos):
+    return {"week_start": "2025-01-06", "day": "Monday", "position": pos}
+
+
+def test_one_save_is_one_bulk_append():
+    calls = []
+    writer = AuditLogWriter(append=calls.append)
+
+    writer.submit([entry("CAR1"), entry("FCI"), entry("OFFLINE")])
+    writer.submit([])
+    assert writer.flush(timeout=5)
+    assert calls == [[entry("CAR1"), entry("FCI"), entry("OFFLINE")]]
+
+
+def test_failed_writes_are_retried_with_backoff():
+    calls, sleeps = [], []
+
+    def flaky(entries):
+        calls.append(entries)
+        if len(calls) < 3:
+            raise ConnectionError("503")
+
+    writer = AuditLogWriter(append=flaky, backoff=0.5, sleep=sleeps.append)
+    writer.submit([entry("CAR1")])
+    assert writer.flush(timeout=5)
+    assert len(calls) == 3 and sleeps == [0.5, 1.0]
+    assert writer.failed == []
+
+
+def test_batches_are_kept_after_the_last_attempt():
+    def down(entries):
+        raise ConnectionError("429")
+
+    writer = AuditLogWriter(append=down, max_attempts=2, sleep=lambda s: None)
+    writer.submit([entry("CAR1")])
+    assert writer.flush(timeout=5)
+    assert writer.failed == [[entry("CAR1")]]
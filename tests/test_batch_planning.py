@@ -0,0 +1,95 @@
+import os
+import sys
+
+import pytest
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.batch import plan_batch
+from core.fake_sheets import FakeSheetsService
+from core.storage import MemoryBackend, SheetsBackend
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+WEEKS = ["2025-03-03", "2025-03-10", "2025-03-17"]
+
+
+def request(site, week_key, people):
+    head, *workers = people
+    return {
+        "site": site,
+        "week_key": week_key,
+        "daily_workers": {day: list(workers) for day in DAYS},
+        "daily_heads": {day: head for day in DAYS},
+    }
+
+
+def check_rota(rota, req):
+    for day, assignments in rota.items():
+        assert assignments["HEAD"] == req["daily_heads"][day]
+        workers = [p for pos, p in assignments.items() if pos != "HEAD"]
+        assert len(set(workers)) == 5 and set(workers) <= set(req["daily_workers"][day])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sites_are_planned_and_saved_with_one_write_each(workers):
+    north_service = FakeSheetsService()
+    north = SheetsBackend(north_service.worksheet)
+    south = MemoryBackend()
+    requests = [request("north", wk, "HABCDEFG") for wk in WEEKS] + [request("south", wk, "QRSTUVWX") for wk in WEEKS]
+
+    north_service.reset_stats()
+    result = plan_batch(requests, backends={"north": north, "south": south}, workers=workers)
+
+    assert [(r["site"], r["week_key"]) for r in result["results"]] == [(r["site"], r["week_key"]) for r in requests]
+    for req, res in zip(requests, result["results"]):
+        check_rota(res["rota"], req)
+    assert result["saved"] == {"north": WEEKS, "south": WEEKS}
+    assert set(north.load_rotas()) == set(south.load_rotas()) == set(WEEKS)
+    # Loading the history plus one bulk write
+    assert north_service.stats["get_all_values"] == 2
+    assert north_service.stats["append_rows"] == 1
+
+
+def test_weeks_of_a_site_are_chained_in_date_order():
+    north = MemoryBackend()
+    # Out of order on purpose: each week must still see the one before it
+    requests = [request("north", wk, "HABCDEFG") for wk in reversed(WEEKS)]
+    for _ in range(5):
+        result = plan_batch(requests, backends={"north": north}, workers=1, save=False)
+        rotas = {r["week_key"]: r["rota"] for r in result["results"]}
+        for previous, week_key in zip(WEEKS, WEEKS[1:]):
+            for day in DAYS:
+                for pos, person in rotas[week_key][day].items():
+                    if pos != "HEAD":
+                        assert rotas[previous][day][pos] != person, (week_key, day, pos)
+
+
+def test_infeasible_weeks_are_reported_and_not_saved():
+    south = MemoryBackend()
+    short = request("south", WEEKS[1], "QRST")
+    requests = [request("south", WEEKS[0], "QRSTUVWX"), short, request("south", WEEKS[2], "QRSTUVWX")]
+    result = plan_batch(requests, backends={"south": south}, workers=1)
+
+    assert "rota" in result["results"][0]
+    assert "error" in result["results"][1]
+    # Weeks after a failed one are not planned on top of a gap
+    assert WEEKS[1] in result["results"][2]["error"]
+    assert list(south.load_rotas()) == [WEEKS[0]]
+
+
+def test_invalid_requests_are_rejected_before_planning():
+    with pytest.raises(ValueError):
+        plan_batch([{"site": "north", "week_key": WEEKS[0]}], backends={"north": MemoryBackend()})
+    with pytest.raises(ValueError):
+        plan_batch([request("north", WEEKS[0], "HABCDEFG")] * 2, backends={"north": MemoryBackend()})
+
+
+def test_sites_cannot_share_the_default_storage():
+    # Both would be saved to the same history, the second overwriting the first
+    requests = [request("north", WEEKS[0], "HABCDEFG"), request("south", WEEKS[0], "QRSTUVWX")]
+    with pytest.raises(ValueError, match="north, south"):
+        plan_batch(requests, save=False)
+    with pytest.raises(ValueError):
+        plan_batch(requests + [request("east", WEEKS[0], "HABCDEFG")], backends={"east": MemoryBackend()})
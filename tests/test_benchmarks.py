@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks import suite
+from benchmarks.synthetic import POSITIONS, percentiles, sheet_rows, synthetic_history, week_request
+
+
+def test_synthetic_history_is_deterministic_and_well_formed():
+    rotas, names, next_week = synthetic_history(years=1, inspectors=20, saturday=True, seed=5)
+
+    assert synthetic_history(years=1, inspectors=20, saturday=True, seed=5)[0] == rotas
+    assert len(rotas) == 52 and next_week > max(rotas)
+    for week in rotas.values():
+        assert list(week) == ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+        for roles in week.values():
+            people = [roles[pos] for pos in POSITIONS]
+            assert len(set(people)) == 6 and set(people) <= set(names)
+
+    assert len(sheet_rows(rotas)) == 1 + 52 * 6
+
+
+def test_tight_staffing_draws_from_one_crew():
+    import random
+
+    daily_workers, daily_heads = week_request(random.Random(1), [str(i) for i in range(50)], staffing="tight")
+    crew = {daily_heads["Monday"], *daily_workers["Monday"]}
+    for day, workers in daily_workers.items():
+        assert {daily_heads[day], *workers} == crew
+
+
+def test_percentiles():
+    stats = percentiles([float(i) for i in range(1, 101)])
+    assert stats["n"] == 100
+    assert stats["p50_ms"] in (50.0, 51.0)
+    assert stats["p99_ms"] == 99.0 and stats["max_ms"] == 100.0
+    assert percentiles([]) == {"n": 0}
+
+
+def test_suite_writes_json(tmp_path, capsys):
+    output = tmp_path / "results.json"
+
+    assert suite.main(["--scenario", "small", "--repeats", "3", "--output", str(output)]) == 0
+
+    results = json.loads(output.read_text())
+    small = results["scenarios"]["small"]
+    assert results["version"] == suite.RESULT_VERSION
+    assert small["generate_rota"]["latency"]["n"] == 3
+    assert small["load_rotas"]["rows"] == small["weeks"] * 5  # no Saturday in this scenario
+    assert set(small["save_delete"]) == {"append", "update", "delete"}
+    assert "small" in capsys.readouterr().out
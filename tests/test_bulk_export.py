@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import zipfile
+
+from openpyxl import load_workbook
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.export import build_export, month_range, quarter_range, select_weeks
+
+POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+
+
+def make_week(tag, saturday=False):
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+    week = {day: {pos: f"{tag}-{day[:2]}-{pos}" for pos in POSITIONS} for day in days[:5]}
+    week["Saturday"] = {pos: (f"{tag}-Sa-{pos}" if saturday else "") for pos in POSITIONS}
+    return week
+
+
+ROTAS = {
+    "2025-03-31": make_week("a"),
+    "2025-04-07": make_week("b", saturday=True),
+    "2025-04-28": make_week("c"),
+    "2025-07-07": make_week("d"),
+}
+
+
+def test_ranges_select_weeks_starting_inside_them():
+    assert month_range(2025, 2) == ("2025-02-01", "2025-02-28")
+    assert month_range(2025, 12) == ("2025-12-01", "2025-12-31")
+    assert quarter_range(2025, 2) == ("2025-04-01", "2025-06-30")
+    assert select_weeks(ROTAS, *month_range(2025, 4)) == ["2025-04-07", "2025-04-28"]
+    assert select_weeks(ROTAS, *quarter_range(2025, 3)) == ["2025-07-07"]
+    assert select_weeks(ROTAS) == sorted(ROTAS)
+
+
+def test_xlsx_has_one_sheet_per_week():
+    with build_export(ROTAS, ["2025-03-31", "2025-04-07"], "xlsx") as export:
+        # A raw file object, one of the types st.download_button reads itself
+        assert isinstance(export, io.RawIOBase) and export.tell() == 0
+        wb = load_workbook(io.BytesIO(export.read()), read_only=True)
+
+    assert wb.sheetnames == ["2025-03-31", "2025-04-07"]
+    plain = list(wb["2025-03-31"].values)
+    assert plain[0] == ("Day",) + tuple(POSITIONS)
+    assert [row[0] for row in plain[1:]] == ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+    assert plain[1][5] == "a-Mo-FCI"
+    assert list(wb["2025-04-07"].values)[-1][0] == "Saturday"
+
+
+def test_png_zip_is_the_same_in_process_and_in_a_pool():
+    weeks = select_weeks(ROTAS)
+    with build_export(ROTAS, weeks, "zip", dpi=50, workers=1) as serial_file, \
+            build_export(ROTAS, weeks, "zip", dpi=50, workers=2) as pooled_file:
+        serial, pooled = zipfile.ZipFile(serial_file), zipfile.ZipFile(pooled_file)
+
+        assert serial.namelist() == [f"rota_{wk}.png" for wk in weeks]
+        assert pooled.namelist() == serial.namelist()
+        for name in serial.namelist():
+            assert serial.read(name)[:8] == b"\x89PNG\r\n\x1a\n"
+            assert pooled.read(name) == serial.read(name)
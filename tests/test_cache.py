@@ -0,0 +1,116 @@
+import os
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.cache import RevisionedCache, week_scope
+
+
+def counting(value):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return value
+    return compute, calls
+
+
+def test_bump_invalidates_only_dependent_entries():
+    cache = RevisionedCache()
+    first, first_calls = counting("week 1 image")
+    second, second_calls = counting("week 2 image")
+
+    cache.get_or_compute(("image", "w1"), [week_scope("w1")], first)
+    cache.get_or_compute(("image", "w2"), [week_scope("w2")], second)
+    cache.bump(week_scope("w1"))
+    cache.get_or_compute(("image", "w1"), [week_scope("w1")], first)
+    cache.get_or_compute(("image", "w2"), [week_scope("w2")], second)
+
+    assert len(first_calls) == 2
+    assert len(second_calls) == 1
+
+
+def test_patch_keeps_collection_and_rejects_stale_loads():
+    cache = RevisionedCache()
+    cache.get_or_compute("rotas", ["rotas"], lambda: {"w1": 1})
+    cache.patch("rotas", lambda rotas: {**rotas, "w2": 2}, "rotas")
+    assert cache.get_or_compute("rotas", ["rotas"], lambda: {}) == {"w1": 1, "w2": 2}
+
+    def stale_load():
+        # A write lands while this load is running
+        cache.patch("other", lambda value: value, "other")
+        return "stale"
+
+    cache.get_or_compute("other", ["other"], stale_load)
+    assert cache.get_or_compute("other", ["other"], lambda: "fresh") == "fresh"
+
+
+def test_clear_and_bump_all_drop_everything():
+    cache = RevisionedCache()
+    cache.get_or_compute("a", [], lambda: 1)
+    cache.bump_all()
+    assert cache.get_or_compute("a", [], lambda: 2) == 2
+    cache.clear()
+    assert cache.get_or_compute("a", [], lambda: 3) == 3
+
+
+def test_failed_change_log_reads_are_not_cached(monkeypatch):
+    import types
+
+    import admin_panel
+    from core.cache import cache
+
+    warnings = []
+    monkeypatch.setattr(admin_panel, "st", types.SimpleNamespace(warning=warnings.append))
+    weeks = [RuntimeError("Sheets unavailable"), ["2025-01-06"]]
+
+    def load_change_log_weeks():
+        result = weeks.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(admin_panel, "change_logs_indexed", lambda: True)
+    monkeypatch.setattr(admin_panel, "load_change_log_weeks", load_change_log_weeks)
+    cache.clear()
+    assert admin_panel.fetch_log_weeks() == []
+    assert len(warnings) == 1
+    # The next run reads again instead of serving the cached failure
+    assert admin_panel.fetch_log_weeks() == ["2025-01-06"]
+    assert admin_panel.fetch_log_weeks() == ["2025-01-06"]
+    cache.clear()
+
+
+def test_unindexed_log_views_share_one_full_read(monkeypatch):
+    import types
+
+    import admin_panel
+    from core import storage
+    from core.cache import cache, logs_changed
+    from core.fake_sheets import FakeSheetsService
+
+    monkeypatch.setattr(admin_panel, "st", types.SimpleNamespace(warning=lambda message: None))
+    service = FakeSheetsService()
+    backend = storage.SheetsBackend(service.worksheet)
+    log = {"timestamp": "2025-01-06 09:00", "admin_id": "admin", "week_start": "2025-01-06", "day": "Monday",
+           "position": "FCI", "old_value": "D", "new_value": "E", "admin_users": "admin"}
+    service.worksheet("change_logs").rows.append(list(log))
+    backend.append_change_logs([log, dict(log, week_start="2025-01-13")])
+    storage.set_backend(backend)
+    cache.clear()
+    try:
+        service.reset_stats()
+        assert admin_panel.fetch_log_weeks() == ["2025-01-13", "2025-01-06"]
+        assert admin_panel.fetch_logs_from_google_sheet("2025-01-06") == [log]
+        assert admin_panel.fetch_logs_from_google_sheet("2025-01-13")[0]["week_start"] == "2025-01-13"
+        assert service.stats["get_all_records"] == 1
+        # After the log changes both views come from one new read
+        logs_changed()
+        assert admin_panel.fetch_log_weeks() == ["2025-01-13", "2025-01-06"]
+        assert admin_panel.fetch_logs_from_google_sheet("2025-01-06") == [log]
+        assert service.stats["get_all_records"] == 2
+    finally:
+        storage.set_backend(None)
+        cache.clear()
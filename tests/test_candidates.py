@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.candidates import generate_candidates, rota_objective
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+INSPECTORS = list("ABCDEFGH")
+WEEK_KEY = "2025-01-13"
+
+
+def make_history():
+    # A previous week where A and B took every FCI/OFFLINE slot
+    week = {}
+    for i, day in enumerate(DAYS):
+        week[day] = {"HEAD": "H", "CAR1": "C", "CAR2": "D", "OFFAL": "E", "FCI": "A", "OFFLINE": "B"}
+    return {"2025-01-06": week}
+
+
+def make_week():
+    daily_workers = {day: ["A", "B", "C", "D", "E", "F", "G"] for day in DAYS}
+    daily_heads = {day: "H" for day in DAYS}
+    return daily_workers, daily_heads
+
+
+def test_objective_prefers_even_ratios_and_top3_coverage():
+    even = {p: {"Days": 5, "FCI": 1, "OFFLINE": 1} for p in "ABC"}
+    skewed = {"A": {"Days": 5, "FCI": 3, "OFFLINE": 0}, "B": {"Days": 5, "FCI": 0, "OFFLINE": 2}, "C": {"Days": 5, "FCI": 0, "OFFLINE": 1}}
+    week = {"Monday": {"FCI": "A", "OFFLINE": "B"}}
+
+    assert rota_objective(even, week, ["A", "B"])["score"] == 0
+    assert rota_objective(skewed, week, ["A", "B"])["score"] > 0
+
+    covered = rota_objective(even, week, ["A", "B", "C"])
+    assert round(covered["top3_coverage"], 4) == round(2 / 3, 4)
+    assert covered["score"] > rota_objective(even, week, ["A", "B"])["score"]
+
+
+def test_candidates_are_valid_and_best_first():
+    rotas = make_history()
+    daily_workers, daily_heads = make_week()
+
+    result = generate_candidates(daily_workers, daily_heads, rotas, INSPECTORS, WEEK_KEY,
+                                 n=20, top_k=5, time_budget=30, workers=1, seed=1)
+
+    assert result["generated"] + result["failed"] == 20
+    candidates = result["candidates"]
+    assert 1 <= len(candidates) <= 5
+    scores = [c["objective"]["score"] for c in candidates]
+    assert scores == sorted(scores)
+    for candidate in candidates:
+        for day, assignments in candidate["rota"].items():
+            assert assignments["HEAD"] == "H"
+            workers = [assignments[p] for p in ["CAR1", "CAR2", "OFFAL", "FCI", "OFFLINE"]]
+            assert len(set(workers)) == 5
+            assert set(workers) <= set(daily_workers[day])
+
+
+def test_pool_matches_serial_search():
+    rotas = make_history()
+    daily_workers, daily_heads = make_week()
+    options = dict(n=12, top_k=3, time_budget=60, seed=7)
+
+    serial = generate_candidates(daily_workers, daily_heads, rotas, INSPECTORS, WEEK_KEY, workers=1, **options)
+    pooled = generate_candidates(daily_workers, daily_heads, rotas, INSPECTORS, WEEK_KEY, workers=2, **options)
+
+    assert [c["rota"] for c in pooled["candidates"]] == [c["rota"] for c in serial["candidates"]]
+    assert pooled["generated"] == serial["generated"]
+
+
+def test_time_budget_stops_the_search():
+    rotas = make_history()
+    daily_workers, daily_heads = make_week()
+
+    started = time.time()
+    result = generate_candidates(daily_workers, daily_heads, rotas, INSPECTORS, WEEK_KEY,
+                                 n=10 ** 6, time_budget=0.3, workers=1, seed=3)
+
+    assert time.time() - started < 5
+    assert 0 < result["generated"] < 10 ** 6
+    assert len(result["candidates"]) == 1
+
+
+def test_infeasible_week_returns_error():
+    daily_workers = {"Monday": ["A", "B", "C", "D"]}
+    daily_heads = {"Monday": "H"}
+
+    result = generate_candidates(daily_workers, daily_heads, {}, INSPECTORS, WEEK_KEY, n=4, workers=1)
+
+    assert "error" in result
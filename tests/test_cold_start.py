@@ -0,0 +1,35 @@
+import os
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.profiling import parse_importtime, profile_entry, top_level_imports
+
+
+def test_parse_importtime_reads_depth_and_times():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _json\n"
+        "import time:       800 |       1500 | json\n"
+        "import time:      2000 |       2000 | streamlit\n"
+    )
+    assert parse_importtime(stderr) == [
+        ("_json", 0.12, 0.12, 1),
+        ("json", 0.8, 1.5, 0),
+        ("streamlit", 2.0, 2.0, 0),
+    ]
+
+
+def test_imports_behind_the_planner_gate_are_not_counted():
+    modules = top_level_imports(os.path.join(ROOT_DIR, "0_Homepage.py"))
+    assert "streamlit" in modules
+    assert "weekly_rota_generation" not in modules
+
+
+def test_homepage_starts_without_heavy_dependencies():
+    profile = profile_entry("homepage")
+    loaded = {module for module, _, _, _ in profile["modules"]}
+    assert profile["eager"] == []
+    assert not {"matplotlib", "gspread", "pandas"} & loaded
@@ -0,0 +1,39 @@
+import os
+import sys
+import types
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import core.connection as connection
+
+
+def test_client_and_worksheets_are_reused(monkeypatch):
+    calls = {"authorize": 0, "open": []}
+
+    class FakeClient:
+        def open(self, name):
+            calls["open"].append(name)
+            return types.SimpleNamespace(sheet1=f"sheet:{name}")
+
+    def authorize(credentials):
+        calls["authorize"] += 1
+        return FakeClient()
+
+    monkeypatch.setattr(connection, "_credentials", lambda: None)
+    monkeypatch.setattr(connection, "_authorize", authorize)
+    connection.reset_connection()
+
+    try:
+        assert connection.get_worksheet("rota_data") == "sheet:rota_data"
+        assert connection.get_worksheet("rota_data") == "sheet:rota_data"
+        assert connection.get_worksheet("change_logs") == "sheet:change_logs"
+        assert calls["authorize"] == 1
+        assert calls["open"] == ["rota_data", "change_logs"]
+
+        connection.reset_connection()
+        connection.get_worksheet("rota_data")
+        assert calls["authorize"] == 2
+    finally:
+        connection.reset_connection()
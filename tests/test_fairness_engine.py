@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.fairness import HistoryGrid, iter_scores
+from core.ledger import FairnessLedger
+
+def test_history_grid_counts_match_ledger(make_history):
+    rotas = make_history(30, seed=3)
+    grid = HistoryGrid(rotas)
+    ledger = FairnessLedger.from_rotas(rotas)
+    for current in ["2024-02-05", "2024-07-22"]:
+        for n_weeks in (4, 12, 52):
+            assert grid.window_counts(current, n_weeks) == ledger.window(current, n_weeks)
+
+
+def test_iter_scores_matches_scalar_formula():
+    counts = {"A": [10, 0, 1], "B": [3, 0, 0], "C": [5, 1, 1], "D": [6, 4, 0]}
+    rows = {row[0]: row[1:] for row in iter_scores(counts)}
+
+    # A: (0.2 - 0) * 10 * 3 = 6.0 and (0.2 - 0.1) * 10 * 3 = 3.0
+    assert rows["A"] == (10, 0, 1, 6.0, 3.0, 9.0)
+    # Fewer than four days never earns a score
+    assert rows["B"] == (3, 0, 0, 0, 0, 0)
+    # At the target ratio the score is zero
+    assert rows["C"][3:] == (0.0, 0.0, 0.0)
+    # Above the target ratio is clamped at zero
+    assert rows["D"][3] == 0.0 and rows["D"][4] == round(2 * (1 + 6 / 5), 2)
@@ -0,0 +1,118 @@
+import os
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.history import HistoryStore
+from core.ledger import FairnessLedger
+
+def naive_window(rotas, current_week_key, n_weeks):
+    weeks = [w for w in sorted(rotas, reverse=True) if w <= current_week_key][:n_weeks]
+    counts = {}
+    for week_key in weeks:
+        for day_data in rotas[week_key].values():
+            for role, person in day_data.items():
+                if person and person != "Not Working":
+                    row = counts.setdefault(person, [0, 0, 0])
+                    row[0] += 1
+                    row[1] += role == "FCI"
+                    row[2] += role == "OFFLINE"
+    return counts
+
+
+def test_window_matches_full_scan(make_history):
+    rotas = make_history(60)
+    ledger = FairnessLedger.from_rotas(rotas)
+    for current in ["2024-01-01", "2024-03-04", "2024-06-10", "2025-06-01"]:
+        for n_weeks in (1, 4, 12, 52):
+            assert ledger.window(current, n_weeks) == naive_window(rotas, current, n_weeks)
+
+
+def test_incremental_updates_match_rebuild(make_history):
+    rotas = make_history(20)
+    ledger = FairnessLedger.from_rotas(rotas)
+
+    replacement = make_history(1, seed=7)["2024-01-01"]
+    rotas["2024-02-05"] = replacement
+    ledger.set_week("2024-02-05", replacement)
+    rotas.pop("2024-03-04")
+    ledger.remove_week("2024-03-04")
+
+    rebuilt = FairnessLedger.from_rotas(rotas)
+    assert ledger.keys == rebuilt.keys
+    assert ledger.prefix == rebuilt.prefix
+    assert ledger.window("2024-05-20", 12) == naive_window(rotas, "2024-05-20", 12)
+
+
+def test_sync_and_persistence_round_trip(make_history, tmp_path):
+    rotas = make_history(10)
+    ledger = FairnessLedger()
+    assert ledger.sync(rotas)
+    assert not ledger.sync(rotas)
+
+    path = str(tmp_path / "ledger.json")
+    ledger.save(path)
+    loaded = FairnessLedger.load(path)
+    # A loaded ledger answers for a history only once it is synced with it
+    store = HistoryStore(rotas)
+    assert not loaded.covers(store)
+    assert not loaded.sync(store) and loaded.covers(store)
+    assert loaded.window("2024-03-04", 4) == naive_window(rotas, "2024-03-04", 4)
+
+
+def test_covers_follows_the_history_revision(make_history):
+    rotas = make_history(10)
+    store = HistoryStore(rotas)
+    ledger = FairnessLedger.from_rotas(store)
+    assert ledger.covers(store) and ledger.covers(store.copy())
+    # Plain dicts carry no revision, so the ledger never answers for them
+    assert not FairnessLedger.from_rotas(rotas).covers(rotas)
+
+    # A week edited in the history alone (same key, other people)
+    week_key = sorted(rotas)[3]
+    edited = store.copy()
+    week = edited[week_key]
+    week["Monday"]["FCI"], week["Monday"]["CAR1"] = "Z", week["Monday"]["FCI"]
+    edited[week_key] = week
+    assert not ledger.covers(edited)
+
+    # The same writes on both sides keep them in step
+    ledger.set_week(week_key, week)
+    assert ledger.covers(edited) and not ledger.covers(store)
+    del edited[sorted(rotas)[0]]
+    ledger.remove_week(sorted(rotas)[0])
+    assert ledger.covers(edited)
+    assert ledger.window("2024-03-04", 4) == naive_window(edited.to_rotas(), "2024-03-04", 4)
+
+
+def test_concurrent_saves_and_updates(make_history, tmp_path):
+    import pickle
+    import threading
+
+    rotas = make_history(12)
+    ledger = FairnessLedger.from_rotas(rotas)
+    path = str(tmp_path / "ledger.json")
+    errors = []
+
+    def worker(seed):
+        try:
+            extra = make_history(4, seed=seed)
+            for week_key, week in extra.items():
+                ledger.set_week(week_key, week)
+                ledger.save(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert FairnessLedger.load(path).weeks == ledger.weeks
+    assert os.listdir(tmp_path) == ["ledger.json"]
+    # The lock is dropped when the ledger is sent to a worker process
+    assert pickle.loads(pickle.dumps(ledger)).window(max(ledger.keys), 4) == ledger.window(max(ledger.keys), 4)
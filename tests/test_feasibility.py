@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core import algorithm
+from core.feasibility import diagnose, hall_violator
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+POSITIONS = ["CAR1", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+
+
+def test_hall_violator_returns_the_starved_set():
+    assert hall_violator({"x": ["a", "b"], "y": ["a"]}) is None
+    lefts, rights = hall_violator({"x": ["a", "b"], "y": ["a"], "z": ["a"]})
+    assert rights == {"a"} and len(lefts) == 2 and lefts <= {"x", "y", "z"}
+
+
+def test_same_day_block_and_min_days_are_named(monkeypatch):
+    # A is the only one working enough days for FCI, but had FCI last Monday
+    daily_workers = {"Monday": list("ABCDE"), **{day: list("AFGIJ") for day in DAYS[1:]}}
+    daily_heads = {day: "H" for day in DAYS}
+    history = {"2025-01-06": {"Monday": {"HEAD": "H", "FCI": "A", "CAR1": "F"}}}
+    monkeypatch.setattr(algorithm, "WeekSolver", None)  # the search must not start
+
+    result = algorithm.generate_rota(daily_workers, daily_heads, history, list("ABCDEFGHIJ"), "2025-01-13")
+
+    problem = result["diagnostics"][0]
+    assert (problem["constraint"], problem["day"], problem["positions"]) == ("day", "Monday", ["FCI"])
+    assert "had this role on the same day last week: A" in problem["message"]
+    assert "working too few days for FCI/OFFLINE: B, C, D, E" in problem["message"]
+    assert problem["message"] in result["error"]
+
+
+def test_six_days_from_five_workers_is_rejected_at_once():
+    days = DAYS + ["Saturday"]
+    domains = {(day, pos): list("ABCDE") for day in days for pos in POSITIONS}
+
+    start = time.perf_counter()
+    problems = diagnose(domains)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.05
+    per_position = [p for p in problems if p["constraint"] == "position"]
+    per_person = [p for p in problems if p["constraint"] == "person"]
+    assert [p["positions"] for p in per_position] == [[pos] for pos in POSITIONS]
+    assert "CAR1 on Monday, Tuesday, Wednesday, Thursday, Friday, Saturday needs 6" in per_position[0]["message"]
+    assert [p["people"] for p in per_person] == [[person] for person in "ABCDE"]
+
+
+def test_feasible_week_has_no_problems():
+    domains = {(day, pos): list("ABCDEF") for day in DAYS for pos in POSITIONS}
+    assert diagnose(domains, required=["A"]) == []
+    assert diagnose(domains, required=["Z"])[0]["constraint"] == "required"
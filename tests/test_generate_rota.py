@@ -57,7 +57,6 @@ def test_generate_rota_missing_workers():
     inspectors = ["A", "B", "C", "D", "E"]
     week_key = "2025-01-06"
 
-    algorithm.DEFAULT_ATTEMPTS = 10
     rota = algorithm.generate_rota(daily_workers, daily_heads, rotas, inspectors, week_key)
     assert isinstance(rota, dict)
     assert "error" in rota
@@ -73,7 +72,170 @@ def test_generate_rota_repeated_workers():
     inspectors = ["A", "B", "C", "D"]
     week_key = "2025-01-06"
 
-    algorithm.DEFAULT_ATTEMPTS = 10
     rota = algorithm.generate_rota(daily_workers, daily_heads, rotas, inspectors, week_key)
     assert isinstance(rota, dict)
     assert "error" in rota
+
+
+def test_generate_rota_respects_same_day_block():
+    random.seed(0)
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday"]
+    daily_workers = {day: ["A", "B", "C", "D", "E"] for day in days}
+    daily_heads = {day: "F" for day in days}
+    last_week = {
+        day: {"CAR1": "A", "HEAD": "F", "CAR2": "B", "OFFAL": "C", "FCI": "D", "OFFLINE": "E"}
+        for day in days
+    }
+    rotas = {"2024-12-30": last_week}
+    inspectors = ["A", "B", "C", "D", "E", "F"]
+
+    rota = algorithm.generate_rota(daily_workers, daily_heads, rotas, inspectors, "2025-01-06")
+
+    assert "error" not in rota
+    for day in days:
+        for pos in POSITIONS:
+            assert rota[day][pos] != last_week[day][pos]
+
+
+def test_generate_rota_tight_week_single_day_workers():
+    # Only A and B work more than one day, so they must cover FCI and OFFLINE
+    random.seed(0)
+    daily_workers = {
+        "Monday": ["A", "B", "C", "D", "E"],
+        "Tuesday": ["A", "B", "G", "H", "I"],
+    }
+    daily_heads = {"Monday": "F", "Tuesday": "F"}
+    rotas = {}
+    inspectors = ["A", "B", "C", "D", "E", "F", "G", "H", "I"]
+
+    rota = algorithm.generate_rota(daily_workers, daily_heads, rotas, inspectors, "2025-01-06")
+
+    assert "error" not in rota
+    assert {rota["Monday"]["FCI"], rota["Monday"]["OFFLINE"]} == {"A", "B"}
+    assert rota["Monday"]["FCI"] != rota["Tuesday"]["FCI"]
+
+
+def test_generate_rota_proves_infeasible_week():
+    # Only A works twice, so nobody is eligible for both FCI and OFFLINE on Monday
+    random.seed(0)
+    daily_workers = {
+        "Monday": ["A", "B", "C", "D", "E"],
+        "Tuesday": ["A", "G", "H", "I", "J"],
+    }
+    daily_heads = {"Monday": "F", "Tuesday": "F"}
+    rota = algorithm.generate_rota(daily_workers, daily_heads, {}, [], "2025-01-06")
+    assert "error" in rota
+
+
+def test_generate_rota_optimal_prefers_highest_fairness_scores():
+    # G and H worked all week without FCI/OFFLINE; A, B and C rotated through them
+    rotation = [("A", "B", "C"), ("B", "C", "A"), ("C", "A", "B"), ("A", "B", "C"), ("B", "C", "A")]
+    history = {}
+    for day, (fci, offline, offal) in zip(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"], rotation):
+        history[day] = {"CAR1": "G", "HEAD": "F", "CAR2": "H", "OFFAL": offal, "FCI": fci, "OFFLINE": offline}
+    rotas = {"2024-12-30": history}
+    daily_workers = {
+        "Monday": ["A", "B", "C", "G", "H"],
+        "Tuesday": ["A", "B", "C", "G", "H"],
+    }
+    daily_heads = {"Monday": "F", "Tuesday": "F"}
+
+    rota = algorithm.generate_rota(daily_workers, daily_heads, rotas, [], "2025-01-06", optimal=True)
+    again = algorithm.generate_rota(daily_workers, daily_heads, rotas, [], "2025-01-06", optimal=True)
+
+    assert rota == again
+    reward_holders = {rota[day][pos] for day in daily_workers for pos in ["FCI", "OFFLINE"]}
+    assert reward_holders == {"G", "H"}
+
+
+def test_generate_rota_tight_week_stays_shallow(monkeypatch):
+    # Eight inspectors filling six places a day: plain backtracking used to
+    # try tens of thousands of values on weeks like this one
+    from core.solver import WeekSolver
+
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+    inspectors = list("ABCDEFGH")
+    order = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+    random.seed(234)
+    rotas = {"2025-02-24": {day: dict(zip(order, random.sample(inspectors, 6))) for day in days}}
+    daily_workers = {day: random.sample(inspectors, 6) for day in days}
+    daily_heads = {day: daily_workers[day][0] for day in days}
+
+    nodes = []
+    solve = WeekSolver.solve
+
+    def counting_solve(self):
+        result = solve(self)
+        nodes.append(self.nodes)
+        return result
+
+    monkeypatch.setattr(WeekSolver, "solve", counting_solve)
+    rota = algorithm.generate_rota(daily_workers, daily_heads, rotas, inspectors, "2025-03-03")
+
+    assert "error" not in rota
+    assert sum(nodes) < 1_000
+    last_week = rotas["2025-02-24"]
+    for day in days:
+        assigned = [rota[day][pos] for pos in POSITIONS]
+        assert len(set(assigned)) == len(POSITIONS)
+        assert set(assigned) <= set(daily_workers[day]) - {daily_heads[day]}
+        for pos in POSITIONS:
+            assert rota[day][pos] != last_week[day][pos]
+
+
+def test_min_cost_assignment_matches_brute_force():
+    from itertools import permutations
+    from core.solver import min_cost_assignment
+
+    random.seed(3)
+    people = list("ABCDEFG")
+    for _ in range(50):
+        rows = [
+            {p: round(random.uniform(-5, 5), 2) for p in random.sample(people, random.randint(1, 5))}
+            for _ in range(random.randint(1, 5))
+        ]
+        totals = [
+            sum(row[p] for row, p in zip(rows, chosen))
+            for chosen in permutations(people, len(rows))
+            if all(p in row for row, p in zip(rows, chosen))
+        ]
+        if totals:
+            assert abs(min_cost_assignment(rows) - min(totals)) < 1e-9
+        else:
+            assert min_cost_assignment(rows) == float("inf")
+
+
+def test_generate_rota_optimal_busy_week_is_bounded(monkeypatch):
+    # Six days of six to ten workers: the per-slot bound used to let the
+    # optimising search try tens of thousands of values
+    from core import solver
+
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+    order = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+    random.seed(243)
+    inspectors = [f"P{i}" for i in range(12)]
+    rotas = {
+        week: {day: dict(zip(order, random.sample(inspectors, 6))) for day in days}
+        for week in ["2025-02-10", "2025-02-17", "2025-02-24"]
+    }
+    daily_workers = {day: random.sample(inspectors, random.randint(6, 10)) for day in days}
+    daily_heads = {day: daily_workers[day][0] for day in days}
+
+    nodes = []
+    minimize = solver.WeekSolver.minimize
+
+    def counting_minimize(self, costs):
+        result = minimize(self, costs)
+        nodes.append(self.nodes)
+        return result
+
+    monkeypatch.setattr(solver.WeekSolver, "minimize", counting_minimize)
+    rota = algorithm.generate_rota(daily_workers, daily_heads, rotas, inspectors, "2025-03-03", optimal=True)
+
+    assert "error" not in rota
+    assert nodes[0] <= solver.MINIMIZE_NODES + solver.FORWARD_CHECK_NODES * len(days) * len(POSITIONS)
+    for day in days:
+        assigned = [rota[day][pos] for pos in POSITIONS]
+        assert len(set(assigned)) == len(POSITIONS)
+    for pos in POSITIONS:
+        assert len({rota[day][pos] for day in days}) == len(days)
@@ -0,0 +1,92 @@
+import os
+import pickle
+import random
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic import scenario, week_request
+from core import algorithm
+from core.cache import cache, cached_rotas, week_deleted, week_saved
+from core.fairness import HistoryGrid
+from core.history import HistoryStore, WeekRecord
+from core.ledger import FairnessLedger, count_week
+
+WEEK = {
+    "Monday": {"CAR1": "A", "HEAD": "H", "CAR2": "B", "OFFAL": "C", "FCI": "D", "OFFLINE": "E"},
+    "Saturday": {"CAR1": "Not Working", "HEAD": "H", "CAR2": "", "OFFAL": "", "FCI": "", "OFFLINE": ""},
+}
+
+
+def test_store_behaves_like_the_rotas_dict():
+    store = HistoryStore({"2025-01-06": WEEK})
+    store["2025-01-13"] = {"Tuesday": {"HEAD": "H", "FCI": "A"}}
+
+    assert store == {"2025-01-06": WEEK, "2025-01-13": {"Tuesday": {"HEAD": "H", "FCI": "A"}}}
+    assert list(store["2025-01-06"]) == ["Monday", "Saturday"]
+    assert store.get("2025-01-20", {}) == {} and "2025-01-13" in store
+    assert store.pop("2025-01-13") == {"Tuesday": {"HEAD": "H", "FCI": "A"}}
+    assert len(store) == 1 and store.to_rotas() == {"2025-01-06": WEEK}
+    assert store.block("2025-01-06").shape == (2, 6)
+
+    # Rows of removed weeks are reused; days and positions outside the layout still round-trip
+    store["2025-01-20"] = {"Sunday ": {"HEAD": "H", "TRAINING": "B"}}
+    assert store["2025-01-20"] == {"Sunday ": {"HEAD": "H", "TRAINING": "B"}}
+    assert store["2025-01-06"] == WEEK
+    assert all(isinstance(record, WeekRecord) for record in store.records.values())
+
+
+def test_copies_and_pickles_are_independent():
+    store = HistoryStore({"2025-01-06": WEEK})
+    copy = store.copy()
+    copy["2025-01-06"] = {"Monday": {"HEAD": "X"}}
+    copy["2025-01-13"] = WEEK
+
+    assert store == {"2025-01-06": WEEK}
+    assert pickle.loads(pickle.dumps(copy)) == copy
+
+
+def test_counts_match_the_dict_scans():
+    rotas, names, week_key = scenario("small")
+    rotas["2021-12-27"]["Monday"]["CAR1"] = "Not Working"
+    store = HistoryStore.from_rotas(rotas)
+    grid = HistoryGrid(rotas)
+
+    for wk in list(rotas)[::7] + [week_key]:
+        assert store.window_counts(wk, 4) == grid.window_counts(wk, 4)
+    for wk in list(rotas)[::11]:
+        assert store.week_counts(wk) == count_week(rotas[wk])
+    assert FairnessLedger.from_rotas(store).weeks == FairnessLedger.from_rotas(rotas).weeks
+
+
+def test_generate_rota_gives_the_same_rota_from_a_store():
+    rotas, names, week_key = scenario("small")
+    daily_workers, daily_heads = week_request(random.Random(4), names)
+
+    random.seed(9)
+    from_dicts = algorithm.generate_rota(daily_workers, daily_heads, rotas, names, week_key)
+    random.seed(9)
+    from_store = algorithm.generate_rota(daily_workers, daily_heads, HistoryStore.from_rotas(rotas), names, week_key)
+
+    assert from_store == from_dicts
+
+
+def test_cached_history_is_a_store_patched_on_writes():
+    cache.clear()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"2025-01-06": WEEK}
+
+    rotas = cached_rotas(loader)
+    assert isinstance(rotas, HistoryStore) and rotas == {"2025-01-06": WEEK}
+    rotas.pop("2025-01-06")
+
+    week_saved("2025-01-13", WEEK, is_new=True)
+    week_deleted("2025-01-06")
+    assert cached_rotas(loader) == {"2025-01-13": WEEK}
+    assert loads == [1]
+    cache.clear()
@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.algorithm import generate_horizon, generate_rota
+from core.ledger import FairnessLedger
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+INSPECTORS = list("ABCDEFGH")
+WEEKS = ["2025-01-13", "2025-01-20", "2025-01-27", "2025-02-03"]
+HISTORY = {"2025-01-06": {day: {"HEAD": "H", "CAR1": "A", "CAR2": "B", "OFFAL": "C", "FCI": "D", "OFFLINE": "E"}
+                          for day in DAYS}}
+
+
+def selection():
+    return {day: list("ABCDEFG") for day in DAYS}, {day: "H" for day in DAYS}
+
+
+def test_horizon_matches_planning_and_saving_week_by_week():
+    requests = {wk: selection() for wk in WEEKS}
+
+    random.seed(11)
+    horizon = generate_horizon(requests, HISTORY, INSPECTORS)
+
+    random.seed(11)
+    rotas = dict(HISTORY)
+    for wk in WEEKS:
+        rotas[wk] = generate_rota(*requests[wk], rotas, INSPECTORS, wk, ledger=FairnessLedger.from_rotas(rotas))
+
+    assert list(horizon["rotas"]) == WEEKS
+    assert horizon["rotas"] == {wk: rotas[wk] for wk in WEEKS}
+
+
+def test_same_day_restrictions_chain_through_planned_weeks():
+    planned = generate_horizon({wk: selection() for wk in WEEKS}, HISTORY, INSPECTORS, optimal=True)["rotas"]
+
+    previous = HISTORY["2025-01-06"]
+    for wk in WEEKS:
+        for day in DAYS:
+            for pos in ["CAR1", "CAR2", "OFFAL", "FCI", "OFFLINE"]:
+                assert planned[wk][day][pos] != previous[day][pos]
+        previous = planned[wk]
+
+
+def test_shared_ledger_is_left_untouched():
+    ledger = FairnessLedger.from_rotas(HISTORY)
+    generate_horizon({wk: selection() for wk in WEEKS[:2]}, HISTORY, INSPECTORS, ledger=ledger)
+    assert ledger.keys == ["2025-01-06"]
+    assert len(ledger.prefix) == 1
+
+
+def test_horizon_stops_at_the_first_infeasible_week():
+    requests = {wk: selection() for wk in WEEKS[:2]}
+    requests[WEEKS[2]] = ({"Monday": list("ABC")}, {"Monday": "H"})
+
+    result = generate_horizon(requests, HISTORY, INSPECTORS)
+
+    assert result["week_key"] == WEEKS[2]
+    assert WEEKS[2] in result["error"]
+    assert list(result["rotas"]) == WEEKS[:2]
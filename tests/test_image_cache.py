@@ -0,0 +1,70 @@
+import os
+import sys
+from io import BytesIO
+
+import pandas as pd
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core import utils
+from core.image_cache import PNGCache, image_key, render_table_png
+
+
+def rota_df(fci="E"):
+    return pd.DataFrame(
+        {"CAR1": ["A", "B"], "FCI": [fci, "F"]},
+        index=["Monday", "Tuesday"],
+    )
+
+
+def counting_renderer(monkeypatch):
+    calls = []
+
+    def renderer(df, title=None, dpi=300, renderer=None):
+        calls.append(dpi)
+        return BytesIO(f"png:{df.values.tolist()}:{title}:{dpi}".encode())
+    monkeypatch.setattr(utils, "generate_table_image", renderer)
+    return calls
+
+
+def test_key_depends_on_contents_and_options():
+    assert image_key(rota_df(), dpi=300) == image_key(rota_df(), dpi=300)
+    assert image_key(rota_df(), dpi=300) != image_key(rota_df("X"), dpi=300)
+    assert image_key(rota_df(), dpi=300) != image_key(rota_df(), dpi=100)
+
+
+def test_renders_once_per_content_and_resolution(tmp_path, monkeypatch):
+    cache = PNGCache(str(tmp_path))
+    calls = counting_renderer(monkeypatch)
+
+    preview = render_table_png(rota_df(), dpi=100, cache=cache)
+    assert render_table_png(rota_df(), dpi=100, cache=cache) == preview
+    render_table_png(rota_df(), dpi=300, cache=cache)
+    render_table_png(rota_df("X"), dpi=100, cache=cache)
+    render_table_png(rota_df("X"), dpi=100, renderer="pil", cache=cache)
+    assert calls == [100, 300, 100, 100]
+
+
+def test_disk_tier_survives_a_fresh_process(tmp_path, monkeypatch):
+    calls = counting_renderer(monkeypatch)
+    first = render_table_png(rota_df(), title="Week", cache=PNGCache(str(tmp_path)))
+    second = render_table_png(rota_df(), title="Week", cache=PNGCache(str(tmp_path)))
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_memory_and_disk_are_bounded_lru(tmp_path):
+    cache = PNGCache(str(tmp_path), max_memory_bytes=25, max_disk_bytes=25)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"y" * 10)
+    os.utime(tmp_path / "a.png", (1, 1))
+    os.utime(tmp_path / "b.png", (2, 2))
+    assert cache.get("a") == b"x" * 10  # refreshes a in both tiers
+    cache.put("c", b"z" * 10)
+
+    assert sorted(os.listdir(tmp_path)) == ["a.png", "c.png"]
+    cache.clear_memory()
+    assert cache.get("b") is None
+    assert cache.get("a") == b"x" * 10
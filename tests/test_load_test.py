@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+import types
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+from benchmarks import load_test
+
+
+def test_parse_mix():
+    assert load_test.parse_mix("homepage=3,admin=1,generate") == {"homepage": 3.0, "admin": 1.0, "generate": 1.0}
+    with pytest.raises(ValueError):
+        load_test.parse_mix("homepage=1,checkout=2")
+
+
+def test_refuses_other_streamlit_versions(monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "streamlit", types.SimpleNamespace(__version__="1.40.2"))
+    with pytest.raises(SystemExit):
+        load_test.main(["--flows", "1"])
+    assert "benchmarks/requirements.txt" in capsys.readouterr().err
+
+
+def test_concurrent_sessions_report_latency_and_sheets_calls(tmp_path):
+    # Run as a script: other test modules swap a stand-in streamlit into sys.modules
+    output = tmp_path / "load.json"
+    ledger_path = os.path.join(ROOT_DIR, "fairness_ledger.json")
+    ledger_state = lambda: os.path.exists(ledger_path) and os.stat(ledger_path).st_mtime_ns
+    ledger_before = ledger_state()
+    env = dict(os.environ, ROTA_IMAGE_CACHE_DIR=str(tmp_path / "images"))
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT_DIR, "benchmarks", "load_test.py"), "--sessions", "2", "--flows", "4",
+         "--mix", "homepage=1,admin=1,generate=1", "--backend", "fake_sheets", "--years", "1", "--seed", "3",
+         "--output", str(output)],
+        cwd=tmp_path, env=env, check=True, capture_output=True, timeout=300,
+    )
+    results = json.loads(output.read_text())
+    # The synthetic ledger stays in the run's temp dir
+    assert not (tmp_path / "fairness_ledger.json").exists()
+    assert ledger_state() == ledger_before
+
+    flows = results["flows"]
+    assert sum(r["runs"] for r in flows.values()) == 4
+    for name, report in flows.items():
+        assert report["outcomes"].get("error", 0) == 0, report["errors"]
+        assert report["latency"]["p99_ms"] >= report["latency"]["p50_ms"] > 0
+    if flows.get("generate", {}).get("outcomes", {}).get("ok"):
+        assert flows["generate"]["sheets_calls"]["per_flow"] > 0
+    assert results["peak_rss_mb"] > 0
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.local_store import MirrorNotReady, SQLiteBackend
+from core.storage import MemoryBackend
+
+WEEK = {"Monday": {"CAR1": "A", "HEAD": "H", "CAR2": "B", "OFFAL": "C", "FCI": "D", "OFFLINE": "E"}}
+
+
+class FlakyUpstream(MemoryBackend):
+    """Memory upstream whose writes can be switched to fail like an unreachable Sheets."""
+
+    fail = False
+    fail_loads = False
+
+    def save_rotas(self, week_key, rota_dict):
+        if self.fail:
+            raise ConnectionError("quota")
+        super().save_rotas(week_key, rota_dict)
+
+    def load_rotas(self):
+        if self.fail_loads:
+            raise ConnectionError("unreachable")
+        return super().load_rotas()
+
+
+def test_reconcile_then_reads_are_local(tmp_path):
+    upstream = FlakyUpstream(rotas={"2025-01-06": WEEK})
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream)
+
+    assert store.reconcile()
+    upstream.rotas.clear()
+    assert store.load_rotas() == {"2025-01-06": WEEK}
+
+
+def test_fresh_mirror_is_not_ready_until_the_first_reconcile(tmp_path):
+    upstream = FlakyUpstream(rotas={"2025-01-06": WEEK})
+    upstream.fail_loads = True
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream, backoff_base=0.01, backoff_max=0.05)
+
+    store.start()
+    # An empty history would look like a site with no saved weeks
+    with pytest.raises(MirrorNotReady, match="unreachable"):
+        store.load_rotas()
+    assert not store.sync_metrics()["ready"]
+
+    # The sync thread keeps retrying the reconcile
+    upstream.fail_loads = False
+    deadline = time.time() + 10
+    while not store.is_ready() and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.sync_metrics()["ready"]
+    assert store.load_rotas() == {"2025-01-06": WEEK}
+
+
+def test_writes_are_local_first_and_synced_in_order(tmp_path):
+    upstream = FlakyUpstream()
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream)
+    store.reconcile()
+
+    upstream.fail = True
+    store.save_rotas("2025-01-13", WEEK)
+    store.append_change_logs([{"week_start": "2025-01-13", "day": "-"}])
+    assert store.load_rotas() == {"2025-01-13": WEEK}
+    assert not store.push_pending()
+    assert store.pending_count() == 2
+
+    # A reconcile while the upstream is failing must not drop the unsynced week
+    assert not store.reconcile()
+    assert "2025-01-13" in store.load_rotas()
+
+    upstream.fail = False
+    assert store.push_pending()
+    assert store.pending_count() == 0
+    assert upstream.rotas == {"2025-01-13": WEEK}
+    assert upstream.logs[0]["week_start"] == "2025-01-13"
+
+
+def test_delete_and_archive(tmp_path):
+    upstream = FlakyUpstream(rotas={"2025-01-06": WEEK})
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream)
+    store.reconcile()
+
+    deleted = store.delete_rota("2025-01-06")
+    store.archive_deleted_rota("2025-01-06", deleted)
+
+    assert deleted == WEEK
+    assert store.load_rotas() == {}
+    assert store.load_deleted_rotas() == {"2025-01-06": WEEK}
+    assert store.push_pending()
+    assert upstream.rotas == {} and upstream.deleted_rotas == {"2025-01-06": WEEK}
+
+
+class CountingLogUpstream(MemoryBackend):
+    """Memory upstream that records where each incremental log read starts."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.log_reads = []
+
+    def load_change_logs_since(self, position):
+        self.log_reads.append(position)
+        return super().load_change_logs_since(position)
+
+
+def test_change_log_is_pulled_incrementally(tmp_path):
+    log = {"week_start": "2025-01-06", "day": "Monday"}
+    upstream = CountingLogUpstream(logs=[log, log])
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream)
+    assert store.reconcile()
+
+    store.append_change_logs([{"week_start": "2025-01-13", "day": "-"}])
+    upstream.logs.append({"week_start": "2025-01-20", "day": "Friday"})
+    assert store.reconcile()  # pushes the local row, then pulls both new rows in upstream order
+    assert store.reconcile()
+
+    assert upstream.log_reads == [0, 2, 4]
+    assert [entry["week_start"] for entry in store.load_change_logs()] == ["2025-01-06", "2025-01-06", "2025-01-20", "2025-01-13"]
+    assert store.change_log_weeks() == ["2025-01-20", "2025-01-13", "2025-01-06"]
+    assert len(store.load_change_logs("2025-01-06")) == 2
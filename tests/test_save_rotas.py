@@ -0,0 +1,92 @@
+import os
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import core.data_utils as data_utils
+
+
+class BatchSheet:
+    """In-memory worksheet exposing the ranged/batched gspread calls used by data_utils."""
+
+    def __init__(self, rows=None):
+        self.rows = [list(r) for r in (rows or [])]
+        self.calls = []
+
+    def col_values(self, col):
+        self.calls.append("col_values")
+        return [r[col - 1] if len(r) >= col else "" for r in self.rows]
+
+    def get_all_values(self):
+        self.calls.append("get_all_values")
+        return [list(r) for r in self.rows]
+
+    def append_rows(self, values, **kwargs):
+        self.calls.append("append_rows")
+        self.rows.extend(list(r) for r in values)
+
+    def insert_rows(self, values, row=1, **kwargs):
+        self.calls.append("insert_rows")
+        self.rows[row - 1:row - 1] = [list(r) for r in values]
+
+    def delete_rows(self, start_index, end_index=None):
+        self.calls.append("delete_rows")
+        del self.rows[start_index - 1:(end_index or start_index)]
+
+    def batch_update(self, data, **kwargs):
+        self.calls.append("batch_update")
+        for item in data:
+            start, end = item["range"].split(":")
+            first = int(start[1:])
+            for offset, values in enumerate(item["values"]):
+                self.rows[first - 1 + offset] = list(values)
+
+
+def week_rows(week_key, days, tag):
+    return [[week_key, day] + [f"{tag}{i}" for i in range(len(data_utils.POSITIONS))] for day in days]
+
+
+def rota_for(days, tag):
+    return {day: {pos: f"{tag}{i}" for i, pos in enumerate(data_utils.POSITIONS)} for day in days}
+
+
+def run_save(monkeypatch, sheet, week_key, rota):
+    monkeypatch.setattr(data_utils, "get_sheet", lambda: sheet)
+    data_utils.save_rotas(week_key, rota)
+
+
+def test_save_new_week_into_empty_sheet_is_one_write(monkeypatch):
+    sheet = BatchSheet()
+    run_save(monkeypatch, sheet, "2025-01-06", rota_for(["Monday", "Tuesday"], "n"))
+
+    assert sheet.calls == ["col_values", "append_rows"]
+    assert sheet.rows[0] == data_utils.HEADER
+    assert [r[:2] for r in sheet.rows[1:]] == [["2025-01-06", "Monday"], ["2025-01-06", "Tuesday"]]
+
+
+def test_replace_week_in_place_keeps_other_rows(monkeypatch):
+    days = ["Monday", "Tuesday", "Wednesday"]
+    rows = [data_utils.HEADER] + week_rows("2024-12-30", days, "a") + week_rows("2025-01-06", days, "b") + week_rows("2025-01-13", days, "c")
+    sheet = BatchSheet(rows)
+
+    run_save(monkeypatch, sheet, "2025-01-06", rota_for(days, "z"))
+
+    assert sheet.calls == ["col_values", "batch_update"]
+    assert sheet.rows == [data_utils.HEADER] + week_rows("2024-12-30", days, "a") + week_rows("2025-01-06", days, "z") + week_rows("2025-01-13", days, "c")
+
+
+def test_replace_week_with_more_or_fewer_days(monkeypatch):
+    short = ["Monday", "Tuesday"]
+    long = ["Monday", "Tuesday", "Wednesday", "Thursday"]
+    rows = [data_utils.HEADER] + week_rows("2025-01-06", short, "b") + week_rows("2025-01-13", short, "c")
+    sheet = BatchSheet(rows)
+
+    run_save(monkeypatch, sheet, "2025-01-06", rota_for(long, "z"))
+    assert sheet.rows == [data_utils.HEADER] + week_rows("2025-01-06", long, "z") + week_rows("2025-01-13", short, "c")
+
+    sheet.calls.clear()
+    run_save(monkeypatch, sheet, "2025-01-06", rota_for(["Monday"], "y"))
+    assert sheet.calls == ["col_values", "batch_update", "delete_rows"]
+    assert sheet.rows == [data_utils.HEADER] + week_rows("2025-01-06", ["Monday"], "y") + week_rows("2025-01-13", short, "c")
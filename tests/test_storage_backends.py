@@ -0,0 +1,138 @@
+import os
+import sys
+
+import pytest
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.fake_sheets import FakeSheetsService, QuotaExceeded
+from core.local_store import SQLiteBackend
+from core.storage import MemoryBackend, SheetsBackend
+
+WEEK = {
+    "Monday": {"CAR1": "A", "HEAD": "H", "CAR2": "B", "OFFAL": "C", "FCI": "D", "OFFLINE": "E"},
+    "Tuesday": {"CAR1": "B", "HEAD": "H", "CAR2": "C", "OFFAL": "D", "FCI": "E", "OFFLINE": "A"},
+}
+LOG = {"timestamp": "2025-01-06 09:00", "admin_id": "admin", "week_start": "2025-01-06", "day": "Monday",
+       "position": "FCI", "old_value": "D", "new_value": "E", "admin_users": "admin"}
+
+
+def make_fake_sheets():
+    service = FakeSheetsService()
+    service.worksheet("change_logs").rows.append(list(LOG))
+    return SheetsBackend(service.worksheet)
+
+
+@pytest.fixture(params=["memory", "sqlite", "fake_sheets"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "store.sqlite3"))
+    return make_fake_sheets()
+
+
+def test_backend_contract(backend):
+    backend.save_rotas("2025-01-06", WEEK)
+    backend.save_rotas("2025-01-13", WEEK)
+    backend.save_rotas("2025-01-06", {"Monday": WEEK["Monday"]})
+    assert backend.load_rotas() == {"2025-01-06": {"Monday": WEEK["Monday"]}, "2025-01-13": WEEK}
+
+    deleted = backend.delete_rota("2025-01-13")
+    backend.archive_deleted_rota("2025-01-13", deleted)
+    assert deleted == WEEK
+    assert set(backend.load_rotas()) == {"2025-01-06"}
+    assert backend.load_deleted_rotas() == {"2025-01-13": WEEK}
+
+    backend.append_change_logs([LOG])
+    assert backend.load_change_logs() == [LOG]
+    assert backend.load_change_logs("2025-01-06") == [LOG]
+    assert backend.load_change_logs("2025-02-03") == []
+    assert backend.change_log_weeks() == ["2025-01-06"]
+
+
+def test_save_weeks_writes_many_weeks_at_once(backend):
+    backend.save_rotas("2025-01-06", WEEK)
+    backend.save_rotas("2025-01-13", WEEK)
+    monday_only = {"Monday": WEEK["Tuesday"]}
+
+    backend.save_weeks({"2025-01-06": monday_only, "2025-01-13": {"Monday": WEEK["Tuesday"], "Tuesday": WEEK["Monday"]},
+                        "2025-01-20": WEEK})
+
+    assert backend.load_rotas() == {
+        "2025-01-06": monday_only,
+        "2025-01-13": {"Monday": WEEK["Tuesday"], "Tuesday": WEEK["Monday"]},
+        "2025-01-20": WEEK,
+    }
+
+
+def test_sheets_save_weeks_is_one_call_of_each_kind():
+    service = FakeSheetsService()
+    backend = SheetsBackend(service.worksheet)
+    backend.save_weeks({"2025-01-06": WEEK, "2025-01-13": WEEK})
+    assert service.worksheet("rota_data").rows[0][:2] == ["week_start", "day"]
+
+    service.reset_stats()
+    weeks = {f"2025-0{m}-0{d}": WEEK for m in (2, 3) for d in (3, 4, 5)}
+    backend.save_weeks({"2025-01-06": {"Monday": WEEK["Monday"]}, "2025-01-13": WEEK, **weeks})
+    assert dict(service.stats) == {"col_values": 1, "batch_update": 1, "delete_rows": 1, "append_rows": 1}
+    assert len(backend.load_rotas()) == 8
+
+
+def test_sheets_log_reads_only_rows_past_the_high_water_mark():
+    service = FakeSheetsService()
+    service.worksheet("change_logs").rows.append(list(LOG))
+    backend = SheetsBackend(service.worksheet)
+    later = dict(LOG, week_start="2025-01-13", new_value="")
+
+    backend.append_change_logs([LOG, LOG])
+    entries, position = backend.load_change_logs_since(0)
+    assert entries == [LOG, LOG] and position == 2
+
+    backend.append_change_logs([later])
+    service.reset_stats()
+    entries, position = backend.load_change_logs_since(position)
+    assert entries == [later] and position == 3
+    assert service.stats["get"] == 1 and service.stats["get_all_records"] == 0
+    assert backend.load_change_logs_since(position) == ([], 3)
+
+
+def test_fake_sheets_counts_calls_and_enforces_quota():
+    now = [0.0]
+    service = FakeSheetsService(quota_per_minute=3, clock=lambda: now[0])
+    backend = SheetsBackend(service.worksheet)
+
+    backend.save_rotas("2025-01-06", WEEK)
+    assert service.stats["col_values"] == 1 and service.stats["append_rows"] == 1
+    with pytest.raises(QuotaExceeded):
+        backend.save_rotas("2025-01-13", WEEK)
+
+    now[0] += 60
+    backend.save_rotas("2025-01-13", WEEK)
+    assert service.stats["rejected"] == 1
+
+
+def test_ledger_answers_for_the_cached_history_across_saves(tmp_path, monkeypatch):
+    from core import ledger, storage
+    from core.cache import cache, cached_rotas
+
+    monkeypatch.setattr(ledger, "LEDGER_FILE", str(tmp_path / "ledger.json"))
+    monkeypatch.setattr(ledger, "_ledger", None)
+    storage.set_backend(MemoryBackend(rotas={"2025-01-06": WEEK}))
+    cache.clear()
+    try:
+        assert ledger.get_ledger().covers(cached_rotas(storage.load_rotas))
+        # The save patches the cached history and the ledger the same way
+        storage.save_rotas("2025-01-13", WEEK)
+        storage.delete_rota("2025-01-06")
+        rotas = cached_rotas(storage.load_rotas)
+        assert list(rotas) == ["2025-01-13"]
+        assert ledger.get_ledger().covers(rotas)
+        # A local edit the ledger hasn't seen
+        rotas["2025-01-20"] = WEEK
+        assert not ledger.get_ledger().covers(rotas)
+    finally:
+        storage.set_backend(None)
+        cache.clear()
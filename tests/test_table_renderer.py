@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.utils import generate_table_image
+
+POSITIONS = ["CAR1", "HEAD", "CAR2", "OFFAL", "FCI", "OFFLINE"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+def week_df():
+    df = pd.DataFrame([[f"{day[:2]}-{pos}" for pos in POSITIONS] for day in DAYS], index=DAYS, columns=POSITIONS)
+    df.loc["Tuesday", "HEAD"] = float("nan")
+    return df
+
+
+def test_pil_renderer_scales_with_dpi():
+    small = Image.open(generate_table_image(week_df(), title="Week", dpi=100, renderer="pil"))
+    large = Image.open(generate_table_image(week_df(), title="Week", dpi=300, renderer="pil"))
+
+    assert small.format == "PNG"
+    assert small.size[0] > 6 * 186  # six data columns plus the day labels
+    assert abs(large.size[0] / small.size[0] - 3) < 0.05
+    assert abs(large.size[1] / small.size[1] - 3) < 0.1
+
+
+def test_title_adds_height_only_when_given():
+    plain = Image.open(generate_table_image(week_df(), dpi=100, renderer="pil"))
+    titled = Image.open(generate_table_image(week_df(), title="Week", dpi=100, renderer="pil"))
+    assert titled.size[0] == plain.size[0]
+    assert titled.size[1] > plain.size[1]
+
+
+def test_unknown_renderer_is_rejected():
+    with pytest.raises(ValueError):
+        generate_table_image(week_df(), renderer="svg")
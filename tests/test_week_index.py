@@ -0,0 +1,42 @@
+import os
+import sys
+from datetime import date
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.cache import WEEK_KEYS_SCOPE, cache
+from core.week_index import WeekIndex, saved_week_index
+
+WEEKS = ["2025-05-26", "2025-04-28", "2025-06-02", "2025-05-05", "2024-12-30"]
+
+
+def test_months_and_buckets_are_sorted():
+    index = WeekIndex(WEEKS)
+    assert index.months() == ["June 2025", "May 2025", "April 2025", "December 2024"]
+    assert index.in_month("May 2025") == ["2025-05-05", "2025-05-26"]
+    assert index.in_month("March 2025") == []
+
+
+def test_range_queries():
+    index = WeekIndex(WEEKS)
+    assert index.between("2025-04-01", "2025-05-26") == ["2025-04-28", "2025-05-05", "2025-05-26"]
+    assert index.between(end="2025-01-01") == ["2024-12-30"]
+    assert index.latest(2) == ["2025-06-02", "2025-05-26"]
+    assert index.latest(3, until="2025-05-25") == ["2025-05-05", "2025-04-28", "2024-12-30"]
+    assert index.first_since(date(2025, 5, 29)) == 4
+    assert index.first_since(date(2025, 6, 3)) == len(index)
+
+
+def test_index_is_built_once_per_revision():
+    cache.clear()
+    rotas = {wk: {} for wk in WEEKS}
+    first = saved_week_index(rotas)
+    assert saved_week_index(rotas) is first
+
+    rotas["2025-06-09"] = {}
+    assert saved_week_index(rotas).keys[-1] == "2025-06-09"  # stale size is rebuilt
+
+    cache.bump(WEEK_KEYS_SCOPE)
+    assert saved_week_index(rotas) is not first
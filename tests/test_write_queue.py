@@ -0,0 +1,174 @@
+import os
+import sys
+
+# Ensure the repository root is on the Python path
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core.fake_sheets import FakeSheetsService
+from core.data_utils import DELETED_SHEET_NAME, LOG_SHEET_NAME, SHEET_NAME
+from core.local_store import CALL_COST, SQLiteBackend
+from core.rate_limit import TokenBucket
+from core.storage import MemoryBackend, SheetsBackend
+
+WEEK = {"Monday": {"CAR1": "A", "HEAD": "H", "CAR2": "B", "OFFAL": "C", "FCI": "D", "OFFLINE": "E"}}
+OTHER = {"Monday": {"CAR1": "X", "HEAD": "H", "CAR2": "B", "OFFAL": "C", "FCI": "D", "OFFLINE": "E"}}
+
+
+class RecordingUpstream(MemoryBackend):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+        self.fail = False
+
+    def save_rotas(self, week_key, rota_dict):
+        if self.fail:
+            raise ConnectionError("429 Too Many Requests")
+        self.calls.append(("save", week_key))
+        super().save_rotas(week_key, rota_dict)
+
+    def save_weeks(self, weeks):
+        self.calls.append(("save_weeks", sorted(weeks)))
+        super().save_weeks(weeks)
+
+    def delete_rota(self, week_key):
+        self.calls.append(("delete", week_key))
+        return super().delete_rota(week_key)
+
+    def append_change_logs(self, entries):
+        self.calls.append(("logs", len(entries)))
+        super().append_change_logs(entries)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_writes_to_the_same_week_are_coalesced(tmp_path):
+    upstream = RecordingUpstream()
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream)
+
+    store.save_rotas("2025-01-06", WEEK)
+    store.save_rotas("2025-01-13", WEEK)
+    store.delete_rota("2025-01-06")
+    store.save_rotas("2025-01-06", OTHER)
+    assert store.pending_count() == 2
+
+    assert store.push_pending()
+    assert upstream.calls == [("save", "2025-01-13"), ("save", "2025-01-06")]
+    assert upstream.rotas == {"2025-01-13": WEEK, "2025-01-06": OTHER}
+
+
+def test_bulk_save_supersedes_queued_saves_and_goes_up_once(tmp_path):
+    upstream = RecordingUpstream()
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream)
+    assert store.reconcile()
+
+    store.save_rotas("2025-01-06", WEEK)
+    store.save_rotas("2025-01-20", WEEK)
+    store.save_weeks({"2025-01-06": OTHER, "2025-01-13": OTHER})
+    assert store.load_rotas() == {"2025-01-06": OTHER, "2025-01-13": OTHER, "2025-01-20": WEEK}
+    assert store.pending_count() == 2
+
+    assert store.push_pending()
+    assert upstream.calls == [("save", "2025-01-20"), ("save_weeks", ["2025-01-06", "2025-01-13"])]
+    assert upstream.rotas == store.load_rotas()
+
+
+def test_consecutive_log_appends_go_up_together(tmp_path):
+    upstream = RecordingUpstream()
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream)
+
+    store.append_change_logs([{"week_start": "2025-01-06"}] * 3)
+    store.append_change_logs([{"week_start": "2025-01-06"}] * 2)
+    store.save_rotas("2025-01-06", WEEK)
+    store.append_change_logs([{"week_start": "2025-01-13"}])
+
+    assert store.push_pending()
+    assert upstream.calls == [("logs", 5), ("save", "2025-01-06"), ("logs", 1)]
+    assert store.sync_metrics()["pushed"] == 4
+
+
+def test_failures_back_off_exponentially_and_show_in_metrics(tmp_path):
+    upstream = RecordingUpstream()
+    upstream.fail = True
+    store = SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=upstream, backoff_base=2, backoff_max=10)
+    store.save_rotas("2025-01-06", WEEK)
+
+    delays = []
+    for _ in range(4):
+        assert not store.push_pending()
+        delays.append(store.next_retry_delay())
+    assert [1 <= delays[0] <= 2, 2 <= delays[1] <= 4, 4 <= delays[2] <= 8, 5 <= delays[3] <= 10] == [True] * 4
+
+    metrics = store.sync_metrics()
+    assert metrics["queue_depth"] == 1 and metrics["consecutive_failures"] == 4
+    assert "429" in metrics["last_error"]
+
+    upstream.fail = False
+    assert store.push_pending()
+    metrics = store.sync_metrics()
+    assert metrics["queue_depth"] == 0 and metrics["consecutive_failures"] == 0
+    assert metrics["latency_p50_seconds"] is not None
+
+
+def test_token_bucket_stays_within_the_per_minute_quota():
+    clock = FakeClock()
+    bucket = TokenBucket.for_quota(60, clock=clock, sleep=clock.sleep)
+    for _ in range(60):
+        bucket.acquire()
+    assert clock.now >= 59.9  # 12 tokens of burst, then 0.8 per second
+
+
+def test_rate_limited_mirror_never_trips_the_sheets_quota(tmp_path):
+    clock = FakeClock()
+    service = FakeSheetsService(quota_per_minute=20, clock=clock, sleep=clock.sleep)
+    store = SQLiteBackend(
+        str(tmp_path / "store.sqlite3"),
+        upstream=SheetsBackend(service.worksheet),
+        rate_limiter=TokenBucket.for_quota(20, clock=clock, sleep=clock.sleep),
+    )
+    for i in range(15):
+        store.save_rotas(f"2025-{i + 1:02d}-06", WEEK)
+
+    assert store.push_pending()
+    assert service.stats["rejected"] == 0
+    assert service.stats["append_rows"] == 15
+    assert clock.now > 60
+
+
+def test_call_costs_match_the_worst_case_sheets_requests(tmp_path):
+    service = FakeSheetsService()
+    sheets = SheetsBackend(service.worksheet)
+    for name in (SHEET_NAME, DELETED_SHEET_NAME, LOG_SHEET_NAME):
+        service.worksheet(name)  # handles are opened once per process, not per write
+    three_days = {day: WEEK["Monday"] for day in ("Monday", "Tuesday", "Wednesday")}
+
+    # The week is split over two row blocks, so re-saving it longer updates
+    # the first block in place, deletes the second and inserts the extra rows
+    sheets.save_rotas("2025-01-06", WEEK)
+    sheets.save_rotas("2025-01-13", WEEK)
+    service.worksheet(SHEET_NAME).append_rows([["2025-01-06", "Tuesday"] + [""] * 6])
+
+    def cost(action):
+        service.reset_stats()
+        action()
+        return service.total_calls
+
+    measured = {
+        "save": cost(lambda: sheets.save_rotas("2025-01-06", three_days)),
+        # One week the same size (updated in place), one resized (deleted and appended)
+        "save_weeks": cost(lambda: sheets.save_weeks({"2025-01-06": three_days, "2025-01-13": three_days})),
+        "delete": cost(lambda: sheets.delete_rota("2025-01-06")),
+        "archive": cost(lambda: sheets.archive_deleted_rota("2025-01-06", three_days)),
+        "logs": cost(lambda: sheets.append_change_logs([{"week_start": "2025-01-06"}])),
+        "reconcile": cost(lambda: SQLiteBackend(str(tmp_path / "store.sqlite3"), upstream=sheets).reconcile()),
+    }
+    assert measured == CALL_COST
@@ -8,8 +8,10 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from core.algorithm import generate_rota
-from core.data_utils import save_rotas
+from core.algorithm import generate_horizon, generate_rota
+from core.candidates import DEFAULT_CANDIDATES, DEFAULT_TIME_BUDGET, generate_candidates
+from core.storage import save_rotas, save_weeks
+from core.ledger import get_ledger
 from core.utils import generate_table_image
 
 
@@ -77,6 +79,14 @@ def validate_selection(days, raw_selected, raw_head):
             invalid_days.append(day)
     return valid_days, invalid_days
 
+MAX_HORIZON_WEEKS = 8
+
+ROTA_MODES = {
+    "quick": "🎲 Quick (first valid rota)",
+    "optimal": "⚖️ Fairness-optimal assignment (plan FCI/OFFLINE across the whole week)",
+    "best_of_n": "🎯 Best of N candidates (generate many rotas in parallel, keep the fairest)",
+}
+
 def generate_and_display_rota(valid_days, daily_workers, daily_heads, rotas, inspectors, week_key, full_day_list):
     st.markdown("---")
     st.markdown("""
@@ -85,54 +95,165 @@ def generate_and_display_rota(valid_days, daily_workers, daily_heads, rotas, ins
     """, unsafe_allow_html=True)
 
     st.info("✅ Ready to generate rota!")
+    mode = st.radio(
+        "Assignment mode",
+        list(ROTA_MODES),
+        format_func=ROTA_MODES.get,
+        key="rota_mode"
+    )
+    if mode == "best_of_n":
+        cols = st.columns(3)
+        with cols[0]:
+            n_candidates = st.number_input("Candidates (N)", min_value=2, max_value=2000, value=DEFAULT_CANDIDATES, step=8)
+        with cols[1]:
+            top_k = st.number_input("Rotas to choose from", min_value=1, max_value=10, value=1)
+        with cols[2]:
+            time_budget = st.number_input("Time budget (s)", min_value=1.0, max_value=60.0, value=DEFAULT_TIME_BUDGET, step=1.0)
+        horizon_weeks = 1
+    else:
+        horizon_weeks = st.number_input(
+            "Weeks to plan", min_value=1, max_value=MAX_HORIZON_WEEKS, value=1,
+            help="Plan this and the following weeks with the same daily selection; "
+                 "each week counts towards the next one's fairness and same-day rules."
+        )
+
+    week_workers = {day: daily_workers[day] for day in valid_days}
+    week_heads = {day: daily_heads[day] for day in valid_days}
 
     if st.button("Generate Rota"):
-        rota_result = generate_rota(
-            {day: daily_workers[day] for day in valid_days},
-            {day: daily_heads[day] for day in valid_days},
-            rotas, inspectors, week_key
+        st.session_state.pop("rota_candidates", None)
+        if mode == "best_of_n":
+            with st.spinner("Generating candidate rotas..."):
+                result = generate_candidates(
+                    week_workers, week_heads, rotas, inspectors, week_key,
+                    n=int(n_candidates), top_k=int(top_k), time_budget=float(time_budget),
+                    ledger=get_ledger()
+                )
+            if "error" in result:
+                st.error(f"❌ {result['error']}")
+                _show_diagnostics(result)
+                st.stop()
+            if len(result["candidates"]) == 1:
+                _save_rota(result["candidates"][0]["rota"], rotas, week_key, full_day_list)
+            st.session_state["rota_candidates"] = {"week_key": week_key, **result}
+        elif horizon_weeks > 1:
+            start = datetime.strptime(week_key, "%Y-%m-%d")
+            horizon = [(start + timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(int(horizon_weeks))]
+            already_saved = [wk for wk in horizon[1:] if wk in rotas]
+            if already_saved:
+                st.error(f"❌ Rotas already exist for {', '.join(already_saved)}. Plan fewer weeks or delete them first.")
+                st.stop()
+            with st.spinner(f"Planning {len(horizon)} weeks..."):
+                result = generate_horizon(
+                    {wk: (week_workers, week_heads) for wk in horizon}, rotas, inspectors,
+                    optimal=mode == "optimal",
+                    ledger=get_ledger()
+                )
+            _save_horizon(result, rotas, full_day_list)
+        else:
+            rota_result = generate_rota(
+                week_workers, week_heads, rotas, inspectors, week_key,
+                optimal=mode == "optimal",
+                ledger=get_ledger()
+            )
+            _save_rota(rota_result, rotas, week_key, full_day_list)
+
+    pending = st.session_state.get("rota_candidates")
+    if pending and pending["week_key"] == week_key:
+        candidates = pending["candidates"]
+        st.caption(
+            f"{pending['generated']} valid rotas generated in {pending['elapsed']:.1f}s "
+            f"({pending['failed']} attempts failed). Lower score is fairer."
+        )
+        choice = st.radio(
+            "Choose a rota",
+            range(len(candidates)),
+            format_func=lambda i: _candidate_label(i, candidates[i]["objective"]),
+            key="rota_candidate_choice"
         )
+        st.dataframe(_rota_frame(dict(candidates[choice]["rota"]), full_day_list))
+        if st.button("💾 Save Selected Rota"):
+            st.session_state.pop("rota_candidates", None)
+            _save_rota(dict(candidates[choice]["rota"]), rotas, week_key, full_day_list)
+
+def _show_diagnostics(result):
+    # The first problem is already in the error; list any others under it
+    others = result.get("diagnostics", [])[1:]
+    if others:
+        st.markdown("Also blocking this week:\n" + "\n".join(f"- {p['message']}" for p in others))
+
+def _candidate_label(i, objective):
+    return (
+        f"#{i + 1} — score {objective['score']:.4f} "
+        f"(FCI var {objective['fci_variance']:.4f}, OFFLINE var {objective['offline_variance']:.4f}, "
+        f"top-3 coverage {objective['top3_coverage']:.0%})"
+    )
+
+def _rota_frame(rota_result, full_day_list):
+    for day in full_day_list:
+        if day not in rota_result:
+            rota_result[day] = {pos: "Not Working" for pos in POSITIONS}
+
+    rota_df = pd.DataFrame.from_dict(rota_result, orient="index")
+    rota_df = rota_df.reindex(full_day_list)
+    if all(pos in rota_df.columns for pos in POSITIONS):
+        rota_df = rota_df[POSITIONS]
+    else:
+        st.warning("⚠️ Missing positions in generated rota")
+    return rota_df
+
+def _save_rota(rota_result, rotas, week_key, full_day_list):
+    if isinstance(rota_result, dict) and "error" in rota_result:
+        st.error(f"❌ {rota_result['error']}")
+        _show_diagnostics(rota_result)
+        st.stop()
 
-        if isinstance(rota_result, dict) and "error" in rota_result:
-            st.error(f"❌ {rota_result['error']}")
-            st.stop()
+    if not rota_result or not isinstance(rota_result, dict):
+        st.error("❌ Rota could not be generated. Please review your selections.")
+        st.stop()
 
-        if not rota_result or not isinstance(rota_result, dict):
-            st.error("❌ Rota could not be generated. Please review your selections.")
-            st.stop()
+    rota_df = _rota_frame(rota_result, full_day_list)
 
-        for day in full_day_list:
-            if day not in rota_result:
-                rota_result[day] = {pos: "Not Working" for pos in POSITIONS}
+    st.success("🎉 Rota saved successfully and added to rota history.")
 
-        st.success("🎉 Rota saved successfully and added to rota history.")
+    st.dataframe(rota_df)
+    st.markdown("</div>", unsafe_allow_html=True)
 
-        rota_df = pd.DataFrame.from_dict(rota_result, orient="index")
-        rota_df = rota_df.reindex(full_day_list)
-        if all(pos in rota_df.columns for pos in POSITIONS):
-            rota_df = rota_df[POSITIONS]
-        else:
-            st.warning("⚠️ Missing positions in generated rota")
-
-        st.dataframe(rota_df)
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        # 🔽 PNG olarak indirme bölümü
-        image_buf = generate_table_image(rota_df)
-        st.image(image_buf, caption="📸 Oluşturulan Rota Tablosu (PNG)", use_container_width=True)
-        st.download_button(
-            label="📥 Rota Tablosunu PNG Olarak İndir",
-            data=image_buf,
-            file_name=f"rota_{week_key}.png",
-            mime="image/png"
-        )
+    # 🔽 PNG olarak indirme bölümü
+    image_buf = generate_table_image(rota_df)
+    st.image(image_buf, caption="📸 Oluşturulan Rota Tablosu (PNG)", use_container_width=True)
+    st.download_button(
+        label="📥 Rota Tablosunu PNG Olarak İndir",
+        data=image_buf,
+        file_name=f"rota_{week_key}.png",
+        mime="image/png"
+    )
+
+    # Verileri kaydet
+    rotas[week_key] = rota_result
+    save_rotas(week_key, rota_result)
+
+    st.rerun()
+
+def _save_horizon(result, rotas, full_day_list):
+    if "error" in result:
+        st.error(f"❌ {result['error']}")
+        _show_diagnostics(result)
+        st.stop()
+
+    planned = result["rotas"]
+    for week_key, rota_result in planned.items():
+        st.markdown(f"**🗓️ Week of {week_key}**")
+        st.dataframe(_rota_frame(rota_result, full_day_list))
+
+    st.success(f"🎉 {len(planned)} weekly rotas saved successfully and added to rota history.")
+    st.markdown("</div>", unsafe_allow_html=True)
 
-        # Verileri kaydet
-        rotas[week_key] = rota_result
-        save_rotas(week_key, rota_result)
+    # Tüm haftalar tek seferde kaydedilir
+    rotas.update(planned)
+    save_weeks(planned)
 
-        st.cache_data.clear()
-        st.rerun()
+    st.rerun()
 
 def check_existing_rota(week_key, rotas, selected_monday, has_planner_access, all_days, positions):
     rota_exists = False